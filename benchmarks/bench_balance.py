@@ -0,0 +1,72 @@
+"""Compare BalanceCalculator with the previous pure-Python loops, end to end.
+
+Each column times a total balance plus category totals through the public
+static methods, conversion included, since every call pays it:
+
+- loop: the previous implementation, on a list of dicts;
+- dicts: BalanceCalculator on the same list (converted to arrays on every call);
+- store: BalanceCalculator on an OperationStore, whose arrays are used as-is.
+
+The gain only applies to OperationStore input, which is what DataManager
+passes. For a list of dicts the per-row conversion costs more than the old
+loop did, so dict callers are slower than before.
+
+Run from the repository root:  python benchmarks/bench_balance.py [sizes...]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import make_operations  # noqa: E402
+from services.balance_calculator import BalanceCalculator  # noqa: E402
+from services.operation_store import OperationStore  # noqa: E402
+
+def loop_total_balance(operations):
+    balance = 0
+    for op in operations:
+        if op['type'] == 'income':
+            balance += op['amount']
+        else:
+            balance -= op['amount']
+    return balance
+
+def loop_category_totals(operations):
+    totals = {}
+    for op in operations:
+        category = op['category']
+        if category not in totals:
+            totals[category] = 0
+        if op['type'] == 'income':
+            totals[category] += op['amount']
+        else:
+            totals[category] -= op['amount']
+    return totals
+
+def timed(fn, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def calculator(operations):
+    return (BalanceCalculator.calculate_total_balance(operations),
+            BalanceCalculator.calculate_category_totals(operations))
+
+def main(sizes):
+    print(f"{'rows':>9} {'loop (ms)':>10} {'dicts (ms)':>11} {'store (ms)':>11} {'dicts vs loop':>14} {'store vs loop':>14}")
+    for n in sizes:
+        operations = make_operations(n)
+        store = OperationStore.from_records(operations)
+        loop = timed(lambda: (loop_total_balance(operations), loop_category_totals(operations)))
+        dicts = timed(calculator, operations)
+        columnar = timed(calculator, store)
+        assert abs(calculator(store)[0] - loop_total_balance(operations)) < 1e-6 * max(1, n)
+        print(f"{n:>9} {loop * 1e3:>10.2f} {dicts * 1e3:>11.2f} {columnar * 1e3:>11.2f} "
+              f"{loop / dicts:>13.1f}x {loop / columnar:>13.1f}x")
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
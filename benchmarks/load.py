@@ -0,0 +1,392 @@
+"""Load-test the Streamlit app with many concurrent headless sessions.
+
+Run from the repository root:
+
+    python benchmarks/load.py                       # 10 users, 5k operations each
+    python benchmarks/load.py --users 1 10 25 50    # one round per concurrency level
+    python benchmarks/load.py --rows 50000 --iterations 3 --think 0.2
+    python benchmarks/load.py --users 5 --tabs 4    # 4 sessions per account
+
+Every simulated user is an `AppTest` session driving `app.py` the way a person
+would: log in, switch the dashboard time frame, add a transaction, visit every
+page through the sidebar and delete an operation. Time frame changes and adds
+only rerun the dashboard fragments that depend on them. The app talks to a local
+HTTP mock of the Spendly API (backed by MockBackend), so the numbers include
+real HTTP round-trips, response parsing and the response cache, but no
+network latency. Use `--latency` to add a fixed server delay per request.
+
+Reported per page: rerun count, p50/p95/max wall time and API calls per rerun;
+per round: throughput, errors, memory held in each session's state (alone and
+without the objects sessions share), shared cache occupancy and the growth
+of the process' peak RSS.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import resource
+import secrets
+import sys
+import threading
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from streamlit.runtime import Runtime  # noqa: E402
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache  # noqa: E402
+from streamlit.testing.v1 import AppTest, local_script_runner  # noqa: E402
+from streamlit.testing.v1.util import patch_config_options  # noqa: E402
+from benchmarks.synthetic import make_operations  # noqa: E402
+from services.mock_storage import MockBackend  # noqa: E402
+from services.shared_cache import shared_cache  # noqa: E402
+
+APP_PATH = str(ROOT / "app.py")
+TIME_FRAMES = ["Week", "Month", "Quarter", "Year"]
+PAGES = ["Operations", "Analytics", "Reports", "Settings", "Dashboard"]
+# Rerun timeout; cold sessions on large accounts can take a while under load
+RUN_TIMEOUT = 120
+
+# Per-rerun deprecation notices and the harness reading session state from the
+# main thread would drown the report
+for name in ("streamlit.deprecation_util",
+             "streamlit.runtime.scriptrunner_utils.script_run_context",
+             "streamlit.runtime.state.session_state_proxy"):
+    # A filter, as Streamlit resets logger levels when it loads its config
+    logging.getLogger(name).addFilter(lambda record: record.levelno >= logging.ERROR)
+
+_OPERATIONS = re.compile(r"^/balance/(\d+)/my-operations$")
+_ADD = re.compile(r"^/operations/(\d+)/add-(income|expense)$")
+_DELETE = re.compile(r"^/operations/(\d+)/delete-operation/(\d+)$")
+
+class MockAPI:
+    """The Spendly HTTP API served from a MockBackend on a local port.
+
+    Users are registered up front with `register`, each with its own history.
+    Every login gets a new token and requests are counted per token, so the
+    harness can attribute API calls to the session that made them.
+    """
+
+    def __init__(self, backend: MockBackend, latency: float = 0.0):
+        self.backend = backend
+        self.latency = latency
+        self.users = {}
+        self.tokens = {}
+        self.requests = defaultdict(int)
+        self._lock = threading.Lock()
+        self._server = None
+
+    def register(self, email, operations):
+        with self._lock:
+            user_id = self.users[email] = len(self.users) + 1
+        self.backend.seed(user_id, operations)
+
+    def login(self, email):
+        with self._lock:
+            user_id = self.users.get(email)
+            if user_id is None:
+                return None
+            token = secrets.token_hex(16)
+            self.tokens[token] = user_id
+        return {"user_id": user_id, "access_token": token, "currency": self.backend.currency}
+
+    def calls(self, token):
+        return self.requests[token] if token else 0
+
+    def start(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                api.handle(self, "GET")
+
+            def do_POST(self):
+                api.handle(self, "POST")
+
+            def do_DELETE(self):
+                api.handle(self, "DELETE")
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="mock-api", daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self):
+        self._server.shutdown()
+
+    def handle(self, request, method):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlsplit(request.path)
+        length = int(request.headers.get("Content-Length") or 0)
+        body = json.loads(request.rfile.read(length)) if length else None
+
+        if method == "POST" and url.path == "/auth/login":
+            user = self.login((body or {}).get("email"))
+            return self.reply(request, 200, user) if user else self.reply(request, 401, {"detail": "unknown user"})
+
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        user_id = self.tokens.get(token)
+        if user_id is None:
+            return self.reply(request, 401, {"detail": "invalid token"})
+        with self._lock:
+            self.requests[token] += 1
+
+        if method == "GET" and url.path == "/categories/all":
+            return self.reply(request, 200, self.backend.category_rows())
+        match = _OPERATIONS.match(url.path)
+        if method == "GET" and match and int(match[1]) == user_id:
+            query = parse_qs(url.query)
+            since_id, deleted_since = query.get("since_id"), query.get("deleted_since")
+            return self.reply(request, 200, self.backend.operations(
+                user_id, since_id=int(since_id[0]) if since_id else None,
+                deleted_since=int(deleted_since[0]) if deleted_since else None))
+        match = _ADD.match(url.path)
+        if method == "POST" and match and int(match[1]) == user_id:
+            return self.reply(request, 200, self.backend.add(user_id, dict(body, type=match[2])))
+        match = _DELETE.match(url.path)
+        if method == "DELETE" and match and int(match[1]) == user_id:
+            self.backend.delete(user_id, int(match[2]))
+            return self.reply(request, 200, {"deleted": int(match[2])})
+        return self.reply(request, 404, {"detail": "not found"})
+
+    def reply(self, request, status, payload):
+        content = json.dumps(payload).encode()
+        etag = f'"{hashlib.blake2b(content, digest_size=8).hexdigest()}"'
+        if status == 200 and request.command == "GET" and request.headers.get("If-None-Match") == etag:
+            status, content = 304, b""
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(content)))
+        if request.command == "GET":
+            request.send_header("ETag", etag)
+        request.end_headers()
+        request.wfile.write(content)
+
+def share_server_state():
+    """Make concurrent AppTest sessions share what a server shares between sessions.
+
+    AppTest installs a mock Runtime when a run starts and clears it when the
+    run ends, which breaks the sessions still running in other threads; it also
+    compiles the script anew for every run, and parallel `ast.parse` calls can
+    fail on CPython 3.11. A real server has one Runtime and one script cache.
+    """
+    shared = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            shared[:] = [cls._instance]
+        if not shared:
+            raise RuntimeError("Runtime hasn't been created!")
+        return shared[0]
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(shared))
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+
+def deep_size(obj, seen=None):
+    """Approximate bytes held by `obj`, following containers and object attributes."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)) or type(obj).__name__ == "deque":
+        return size + sum(deep_size(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += deep_size(getattr(obj, slot), seen)
+    return size
+
+def click(at, label):
+    for button in at.button:
+        if button.label == label:
+            button.click()
+            return
+    raise LookupError(f"no {label!r} button; page shows {[t.value for t in at.title]}, "
+                      f"{[e.value for e in [*at.error, *at.info, *at.exception]]}")
+
+class User:
+    """One simulated browser session and its measurements."""
+
+    def __init__(self, api, email, think):
+        self.api, self.email, self.think = api, email, think
+        self.at = AppTest.from_file(APP_PATH, default_timeout=RUN_TIMEOUT)
+        self.samples = []
+        self.errors = []
+
+    def step(self, page, action):
+        """Run the pending interaction and record its wall time and API calls."""
+        token = self.at.session_state.get("access_token")
+        calls = self.api.calls(token)
+        start = time.perf_counter()
+        self.at.run()
+        elapsed = time.perf_counter() - start
+        self.samples.append({
+            "page": page,
+            "action": action,
+            "ms": elapsed * 1e3,
+            "api_calls": self.api.calls(token or self.at.session_state.get("access_token")) - calls,
+        })
+        if self.at.exception:
+            self.errors.append(f"{page}/{action}: {self.at.exception[0].value}")
+        if self.think:
+            time.sleep(self.think)
+
+    def refresh(self):
+        """Untimed full rerun after fragment-only reruns.
+
+        AppTest keeps only the output of the fragments that reran, while a
+        browser keeps the rest of the page; this brings the other widgets back.
+        """
+        self.at.run()
+
+    def session(self, iterations):
+        self.step("login", "open")
+        self.at.text_input[0].input(self.email)
+        self.at.text_input[1].input("load-test")
+        click(self.at, "Login")
+        self.step("dashboard", "login")
+        for i in range(iterations):
+            for time_frame in TIME_FRAMES:
+                self.at.selectbox[0].select(time_frame)
+                self.step("dashboard", "time frame")
+            self.refresh()
+            description = next(w for w in self.at.text_input if w.label == "Description")
+            amount = next(w for w in self.at.number_input if w.label == "Amount")
+            description.input(f"Load test {i}")
+            amount.set_value(12.5)
+            click(self.at, "Add Transaction")
+            self.step("dashboard", "quick add")
+            self.refresh()
+            for page in PAGES:
+                self.at.sidebar.radio[0].set_value(page)
+                self.step(page.lower(), "navigate")
+                if page == "Operations":
+                    click(self.at, "🗑️ Delete Operation")
+                    self.step("operations", "delete")
+
+    def state_bytes(self, seen=None):
+        return deep_size(dict(self.at.session_state.items()), seen)
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else float("nan")
+
+def peak_rss_mib():
+    # ru_maxrss is in KiB on Linux (bytes on macOS)
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20
+
+def run_round(api, n_users, tabs, rows, iterations, think, round_id):
+    today = date.today()
+    history = make_operations(rows, seed=round_id, start=today - timedelta(days=3 * 365), days=3 * 365)
+    users = []
+    for i in range(n_users):
+        email = f"user{round_id}-{i}@load.test"
+        api.register(email, history)
+        # Several tabs are separate sessions of the same account
+        users += [User(api, email, think) for _ in range(tabs)]
+    n_sessions = len(users)
+
+    rss_before = peak_rss_mib()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_sessions, thread_name_prefix="load-user") as pool:
+        futures = [pool.submit(user.session, iterations) for user in users]
+    for user, future in zip(users, futures):
+        error = future.exception()
+        if error is not None:
+            user.errors.append(f"harness: {''.join(traceback.format_exception(error))}")
+    elapsed = time.perf_counter() - start
+
+    samples = [sample for user in users for sample in user.samples]
+    by_page = defaultdict(list)
+    for sample in samples:
+        by_page[sample["page"]].append(sample)
+
+    print(f"\n== {n_users} concurrent user(s) x {tabs} tab(s), {rows:,} operations each, "
+          f"{iterations} iteration(s)")
+    print(f"{'page':<12} {'reruns':>7} {'p50 (ms)':>9} {'p95 (ms)':>9} {'max (ms)':>9} {'API/rerun':>10}")
+    for page, page_samples in sorted(by_page.items()):
+        ms = [s["ms"] for s in page_samples]
+        calls = sum(s["api_calls"] for s in page_samples) / len(page_samples)
+        print(f"{page:<12} {len(ms):>7} {percentile(ms, 50):>9.1f} {percentile(ms, 95):>9.1f} "
+              f"{max(ms):>9.1f} {calls:>10.2f}")
+    ms = [s["ms"] for s in samples]
+    print(f"{'all':<12} {len(ms):>7} {percentile(ms, 50):>9.1f} {percentile(ms, 95):>9.1f} "
+          f"{max(ms, default=0):>9.1f} {sum(s['api_calls'] for s in samples) / max(len(samples), 1):>10.2f}")
+
+    state = [user.state_bytes() / 2 ** 20 for user in users]
+    # Objects shared between sessions (e.g. through the shared cache) counted once
+    seen = set()
+    unique = sum(user.state_bytes(seen) for user in users) / 2 ** 20
+    cache = shared_cache.stats()
+    print(f"throughput: {len(samples) / elapsed:.1f} reruns/s over {elapsed:.1f}s")
+    print(f"session state: {np.mean(state):.1f} MiB mean, {max(state):.1f} MiB max per session, "
+          f"{unique / n_sessions:.1f} MiB per session without shared objects")
+    print(f"shared cache: {cache['bytes'] / 2 ** 20:.1f} MiB in {cache['entries']} entries "
+          f"(budget {cache['budget'] / 2 ** 20:.0f} MiB, {cache['evictions']} evictions)")
+    print(f"peak RSS: {peak_rss_mib():.0f} MiB (+{peak_rss_mib() - rss_before:.0f} MiB this round)")
+    errors = [error for user in users for error in user.errors]
+    for error in errors[:10]:
+        print(f"ERROR {error}")
+    if len(errors) > 10:
+        print(f"... {len(errors) - 10} more error(s)")
+    return len(errors)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[10], help="concurrency levels, one round each")
+    parser.add_argument("--tabs", type=int, default=1, help="concurrent sessions per user")
+    parser.add_argument("--rows", type=int, default=5_000, help="operations per user")
+    parser.add_argument("--iterations", type=int, default=2, help="scenario repetitions per user")
+    parser.add_argument("--think", type=float, default=0.0, help="pause between interactions (s)")
+    parser.add_argument("--latency", type=float, default=0.0, help="mock API delay per request (s)")
+    args = parser.parse_args(argv)
+
+    api = MockAPI(MockBackend(), latency=args.latency)
+    # Read by app.py at every rerun
+    os.environ["STORAGE_BACKEND"] = "api"
+    os.environ["API_URL"] = api.start()
+    # AppTest resolves relative asset paths against the working directory
+    os.chdir(ROOT)
+    share_server_state()
+    # Runs patch the config per call; overlapping patches then restore each other
+    # out of order, so keep the same override active for the whole load test
+    try:
+        with patch_config_options({"global.appTest": True}):
+            errors = sum(run_round(api, n, args.tabs, args.rows, args.iterations, args.think, round_id)
+                         for round_id, n in enumerate(args.users, start=1))
+    finally:
+        api.stop()
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""Benchmark the app's hot paths on synthetic accounts, with saved baselines.
+
+Run from the repository root:
+
+    python benchmarks/run.py                      # 1k, 10k and 100k operations
+    python benchmarks/run.py --sizes 1000000      # a 1M-operation account
+    python benchmarks/run.py --only frame search  # cases whose name starts with these
+    python benchmarks/run.py --save               # record the results as the baseline
+
+Each case reports its best wall time over a few repetitions and its peak
+traced memory (measured in a separate run, as tracing slows allocation down).
+When a baseline file exists the results are compared with it and the runner
+exits with status 1 if any case got slower or bigger than the tolerance.
+
+The storage is the in-process MockBackend behind MockStorage, so the numbers
+exclude network time but include the same parsing and copying as API loads.
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd  # noqa: E402
+import streamlit as st  # noqa: E402
+from benchmarks.synthetic import make_operations  # noqa: E402
+from services.balance_calculator import BalanceCalculator  # noqa: E402
+from services.data_manager import DataManager  # noqa: E402
+from services.exporter import export_operations  # noqa: E402
+from services.mock_storage import MockBackend, MockStorage  # noqa: E402
+from services.operation_store import OperationStore  # noqa: E402
+from services.operations_frame import build_operations_frame, filter_operations  # noqa: E402
+from services.pagination import OperationsPager  # noqa: E402
+from services.rollups import Rollup  # noqa: E402
+from services.search_index import SearchIndex  # noqa: E402
+from services.series import balance_series  # noqa: E402
+from services.shared_cache import shared_cache  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+# Excel writing is far slower than the other formats; larger accounts skip it
+EXCEL_MAX_ROWS = 10_000
+
+# Session state is used outside a Streamlit server here ("bare mode")
+for name in ("streamlit.runtime.scriptrunner_utils.script_run_context",
+             "streamlit.runtime.state.session_state_proxy"):
+    logging.getLogger(name).setLevel(logging.ERROR)
+
+def fake_storage(operations):
+    """MockStorage logged in as a user whose history is `operations`."""
+    backend = MockBackend()
+    storage = MockStorage(backend)
+    st.session_state.clear()
+    storage.login("bench@example.com", "bench")
+    backend.seed(st.session_state["user_id"], operations)
+    return storage
+
+def cold_session(storage, warm_process=False):
+    """What a fresh session does before the dashboard renders.
+
+    With `warm_process`, another session of the same user already loaded the
+    data (a second tab), so derived data comes from the shared cache.
+    """
+    st.session_state.pop(DataManager.SNAPSHOT_KEY, None)
+    if not warm_process:
+        shared_cache.clear()
+    data_manager = DataManager(storage)
+    data_manager.begin_run()
+    data_manager.get_rollup()
+    return data_manager.get_current_balance()
+
+def build_cases(n):
+    """(name, function) pairs for an account of `n` operations; setup happens here, untimed."""
+    operations = make_operations(n)
+    storage = fake_storage(operations)
+    # What the storages return: the compact store, not the dicts
+    store = storage.load()
+    frame = build_operations_frame(store)
+    rollup = Rollup.from_frame(frame)
+    last_day = frame["entry_date"].iloc[-1]
+    month_start, year_start = last_day - pd.Timedelta(days=30), last_day - pd.Timedelta(days=365)
+    categories = frame["category"].cat.categories[:3].tolist()
+    index = SearchIndex.build(store)
+
+    def period_metrics():
+        # render_key_metrics: current and previous window totals, latest transaction
+        current = rollup.window_totals(month_start, last_day)
+        previous = rollup.window_totals(month_start - (last_day - month_start), month_start, include_end=False)
+        return current, previous, rollup.latest_in_window(month_start, last_day)
+
+    cases = [
+        ("storage.load", storage.load),
+        ("store.convert", lambda: OperationStore.from_records(operations)),
+        ("session.cold_start", lambda: cold_session(storage)),
+        ("session.second_tab", lambda: cold_session(storage, warm_process=True)),
+        # A fresh store per call, as a new data version would bring
+        ("balance.total", lambda: BalanceCalculator.calculate_total_balance(store.take(slice(None)))),
+        ("balance.categories", lambda: BalanceCalculator.calculate_category_totals(store.take(slice(None)))),
+        ("balance.types", lambda: BalanceCalculator.calculate_type_totals(store.take(slice(None)))),
+        ("frame.build", lambda: build_operations_frame(store)),
+        ("rollup.build", lambda: Rollup.from_frame(frame)),
+        ("metrics.period", period_metrics),
+        ("analytics.categories", rollup.category_expenses),
+        ("analytics.monthly", rollup.monthly_totals),
+        ("analytics.balance_series", lambda: balance_series(rollup)),
+        ("operations.filter", lambda: filter_operations(
+            frame, start=year_start, end=last_day, types=["expense"], categories=categories)),
+        ("operations.page", lambda: OperationsPager(frame, sort_by="amount").page(size=50)),
+        ("search.build", lambda: SearchIndex.build(store)),
+        ("search.query", lambda: index.search("coffee", limit=50)),
+        ("export.csv", lambda: export_operations(frame, "CSV")),
+        ("export.csv_gzip", lambda: export_operations(frame, "CSV (gzip)")),
+    ]
+    try:
+        import pyarrow  # noqa: F401
+        cases.append(("export.parquet", lambda: export_operations(frame, "Parquet")))
+    except ImportError:
+        pass
+    if n <= EXCEL_MAX_ROWS:
+        cases.append(("export.excel", lambda: export_operations(frame, "Excel")))
+    return cases
+
+def measure(fn, min_time=0.2, max_repeat=20, slow=2.0):
+    """Best wall time (s) over repetitions filling about `min_time`, and peak traced MiB.
+
+    Cases run at least three times unless they have already taken `slow` seconds.
+    """
+    best, spent, runs = float("inf"), 0.0, 0
+    while runs < max_repeat and ((runs < 3 and spent < slow) or spent < min_time):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best, spent, runs = min(best, elapsed), spent + elapsed, runs + 1
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak / 2 ** 20
+
+def compare(results, baseline, tolerance):
+    """Lines describing cases that regressed beyond `tolerance` (a fraction)."""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric, floor in (("seconds", 1e-3), ("peak_mib", 0.5)):
+            # Tiny values are dominated by noise
+            if result[metric] > max(reference[metric], floor) * (1 + tolerance):
+                regressions.append(f"{key}: {metric} {reference[metric]:.4g} -> {result[metric]:.4g}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--only", nargs="+", help="case name prefixes to run")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown/growth (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text())["cases"] if args.baseline.exists() else {}
+    results = {}
+    print(f"{'case':<26} {'rows':>9} {'best (ms)':>11} {'peak (MiB)':>11} {'vs base':>8}")
+    for n in args.sizes:
+        for name, fn in build_cases(n):
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            seconds, peak = measure(fn)
+            key = f"{name}@{n}"
+            results[key] = {"seconds": seconds, "peak_mib": peak}
+            reference = baseline.get(key)
+            ratio = f"{seconds / reference['seconds']:.2f}x" if reference else "-"
+            print(f"{name:<26} {n:>9} {seconds * 1e3:>11.2f} {peak:>11.1f} {ratio:>8}")
+
+    if args.save:
+        merged = dict(baseline, **results)
+        args.baseline.write_text(json.dumps({
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "cases": dict(sorted(merged.items())),
+        }, indent=2) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
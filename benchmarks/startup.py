@@ -0,0 +1,96 @@
+"""Measure how long a fresh server process takes to show the login page.
+
+Run from the repository root:
+
+    python benchmarks/startup.py             # median of 5 fresh processes
+    python benchmarks/startup.py --runs 10
+
+Each run starts a new interpreter (so nothing is imported or cached yet) that
+renders `app.py` headlessly with AppTest, using the offline mock storage:
+
+- `streamlit`: importing Streamlit itself, a floor no app change can lower
+- `login (cold)`: first render of the login page, including the app's imports
+- `login (rerun)`: the next rerun of the login page
+- `first page`: logging in and rendering the dashboard
+
+and lists which heavy libraries were imported by the time the login page was
+shown. The background import of the pages started from the login page is
+turned off (PRELOAD_PAGES=0) to keep the measurements deterministic, so
+`first page` is the worst case of a visitor logging in before it finished.
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ["pandas", "numpy", "plotly.express", "sqlalchemy", "pyarrow"]
+STEPS = ["process", "streamlit", "login (cold)", "login (rerun)", "first page"]
+
+def timed_run(at):
+    # Collect first: the garbage of the previous step would otherwise be
+    # collected (and timed) during this one
+    gc.collect()
+    start = time.perf_counter()
+    at.run()
+    return time.perf_counter() - start
+
+def child():
+    """One measurement in this (fresh) process; prints a JSON line."""
+    timings = {}
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    timings["streamlit"] = time.perf_counter() - start
+
+    os.chdir(ROOT)
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=60)
+    timings["login (cold)"] = timed_run(at)
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    timings["login (rerun)"] = timed_run(at)
+
+    at.text_input[0].input("startup@example.com")
+    at.text_input[1].input("startup")
+    next(button for button in at.button if button.label == "Login").click()
+    timings["first page"] = timed_run(at)
+    if at.exception:
+        raise SystemExit(f"app raised: {at.exception[0].value}")
+    print(json.dumps({"timings": timings, "loaded": loaded}))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        child()
+        return 0
+
+    env = dict(os.environ, STORAGE_BACKEND="mock", PRELOAD_PAGES="0")
+    env.pop("LOCAL_CACHE_URL", None)
+    samples, loaded = {step: [] for step in STEPS}, None
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, __file__, "--child"], env=env, cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        )
+        samples["process"].append(time.perf_counter() - start)
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        for step, seconds in report["timings"].items():
+            samples[step].append(seconds)
+        loaded = report["loaded"]
+
+    print(f"{'step':<16} {'median (ms)':>12} {'min (ms)':>10}")
+    for step in STEPS:
+        print(f"{step:<16} {statistics.median(samples[step]) * 1e3:>12.1f} {min(samples[step]) * 1e3:>10.1f}")
+    print(f"imported at login: {', '.join(loaded) or 'none of ' + ', '.join(HEAVY_MODULES)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
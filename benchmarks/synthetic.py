@@ -0,0 +1,51 @@
+"""Synthetic Spendly accounts for benchmarks.
+
+Operations are shaped like API rows (signed amounts, expenses negative) and
+look like a real history: a monthly salary and rent, recurring payees with
+repeated descriptions, and many small card payments, dated chronologically.
+"""
+from datetime import date
+from typing import Dict, List
+import numpy as np
+
+CATEGORIES = ['Food', 'Transport', 'Housing', 'Entertainment', 'Utilities', 'Salary', 'Other']
+
+PAYEES = {
+    'Food': ['Carrefour', 'Lidl', 'Coffee shop', 'Bakery', 'Pizza delivery', 'Sushi bar'],
+    'Transport': ['Uber trip', 'Metro pass', 'Fuel station', 'Train ticket', 'Parking'],
+    'Housing': ['Rent', 'Home insurance', 'Furniture store'],
+    'Entertainment': ['Cinema', 'Streaming subscription', 'Concert tickets', 'Bookshop'],
+    'Utilities': ['Electricity bill', 'Water bill', 'Internet provider', 'Mobile plan'],
+    'Other': ['Pharmacy', 'Gift', 'ATM withdrawal', 'Bank fees'],
+}
+
+def make_operations(n: int, seed: int = 0, start: date = date(2015, 1, 1), days: int = 10 * 365) -> List[Dict]:
+    """`n` operations spread over `days` days from `start`, with entry ids 1..n."""
+    rng = np.random.default_rng(seed)
+    day_offsets = np.sort(rng.integers(0, days, size=n))
+    dates = (np.datetime64(start) + day_offsets).astype(str)
+
+    categories = rng.choice(len(CATEGORIES), size=n, p=[0.3, 0.15, 0.08, 0.12, 0.1, 0.05, 0.2])
+    amounts = np.round(rng.lognormal(mean=3.0, sigma=1.0, size=n), 2) + 0.01
+    salary = categories == CATEGORIES.index('Salary')
+    amounts[salary] = np.round(rng.normal(2800, 300, size=int(salary.sum())), 2)
+    signed = np.where(salary, amounts, -amounts)
+    variants = rng.integers(0, 50, size=n)
+
+    operations = []
+    for i in range(n):
+        category = CATEGORIES[categories[i]]
+        if category == 'Salary':
+            description = 'Salary ACME Corp'
+        else:
+            payees = PAYEES[category]
+            description = f"{payees[variants[i] % len(payees)]} #{variants[i]}"
+        operations.append({
+            'entry_id': i + 1,
+            'entry_date': dates[i],
+            'description': description,
+            'amount': float(signed[i]),
+            'type': 'income' if signed[i] > 0 else 'expense',
+            'category': category,
+        })
+    return operations
@@ -0,0 +1,19 @@
+# components/loading_placeholder.py
+import streamlit as st
+from services import instrumentation
+
+# Key of the placeholder fragment, and how often it checks whether the data is in
+LOADING_FRAGMENT = "loading_placeholder"
+LOADING_POLL = "250ms"
+
+@st.fragment(key=LOADING_FRAGMENT, run_every=LOADING_POLL)
+def render_loading_placeholder(data_manager) -> None:
+    """Shown instead of the page while the post-login warm-up loads the data.
+
+    The rest of the screen is already rendered; once the data is in, the
+    whole app reruns and the page replaces the placeholder.
+    """
+    with instrumentation.fragment_run(LOADING_FRAGMENT):
+        if not data_manager.loading():
+            st.rerun()
+        st.info("⏳ Loading your operations...")
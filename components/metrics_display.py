@@ -1,6 +1,7 @@
 # components/metrics_display.py
 import streamlit as st
 import pandas as pd
+from services import instrumentation
 
 def get_period_label(start_date, end_date):
     delta_days = (end_date - start_date).days
@@ -20,14 +21,12 @@ def get_period_label(start_date, end_date):
     else:
         return f"these {delta_days} days"
 
+@instrumentation.timed("render")
 def render_key_metrics(data_manager, start_date, end_date) -> None:
-    operations = data_manager.get_operations()
-    if not operations:
+    rollup = data_manager.get_rollup()
+    if rollup.empty:
         return
 
-    df = pd.DataFrame(operations)
-    df['entry_date'] = pd.to_datetime(df['entry_date'])  # Use 'entry_date' instead of 'entry_date'
-
     # Ensure dates are datetime objects
     current_start = pd.to_datetime(start_date)
     current_end = pd.to_datetime(end_date)
@@ -37,13 +36,13 @@ def render_key_metrics(data_manager, start_date, end_date) -> None:
     previous_start = current_start - period_length
     previous_end = current_start
 
-    current_df = df[(df['entry_date'] >= current_start) & (df['entry_date'] <= current_end)]
-    current_income = current_df[current_df['type'] == 'income']['amount'].sum()
-    current_expenses = current_df[current_df['type'] == 'expense']['amount'].sum()
-    current_net = current_income - current_expenses
+    # Window totals come from the daily rollup, not from the raw operations
+    current = rollup.window_totals(current_start, current_end)
+    current_expenses = current['expense']
+    current_net = current['net']
 
-    previous_df = df[(df['entry_date'] >= previous_start) & (df['entry_date'] < previous_end)]
-    previous_expenses = previous_df[previous_df['type'] == 'expense']['amount'].sum()
+    previous = rollup.window_totals(previous_start, previous_end, include_end=False)
+    previous_expenses = previous['expense']
 
     # Get dynamic period label
     period_label = get_period_label(current_start, current_end)
@@ -78,7 +77,7 @@ def render_key_metrics(data_manager, start_date, end_date) -> None:
         )
 
     with col3:
-        latest_transaction = current_df.iloc[-1] if not current_df.empty else None
+        latest_transaction = rollup.latest_in_window(current_start, current_end)
         if latest_transaction is not None:
             tx_type = latest_transaction['type']
             delta_color = "normal" if tx_type == "income" else "off"
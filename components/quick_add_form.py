@@ -1,32 +1,52 @@
 # components/quick_add_form.py
 import streamlit as st
 from datetime import datetime
+from typing import Sequence
+from services import instrumentation
 
-def render_quick_add_form(data_manager) -> None:
-    with st.form("quick_add", clear_on_submit=True):
-        description = st.text_input("Description")
-        amount = st.number_input("Amount", min_value=0.0, step=0.01)
-        col1, col2 = st.columns(2)
-        with col1:
-            op_type = st.selectbox("Type", ['expense', 'income'])
-        with col2:
-            # Get categories from database
-            categories = data_manager.get_categories()
-            default_categories = ['Food', 'Transport', 'Housing', 'Entertainment', 'Utilities', 'Salary', 'Other']
-            category_list = categories if categories else default_categories
-            category = st.selectbox("Category", category_list)
-        
-        if st.form_submit_button("Add Transaction", use_container_width=True):
-            try:
-                new_operation = {
-                    'entry_date': datetime.now().strftime('%Y-%m-%d'),
-                    'description': description,
-                    'amount': amount,
-                    'type': op_type,
-                    'category': category
-                }
-                data_manager.add_operation(new_operation)
-                st.success("Transaction added!")
-                st.rerun()
-            except Exception as e:
-                st.error(f"Error adding transaction: {str(e)}")
\ No newline at end of file
+# Key of the quick add fragment
+QUICK_ADD_FRAGMENT = "quick_add"
+_RESULT_KEY = "quick_add_result"
+
+def _submit(data_manager, refresh: Sequence[str]) -> None:
+    """Form callback: queue the operation, then rerun only the fragments showing operations."""
+    state = st.session_state
+    try:
+        new_operation = {
+            'entry_date': datetime.now().strftime('%Y-%m-%d'),
+            'description': state["quick_add_description"],
+            'amount': state["quick_add_amount"],
+            'type': state["quick_add_type"],
+            'category': state["quick_add_category"]
+        }
+        data_manager.add_operation(new_operation)
+        state[_RESULT_KEY] = ("success", "Transaction added!")
+    except Exception as e:
+        state[_RESULT_KEY] = ("error", f"Error adding transaction: {str(e)}")
+        refresh = ()
+    st.rerun([QUICK_ADD_FRAGMENT, *refresh])
+
+@st.fragment(key=QUICK_ADD_FRAGMENT)
+def render_quick_add_form(data_manager, refresh: Sequence[str] = ()) -> None:
+    """Quick add form; `refresh` are the keys of the fragments to rerun after an add."""
+    with instrumentation.fragment_run(QUICK_ADD_FRAGMENT):
+        with st.form("quick_add", clear_on_submit=True):
+            st.text_input("Description", key="quick_add_description")
+            st.number_input("Amount", min_value=0.0, step=0.01, key="quick_add_amount")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.selectbox("Type", ['expense', 'income'], key="quick_add_type")
+            with col2:
+                # Get categories from database
+                categories = data_manager.get_categories()
+                default_categories = ['Food', 'Transport', 'Housing', 'Entertainment', 'Utilities', 'Salary', 'Other']
+                category_list = categories if categories else default_categories
+                st.selectbox("Category", category_list, key="quick_add_category")
+
+            st.form_submit_button("Add Transaction", use_container_width=True,
+                                  on_click=_submit, args=(data_manager, tuple(refresh)))
+
+        result = st.session_state.pop(_RESULT_KEY, None)
+        if result is not None:
+            kind, message = result
+            (st.success if kind == "success" else st.error)(message)
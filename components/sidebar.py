@@ -1,5 +1,13 @@
 # components/sidebar.py
 import streamlit as st
+from services import auth_session, instrumentation
+
+# Key of the stats fragment, for widgets that change the operations; the write
+# status fragment is nested in it
+STATS_FRAGMENT = "sidebar_stats"
+WRITE_STATUS_FRAGMENT = "sidebar_write_status"
+# How often the write status refreshes itself while writes are in flight
+WRITE_STATUS_POLL = "2s"
 
 def render_sidebar(data_manager) -> str:
     st.sidebar.title("Finance Manager 💰")
@@ -14,26 +22,65 @@ def render_sidebar(data_manager) -> str:
     
     st.sidebar.markdown("---")
     st.sidebar.markdown("### Quick Stats")
+    # Reruns on its own when the operations change (see STATS_FRAGMENT)
+    with st.sidebar:
+        render_sidebar_stats(data_manager)
 
-    currency_symbol = st.session_state.get("currency_symbol", "€")  # Default to "€" if not set
-
-    try:
-        operations = data_manager.get_operations()
-        if operations:
-            import pandas as pd
-            df = pd.DataFrame(operations)
-            total_income = df[df['type'] == 'income']['amount'].sum()
-            total_expenses = df[df['type'] == 'expense']['amount'].sum()
-            st.sidebar.metric("Total Income", f"{total_income:,.2f}{currency_symbol}")
-            st.sidebar.metric("Total Expenses", f"{total_expenses:,.2f}{currency_symbol}")
-    except Exception as e:
-        st.sidebar.error("Failed to fetch operations. Please try again.")
-        print(f"Error fetching operations: {e}")
+    if st.sidebar.button("🔄 Refresh data"):
+        data_manager.refresh()
+        st.rerun()
     
     # Logout button (only show if logged in)
     if st.session_state.get("logged_in"):
         if st.sidebar.button("Logout"):
-            st.session_state.clear()  # Clear all session state
+            # Queued writes live in the session, so store them before it is cleared
+            data_manager.flush_writes(wait=True)
+            auth_session.end_login()  # Revokes the token and clears all session state
             st.rerun()
     
-    return selected.lower()  # Ensure the page name matches the routing logic
\ No newline at end of file
+    return selected.lower()  # Ensure the page name matches the routing logic
+
+@st.fragment(key=STATS_FRAGMENT)
+def render_sidebar_stats(data_manager) -> None:
+    """Totals and write status; call inside `with st.sidebar:` (fragments cannot target it otherwise)."""
+    with instrumentation.fragment_run(STATS_FRAGMENT):
+        currency_symbol = st.session_state.get("currency_symbol", "€")  # Default to "€" if not set
+
+        try:
+            if data_manager.loading():
+                # Filled in by the full rerun that follows the post-login warm-up
+                st.caption("Loading...")
+            elif data_manager.has_operations():
+                totals = data_manager.get_type_totals()
+                st.metric("Total Income", f"{totals['income']:,.2f}{currency_symbol}")
+                st.metric("Total Expenses", f"{totals['expense']:,.2f}{currency_symbol}")
+        except Exception as e:
+            st.error("Failed to fetch operations. Please try again.")
+            print(f"Error fetching operations: {e}")
+
+        status = data_manager.get_write_status()
+        if status["pending"] or status["failed"]:
+            render_write_status(data_manager)
+
+@st.fragment(key=WRITE_STATUS_FRAGMENT, run_every=WRITE_STATUS_POLL)
+def render_write_status(data_manager) -> None:
+    """Pending and failed writes; only rendered while there are some.
+
+    Background flushes finish without any widget event, so the fragment polls:
+    each rerun settles the writes confirmed since (fragment reruns skip
+    begin_run) and shows what is left.
+    """
+    with instrumentation.fragment_run(WRITE_STATUS_FRAGMENT):
+        data_manager.sync_writes()
+        status = data_manager.get_write_status()
+        if status["pending"]:
+            st.caption(f"⏳ {status['pending']} change(s) waiting to sync")
+        if status["failed"]:
+            st.warning(f"{status['failed']} change(s) could not be saved: {status['error']}")
+            col1, col2 = st.columns(2)
+            if col1.button("Retry"):
+                data_manager.retry_failed_writes()
+                st.rerun()
+            if col2.button("Discard"):
+                data_manager.discard_failed_writes()
+                st.rerun()
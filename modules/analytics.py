@@ -1,18 +1,57 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from services.series import DEFAULT_POINT_BUDGET
+
+# Figure builders for DataManager.get_chart: they only run when the data or
+# their parameters changed, otherwise the cached figure is reused as it is
+
+def _expense_pie(data_manager, currency: str) -> go.Figure:
+    fig = px.pie(
+        data_manager.get_category_expenses(),
+        values='amount',
+        names='category',
+        title='Expense Distribution'
+    )
+    fig.update_traces(hovertemplate=f"%{{label}}: %{{value:.2f}}{currency}<extra></extra>")
+    return fig
+
+def _monthly_bars(data_manager, currency: str) -> go.Figure:
+    monthly_data = data_manager.get_rollup().monthly_totals()
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=monthly_data.index,
+        y=monthly_data['expense'],
+        name='Expenses',
+        marker_color='red'
+    ))
+    fig.add_trace(go.Bar(
+        x=monthly_data.index,
+        y=monthly_data['income'],
+        name='Income',
+        marker_color='green'
+    ))
+    fig.update_layout(barmode='group', title='Monthly Income vs Expenses', yaxis_ticksuffix=currency)
+    return fig
+
+def _balance_line(data_manager, currency: str, max_points: int) -> go.Figure:
+    # Vectorized daily-close balance, decimated to the chart point budget
+    fig = px.line(
+        data_manager.get_balance_series(max_points),
+        x='entry_date',
+        y='cumulative_balance',
+        title='Balance Over Time'
+    )
+    fig.update_layout(yaxis_ticksuffix=currency)
+    return fig
 
 def render_analytics(data_manager) -> None:
     st.title("📈 Financial Analytics")
 
     currency_symbol = st.session_state.get("currency_symbol", "€")
     
-    operations = data_manager.get_operations()
-    if operations:
-        df = pd.DataFrame(operations)
-        df['entry_date'] = pd.to_datetime(df['entry_date'])
-        
+    if data_manager.has_operations():
         tab1, tab2, tab3 = st.tabs(["Category Analysis", "Time Analysis", "Trends"])
         
         with tab1:
@@ -20,20 +59,13 @@ def render_analytics(data_manager) -> None:
             
             with col1:
                 st.subheader("Expenses by Category")
-                expenses = df[df['type'] == 'expense']
-                category_sum = expenses.groupby('category')['amount'].sum().reset_index()
-                fig = px.pie(
-                    category_sum,
-                    values='amount',
-                    names='category',
-                    title='Expense Distribution'
-                )
+                fig = data_manager.get_chart("expense_pie", _expense_pie, currency=currency_symbol)
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
                 st.subheader("Category Breakdown")
                 st.dataframe(
-                    category_sum,
+                    data_manager.get_category_expenses(),
                     column_config={
                         "category": "Category",
                         "amount": st.column_config.NumberColumn(
@@ -46,44 +78,14 @@ def render_analytics(data_manager) -> None:
         
         with tab2:
             st.subheader("Monthly Trends")
-            df['month'] = df['entry_date'].dt.strftime('%Y-%m')
-            monthly_data = df.pivot_table(
-                index='month',
-                columns='type',
-                values='amount',
-                aggfunc='sum'
-            ).fillna(0)
-            
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                x=monthly_data.index,
-                y=monthly_data['expense'],
-                name='Expenses',
-                marker_color='red'
-            ))
-            fig.add_trace(go.Bar(
-                x=monthly_data.index,
-                y=monthly_data['income'],
-                name='Income',
-                marker_color='green'
-            ))
-            fig.update_layout(barmode='group', title='Monthly Income vs Expenses')
+            fig = data_manager.get_chart("monthly_bars", _monthly_bars, currency=currency_symbol)
             st.plotly_chart(fig, use_container_width=True)
         
         with tab3:
             st.subheader("Balance Trend")
-            df_sorted = df.sort_values('entry_date')
-            df_sorted['cumulative_balance'] = df_sorted.apply(
-                lambda x: x['amount'] if x['type'] == 'income' else -x['amount'],
-                axis=1
-            ).cumsum()
-            
-            fig = px.line(
-                df_sorted,
-                x='entry_date',
-                y='cumulative_balance',
-                title='Balance Over Time'
-            )
+            point_budget = st.session_state.get("chart_point_budget", DEFAULT_POINT_BUDGET)
+            fig = data_manager.get_chart("balance_line", _balance_line,
+                                         currency=currency_symbol, max_points=point_budget)
             st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No data available for analysis. Add some transactions first!")
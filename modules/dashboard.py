@@ -2,68 +2,89 @@
 import streamlit as st
 from components.quick_add_form import render_quick_add_form
 from components.metrics_display import render_key_metrics
+from components.sidebar import STATS_FRAGMENT
 from datetime import datetime, timedelta
+from services import instrumentation
 
-def render_dashboard(data_manager) -> None:
-    st.title("📊 Financial Dashboard")
-    
-    currency_symbol = st.session_state.get("currency_symbol", "€")
+# Dashboard fragments, each rerunning on its own
+METRICS_FRAGMENT = "dashboard_metrics"
+ACTIVITY_FRAGMENT = "dashboard_activity"
+
+# Fragments to rerun when a piece of state changes: the time frame only feeds the
+# metrics and the activity table; the operations also feed the sidebar stats, whose
+# rerun renders the write status nested in it (only present while writes are pending,
+# so it cannot be a target itself)
+DEPENDENTS = {
+    "time_frame": [METRICS_FRAGMENT, ACTIVITY_FRAGMENT],
+    "operations": [METRICS_FRAGMENT, ACTIVITY_FRAGMENT, STATS_FRAGMENT],
+}
 
-    # Time Frame Selector
-    time_frame = st.selectbox(
-        "Select Time Frame",
-        ["Week", "Month", "Quarter", "Year", "Custom"]
-    )
-    
-    # Get date range based on selection
+def _rerun_time_frame_dependents() -> None:
+    st.rerun(DEPENDENTS["time_frame"])
+
+def selected_range():
+    """(start, end) of the time frame chosen in the metrics fragment."""
+    time_frame = st.session_state.get("dashboard_time_frame", "Week")
     end_date = datetime.now()
-    
     if time_frame == "Custom":
-        date_range = st.date_input(
-            "Select date range",
-            value=(end_date - timedelta(days=7), end_date),
-            max_value=end_date
-        )
+        date_range = st.session_state.get("dashboard_custom_range", ())
         if len(date_range) == 2:
-            start_date, end_date = date_range
-        else:
-            start_date = end_date - timedelta(days=7)
-    else:
-        if time_frame == "Week":
-            start_date = end_date - timedelta(days=7)
-        elif time_frame == "Month":
-            start_date = end_date - timedelta(days=30)
-        elif time_frame == "Quarter":
-            start_date = end_date - timedelta(days=90)
-        else:  # Last year
-            start_date = end_date - timedelta(days=365)
-    
-    # Render Key Metrics with guaranteed non-None dates
-    render_key_metrics(data_manager, start_date, end_date)
-    
+            return date_range
+        return end_date - timedelta(days=7), end_date
+    days = {"Week": 7, "Month": 30, "Quarter": 90, "Year": 365}[time_frame]
+    return end_date - timedelta(days=days), end_date
+
+def render_dashboard(data_manager) -> None:
+    st.title("📊 Financial Dashboard")
+
+    render_metrics(data_manager)
+
     col1, col2 = st.columns([2, 1])
     with col1:
         st.subheader("Recent Activity")
-        
-        # Fetch and filter operations
-        operations = data_manager.get_operations()
-        if operations:
-            import pandas as pd
-            
-            # Convert operations into a DataFrame
-            df = pd.DataFrame(operations)
-            
-            # Ensure 'entry_date' column is in datetime format
-            if "entry_date" in df.columns:
-                df["entry_date"] = pd.to_datetime(df["entry_date"])
-            
-            # Filter operations by the selected date range
-            filtered_df = df[(df["entry_date"] >= pd.to_datetime(start_date)) & 
-                           (df["entry_date"] <= pd.to_datetime(end_date))]
-            
-            # Reverse order of operations (latest first)
-            filtered_df = filtered_df.sort_values(by="entry_date", ascending=False)
-            
+        render_activity(data_manager)
+
+    with col2:
+        st.subheader("Quick Add")
+        render_quick_add_form(data_manager, refresh=DEPENDENTS["operations"])
+
+@st.fragment(key=METRICS_FRAGMENT)
+def render_metrics(data_manager) -> None:
+    with instrumentation.fragment_run(METRICS_FRAGMENT):
+        # Time Frame Selector; a change reruns this fragment and the activity table only
+        time_frame = st.selectbox(
+            "Select Time Frame",
+            ["Week", "Month", "Quarter", "Year", "Custom"],
+            key="dashboard_time_frame",
+            on_change=_rerun_time_frame_dependents,
+        )
+        if time_frame == "Custom":
+            end_date = datetime.now()
+            st.date_input(
+                "Select date range",
+                value=(end_date - timedelta(days=7), end_date),
+                max_value=end_date,
+                key="dashboard_custom_range",
+                on_change=_rerun_time_frame_dependents,
+            )
+
+        start_date, end_date = selected_range()
+        # Render Key Metrics with guaranteed non-None dates
+        render_key_metrics(data_manager, start_date, end_date)
+
+@st.fragment(key=ACTIVITY_FRAGMENT)
+def render_activity(data_manager) -> None:
+    with instrumentation.fragment_run(ACTIVITY_FRAGMENT):
+        currency_symbol = st.session_state.get("currency_symbol", "€")
+        start_date, end_date = selected_range()
+
+        # Fetch operations of the selected date range (sliced from the sorted date index)
+        if data_manager.has_operations():
+            filtered_df = data_manager.get_operations_between(start_date, end_date)
+
+            # Reverse order of operations (latest first); the frame is already date-sorted
+            filtered_df = filtered_df.iloc[::-1]
+
             # Display the filtered DataFrame
             if not filtered_df.empty:
                 st.dataframe(
@@ -89,13 +110,9 @@ def render_dashboard(data_manager) -> None:
                     },
                     hide_index=True
                 )
-                
+
                 st.caption(f"Showing transactions from {start_date.strftime('%B %d, %Y')} to {end_date.strftime('%B %d, %Y')}")
             else:
                 st.info(f"No activity found between {start_date.strftime('%B %d, %Y')} and {end_date.strftime('%B %d, %Y')}")
         else:
             st.info("No recent activity.")
-    
-    with col2:
-        st.subheader("Quick Add")
-        render_quick_add_form(data_manager)
\ No newline at end of file
@@ -1,9 +1,11 @@
 # modules/login.py
+from typing import Callable, Optional
 import streamlit as st
+from services import auth_session
 from services.api_manager import APIStorage
 
-def render_login(storage: APIStorage):
-    """Render the full-page login form."""
+def render_login(storage: APIStorage, on_login: Optional[Callable[[], None]] = None):
+    """Render the full-page login form; `on_login` runs once the user is authenticated."""
     st.markdown(
         """
         <style>
@@ -69,6 +71,11 @@ def render_login(storage: APIStorage):
     # Title
     st.markdown("<h1 style='text-align: center; margin-bottom: 1.5rem;'>🔑 Login</h1>", unsafe_allow_html=True)
 
+    # Why the session was logged out, if it was (cleared by the next login)
+    notice = st.session_state.get(auth_session.NOTICE_KEY)
+    if notice:
+        st.info(notice)
+
     # Username and password fields
     username = st.text_input("Username", placeholder="Enter your username")
     password = st.text_input("Password", type="password", placeholder="Enter your password")
@@ -80,6 +87,8 @@ def render_login(storage: APIStorage):
         else:
             with st.spinner("Logging in..."):  # Show loading spinner
                 if storage.login(username, password):
+                    if on_login is not None:
+                        on_login()
                     st.success("Logged in successfully!")
                     st.session_state["logged_in"] = True
                     st.rerun()  # Rerun to update the app
@@ -1,25 +1,30 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+from services.importer import IMPORT_FORMATS, guess_mapping, iter_csv, iter_ofx, read_csv_header
+from services.operations_frame import date_span
+from services.pagination import SORT_COLUMNS
+
+PAGE_SIZES = [25, 50, 100, 250]
+PICKER_LIMIT = 50
 
 def render_operations(data_manager) -> None:
     st.title("💼 Operations Management")
 
     currency_symbol = st.session_state.get("currency_symbol", "€")
     
-    tab1, tab2, tab3 = st.tabs(["All Operations", "Search", "Edit"])
+    tab1, tab2, tab3, tab4 = st.tabs(["All Operations", "Search", "Edit", "Import"])
     
     with tab1:
-        operations = data_manager.get_operations()
-        if operations:
-            df = pd.DataFrame(operations)
-            df['entry_date'] = pd.to_datetime(df['entry_date'])
+        df = data_manager.get_operations_frame()
+        if not df.empty:
+            categories = df['category'].cat.categories.tolist()
             
             col1, col2, col3 = st.columns(3)
             with col1:
                 date_range = st.date_input(
                     "Date Range",
-                    [df['entry_date'].min(), df['entry_date'].max()]
+                    date_span(df)
                 )
             with col2:
                 type_filter = st.multiselect(
@@ -30,20 +35,30 @@ def render_operations(data_manager) -> None:
             with col3:
                 category_filter = st.multiselect(
                     "Category",
-                    options=df['category'].unique(),
-                    default=df['category'].unique()
+                    options=categories,
+                    default=categories
                 )
-            
-            mask = (
-                (df['entry_date'].dt.date >= date_range[0]) &
-                (df['entry_date'].dt.date <= date_range[1]) &
-                (df['type'].isin(type_filter)) &
-                (df['category'].isin(category_filter))
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                sort_label = st.selectbox("Sort by", list(SORT_COLUMNS))
+            with col2:
+                ascending = st.radio("Order", ["Descending", "Ascending"], horizontal=True) == "Ascending"
+            with col3:
+                page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1)
+
+            pager = data_manager.get_operations_pager(
+                sort_by=SORT_COLUMNS[sort_label],
+                ascending=ascending,
+                start=date_range[0] if date_range else None,
+                end=date_range[-1] if date_range else None,
+                types=type_filter,
+                categories=category_filter,
             )
-            filtered_df = df[mask]
+            page_df, offset, next_key = _current_page(pager, page_size)
             
             st.dataframe(
-                filtered_df,
+                page_df,
                 column_config={
                     "date": "Date",
                     "description": "Description",
@@ -56,30 +71,170 @@ def render_operations(data_manager) -> None:
                 },
                 hide_index=True
             )
+
+            col1, col2, col3 = st.columns([1, 2, 1])
+            keys = st.session_state["operations_page_keys"]
+            with col1:
+                if st.button("◀ Previous", disabled=len(keys) <= 1, use_container_width=True):
+                    keys.pop()
+                    st.rerun()
+            with col2:
+                if len(pager):
+                    st.caption(f"Rows {offset + 1}–{offset + len(page_df)} of {len(pager)}")
+                else:
+                    st.caption("No operations match these filters.")
+            with col3:
+                if st.button("Next ▶", disabled=next_key is None, use_container_width=True):
+                    keys.append(next_key)
+                    st.rerun()
     
     with tab2:
-        search_term = st.text_input("🔍 Search operations", placeholder="Enter description...")
+        search_term = st.text_input("🔍 Search operations", placeholder="Enter description or category...")
+        with st.expander("Filters"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                min_amount = st.number_input("Min amount", min_value=0.0, value=0.0, step=1.0)
+            with col2:
+                max_amount = st.number_input("Max amount (0 = no limit)", min_value=0.0, value=0.0, step=1.0)
+            with col3:
+                limit = st.selectbox("Show up to", [25, 50, 100, 500], index=1)
+            search_dates = st.date_input("Date range", value=())
         if search_term:
-            operations = data_manager.get_operations()
-            if operations:
-                df = pd.DataFrame(operations)
-                results = df[df['description'].str.contains(search_term, case=False)]
-                if not results.empty:
-                    st.dataframe(results, hide_index=True)
-                else:
-                    st.info("No matching operations found.")
+            start, end = (search_dates[0], search_dates[-1]) if search_dates else (None, None)
+            results, total = data_manager.get_search_index().search(
+                search_term,
+                limit=limit,
+                min_amount=min_amount or None,
+                max_amount=max_amount or None,
+                start=start,
+                end=end,
+            )
+            if results:
+                st.dataframe(pd.DataFrame(results), hide_index=True)
+                st.caption(f"Showing {len(results)} of {total} matching operations")
+            else:
+                st.info("No matching operations found.")
     
     with tab3:
-        operations = data_manager.get_operations()
-        if operations:
-            df = pd.DataFrame(operations)
-            selected_index = st.selectbox(
-                "Select operation to edit/delete",
-                range(len(df)),
-                format_func=lambda x: f"{df.iloc[x]['entry_date']} - {df.iloc[x]['description']} ({df.iloc[x]['amount']:,.2f}{currency_symbol})"
-            )
-            
-            if st.button("🗑️ Delete Operation", type="primary"):
-                data_manager.delete_operation(selected_index)
-                st.success("Operation deleted successfully!")
-                st.rerun()
\ No newline at end of file
+        df = data_manager.get_operations_frame()
+        if not df.empty:
+            # Only the matching (or most recent) operations are offered, never the whole history
+            pick_term = st.text_input("Find operation", placeholder="Type to search, or pick a recent one")
+            if pick_term:
+                candidates, _ = data_manager.get_search_index().search(pick_term, limit=PICKER_LIMIT)
+            else:
+                recent, _, _ = data_manager.get_operations_pager().page(size=PICKER_LIMIT)
+                candidates = recent.to_dict("records")
+            options = {int(op['entry_id']): op for op in candidates}
+            if not options:
+                st.info("No matching operations found.")
+            else:
+                _render_delete(data_manager, options, currency_symbol)
+
+    with tab4:
+        _render_import(data_manager)
+
+def _operation_label(op, currency_symbol) -> str:
+    day = pd.Timestamp(op['entry_date'])
+    return f"{'No date' if pd.isna(day) else f'{day:%Y-%m-%d}'} - {op['description']} ({op['amount']:,.2f}{currency_symbol})"
+
+def _render_delete(data_manager, options, currency_symbol) -> None:
+    selected_id = st.selectbox(
+        "Select operation to edit/delete",
+        list(options),
+        format_func=lambda x: _operation_label(options[x], currency_symbol)
+    )
+    
+    if st.button("🗑️ Delete Operation", type="primary"):
+        try:
+            data_manager.delete_operation(selected_id)
+            st.success("Operation deleted successfully!")
+            st.rerun()
+        except ValueError as e:
+            st.error(str(e))
+
+def _current_page(pager, page_size):
+    """Page shown for the current keyset stack; the stack resets when the view changes."""
+    view = st.session_state.get("operations_page_view")
+    if view is None or view[0] is not pager or view[1] != page_size:
+        st.session_state["operations_page_view"] = (pager, page_size)
+        st.session_state["operations_page_keys"] = [None]
+    return pager.page(after=st.session_state["operations_page_keys"][-1], size=page_size)
+
+def _render_import(data_manager) -> None:
+    """Bank statement import: CSV (with column mapping) or OFX/QFX."""
+    uploaded = st.file_uploader("Bank statement", type=IMPORT_FORMATS)
+    if uploaded is None:
+        st.caption("Upload a CSV or OFX/QFX export from your bank. Rows already present are skipped.")
+        return
+
+    is_csv = uploaded.name.lower().endswith(".csv")
+    mapping = None
+    if is_csv:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            sep = st.selectbox("Separator", [",", ";", "\t"], format_func=lambda x: "Tab" if x == "\t" else x)
+        with col2:
+            decimal = st.selectbox("Decimal mark", [".", ","])
+        with col3:
+            dayfirst = st.checkbox("Day before month (31/12/2024)", value=decimal == ",")
+        try:
+            columns = read_csv_header(uploaded, sep=sep)
+        except Exception as e:
+            st.error(f"Could not read the file: {str(e)}")
+            return
+
+        guessed = guess_mapping(columns)
+        st.markdown("##### Column mapping")
+        mapping = {}
+        cols = st.columns(5)
+        fields = [("entry_date", "Date", True), ("description", "Description", False), ("amount", "Amount", True),
+                  ("type", "Type (optional)", False), ("category", "Category (optional)", False)]
+        for col, (field, label, required) in zip(cols, fields):
+            options = columns if required else [None] + columns
+            default = guessed[field]
+            with col:
+                mapping[field] = st.selectbox(
+                    label, options,
+                    index=options.index(default) if default in options else 0,
+                    format_func=lambda x: "—" if x is None else str(x),
+                    key=f"import_map_{field}",
+                )
+        st.caption("Without a type column, positive amounts are income and negative ones expenses.")
+
+    categories = data_manager.get_categories() or ['Other']
+    col1, col2 = st.columns(2)
+    with col1:
+        auto_categorize = st.checkbox("Categorize from my history", value=True)
+    with col2:
+        default_category = st.selectbox(
+            "Default category", categories,
+            index=categories.index("Other") if "Other" in categories else 0,
+        )
+
+    if st.button("Import", type="primary"):
+        chunks = iter_csv(uploaded, mapping, sep=sep, decimal=decimal, dayfirst=dayfirst) if is_csv else iter_ofx(uploaded)
+        progress = st.progress(0.0, text="Importing...")
+        totals = None
+        try:
+            for totals in data_manager.import_operations(
+                chunks, default_category=default_category, auto_categorize=auto_categorize
+            ):
+                # Bytes consumed so far approximates progress without a line count
+                progress.progress(min(uploaded.tell() / max(uploaded.size, 1), 1.0),
+                                  text=f"{totals['rows']:,} rows read")
+        except Exception as e:
+            st.error(f"Import failed: {str(e)}")
+            return
+        progress.empty()
+        if totals is None:
+            st.info("No transactions found in this file.")
+            return
+        st.success(
+            f"Imported {totals['imported']:,} operations "
+            f"({totals['duplicates']:,} duplicates and {totals['zero_amount']:,} zero amounts skipped, "
+            f"{totals['invalid']:,} unreadable rows)."
+        )
+        failed = data_manager.get_write_status()["failed"]
+        if failed:
+            st.warning(f"{failed} operations could not be saved yet; see the sidebar to retry.")
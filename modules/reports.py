@@ -1,6 +1,6 @@
 import streamlit as st
-import pandas as pd
-from services.balance_calculator import BalanceCalculator
+from services.exporter import EXPORT_FORMATS
+from services.operations_frame import date_span
 
 def render_reports(data_manager) -> None:
     st.title("📑 Financial Reports")
@@ -8,7 +8,8 @@ def render_reports(data_manager) -> None:
     
     operations = data_manager.get_operations()
     if operations:
-        df = pd.DataFrame(operations)
+        df = data_manager.get_operations_frame()
+        totals = data_manager.get_type_totals()
         
         st.header("Summary Statistics")
         col1, col2, col3, col4 = st.columns(4)
@@ -16,17 +17,17 @@ def render_reports(data_manager) -> None:
         with col1:
             st.metric(
                 "Total Income",
-                f"{df[df['type'] == 'income']['amount'].sum():,.2f}{currency_symbol}"
+                f"{totals['income']:,.2f}{currency_symbol}"
             )
         with col2:
             st.metric(
                 "Total Expenses",
-                f"{df[df['type'] == 'expense']['amount'].sum():,.2f}{currency_symbol}"
+                f"{totals['expense']:,.2f}{currency_symbol}"
             )
         with col3:
             st.metric(
                 "Net Balance",
-                f"{BalanceCalculator.calculate_total_balance(operations):,.2f}{currency_symbol}"
+                f"{data_manager.get_current_balance():,.2f}{currency_symbol}"
             )
         with col4:
             st.metric(
@@ -35,35 +36,41 @@ def render_reports(data_manager) -> None:
             )
         
         st.header("Export Data")
-        col1, col2 = st.columns(2)
-        
+        col1, col2, col3 = st.columns(3)
         with col1:
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="📥 Download CSV Report",
-                data=csv,
-                file_name="finance_report.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-        
+            export_format = st.selectbox("Format", list(EXPORT_FORMATS))
         with col2:
+            export_dates = st.date_input(
+                "Date range",
+                date_span(df)
+            )
+        with col3:
+            categories = df['category'].cat.categories.tolist()
+            export_categories = st.multiselect("Categories", options=categories, default=categories)
+
+        # Files are only generated on request and then reused while the data is unchanged
+        export_request = (
+            export_format,
+            export_dates[0] if export_dates else None,
+            export_dates[-1] if export_dates else None,
+            None if len(export_categories) == len(categories) else tuple(export_categories),
+        )
+        if st.button("Prepare export", use_container_width=True):
+            st.session_state["export_request"] = export_request
+
+        if st.session_state.get("export_request") == export_request:
+            extension, mime = EXPORT_FORMATS[export_format]
             try:
-                buffer = pd.ExcelWriter('finance_report.xlsx', engine='xlsxwriter')
-                df.to_excel(buffer, index=False, sheet_name='Operations')
-                buffer.close()
-                
-                with open('finance_report.xlsx', 'rb') as f:
-                    excel_data = f.read()
-                
+                data = data_manager.get_export(*export_request)
                 st.download_button(
-                    label="📥 Download Excel Report",
-                    data=excel_data,
-                    file_name="finance_report.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    label=f"📥 Download {export_format} Report",
+                    data=data,
+                    file_name=f"finance_report.{extension}",
+                    mime=mime,
                     use_container_width=True
                 )
             except ImportError:
-                st.info("Excel export requires xlsxwriter package. Install it using: pip install xlsxwriter")
+                package = "pyarrow" if export_format == "Parquet" else "xlsxwriter"
+                st.info(f"{export_format} export requires {package} package. Install it using: pip install {package}")
     else:
         st.info("No data available for reporting. Add some transactions first!")
@@ -1,5 +1,9 @@
 # modules/settings.py
+import pandas as pd
 import streamlit as st
+from services import instrumentation
+from services.shared_cache import shared_cache
+from services.series import DEFAULT_POINT_BUDGET
 
 def render_settings(data_manager) -> None:
     st.title("⚙️ Settings")
@@ -36,4 +40,74 @@ def render_settings(data_manager) -> None:
     st.session_state["currency_symbol"] = currencies[selected_currency]
     st.session_state["currency_name"] = selected_currency
     
-    st.write(f"Selected currency: {st.session_state['currency_symbol']}")
\ No newline at end of file
+    st.write(f"Selected currency: {st.session_state['currency_symbol']}")
+
+    # Maximum number of points plotted in long time-series charts
+    st.session_state["chart_point_budget"] = st.number_input(
+        "Chart point budget",
+        min_value=100,
+        max_value=20000,
+        value=st.session_state.get("chart_point_budget", DEFAULT_POINT_BUDGET),
+        step=100,
+        help="Long histories are downsampled to about this many points before plotting.",
+    )
+
+    # Response cache counters (only for storages that cache HTTP reads)
+    if hasattr(data_manager.storage, "cache_stats"):
+        with st.expander("API cache statistics"):
+            st.json(data_manager.storage.cache_stats())
+
+    with st.expander("Shared cache"):
+        _render_shared_cache()
+
+    with st.expander("Performance profile (debug)"):
+        _render_profile()
+
+def _render_shared_cache() -> None:
+    """Occupancy of the process-wide cache shared by all sessions."""
+    stats = shared_cache.stats()
+    st.progress(min(stats["bytes"] / stats["budget"], 1.0),
+                text=f"{stats['bytes'] / 2 ** 20:,.1f} of {stats['budget'] / 2 ** 20:,.0f} MiB in use")
+    if stats["kinds"]:
+        st.dataframe(pd.DataFrame([
+            {"kind": kind, "entries": usage["entries"], "MiB": usage["bytes"] / 2 ** 20}
+            for kind, usage in sorted(stats["kinds"].items())
+        ]), hide_index=True, column_config={"MiB": st.column_config.NumberColumn(format="%.2f")})
+    st.caption(f"{stats['hits']:,} hits · {stats['misses']:,} misses · "
+               f"{stats['deduplicated']:,} deduplicated · {stats['evictions']:,} evictions")
+
+def _render_profile() -> None:
+    """Per-rerun timings of API calls, data builds and page renders for this session."""
+    st.session_state["profiling"] = st.toggle(
+        "Record reruns", value=st.session_state.get("profiling", False),
+        help="Times API requests, cache use, DataFrame builds and page renders on every rerun.",
+    )
+    runs = [run for run in instrumentation.history() if run.wall is not None]
+    if not runs:
+        st.caption("No profiled reruns yet; enable recording and use the app.")
+        return
+
+    st.line_chart(pd.DataFrame({"wall (ms)": [run.wall for run in runs]}, index=[run.run for run in runs]))
+    by_number = {run.run: run for run in reversed(runs)}
+    run = by_number[st.selectbox(
+        "Rerun", list(by_number),
+        format_func=lambda n: (f"#{n} {by_number[n].page or ''} · {by_number[n].wall:,.0f} ms"
+                               f"{' (interrupted)' if by_number[n].interrupted else ''}"),
+    )]
+    summary = run.summary()
+    if summary:
+        st.dataframe(pd.DataFrame(summary), hide_index=True, column_config={
+            "total_ms": st.column_config.NumberColumn("total (ms)", format="%.1f"),
+            "max_ms": st.column_config.NumberColumn("max (ms)", format="%.1f"),
+        })
+    api_calls = [span for span in run.spans if span["kind"] == "api"]
+    if api_calls:
+        st.markdown("##### API requests")
+        st.dataframe(pd.DataFrame(api_calls).drop(columns=["kind"]), hide_index=True)
+    if run.counters:
+        st.markdown("##### Cache counters")
+        st.json(dict(sorted(run.counters.items())))
+    st.download_button(
+        "Download Prometheus metrics", instrumentation.prometheus_text(),
+        file_name="spendly_metrics.prom", mime="text/plain",
+    )
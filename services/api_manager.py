@@ -1,19 +1,101 @@
 # services/api_manager.py
+import http.cookiejar
+import json
+import threading
 import requests
-from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.retry import Retry
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 from datetime import datetime
 import streamlit as st
+from services import instrumentation
+from services.response_cache import ResponseCache, response_cache
+from services.storage import SESSION_EXPIRED_KEY, SessionExpired, Storage
 
-class APIStorage:
-    def __init__(self, base_url: str):
+if TYPE_CHECKING:
+    from services.operation_store import OperationStore
+
+# Primary key of an operation row as returned by the API
+ID_FIELD = "entry_id"
+
+def with_type(operations: List[Dict]) -> List[Dict]:
+    """Add the 'type' field based on the 'amount' value."""
+    for operation in operations:
+        operation["type"] = "income" if operation["amount"] > 0 else "expense"
+    return operations
+
+# Only advertise brotli when a decoder is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+_sessions: Dict[Tuple[int, int, float], requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+def get_http_session(pool_size: int = 20, retries: int = 3, backoff: float = 0.3) -> requests.Session:
+    """Return the process-wide keep-alive session for this pool configuration.
+
+    The session is shared by every Streamlit session, so it carries no credentials
+    and refuses cookies; the bearer token is attached per request.
+    """
+    key = (pool_size, retries, backoff)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            # Retry idempotent reads only; writes are never replayed
+            retry = Retry(
+                total=retries,
+                backoff_factor=backoff,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+            session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+            _sessions[key] = session
+        return session
+
+def write_not_sent(error: Exception) -> bool:
+    """Whether a failed write certainly never reached the server, so resending it is safe.
+
+    Only failures to open the connection qualify; after a read timeout or a
+    dropped connection the server may have stored the write.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+    return False
+
+class APIStorage(Storage):
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = 20,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 30.0,
+        retries: int = 3,
+        cache: Optional[ResponseCache] = None,
+    ):
         self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = get_http_session(pool_size=pool_size, retries=retries)
+        self.cache = cache or response_cache
 
     def login(self, username: str, password: str) -> bool:
         """Authenticate and store the access token and user details in session state."""
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/auth/login",
-                json={"email": username, "password": password}
+                json={"email": username, "password": password},
+                timeout=self.timeout,
             )
             response.raise_for_status()
             auth_data = response.json()
@@ -30,29 +112,108 @@ class APIStorage:
         """Make an authenticated API request using the access token from session state."""
         if not st.session_state.get("access_token") or not st.session_state.get("user_id"):
             raise Exception("Not authenticated. Please log in first.")
-        
+        with instrumentation.span("api", f"{method} {instrumentation.endpoint_label(endpoint)}") as span:
+            return self._send(method, endpoint, span, **kwargs)
+
+    def _send(self, method: str, endpoint: str, span, **kwargs):
         headers = {"Authorization": f"Bearer {st.session_state['access_token']}"}
         url = f"{self.base_url}{endpoint}"
-        response = requests.request(method, url, headers=headers, **kwargs)
+        kwargs.setdefault("timeout", self.timeout)
+
+        ttl = self.cache.ttl_for(endpoint) if method == "GET" else None
+        if ttl is None:
+            response = self.session.request(method, url, headers=headers, **kwargs)
+            span.set(status=response.status_code, bytes=len(response.content))
+            self._check_auth(response)
+            response.raise_for_status()
+            return response.json()
+
+        # Cached read: serve fresh entries from memory, revalidate stale ones
+        params = tuple(sorted((kwargs.get("params") or {}).items()))
+        key = (st.session_state["user_id"], endpoint, params)
+        entry = self.cache.lookup(key)
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.record_hit(entry)
+            span.set(cache="hit", bytes=len(entry["content"]))
+            instrumentation.count("api_cache.hit")
+            return json.loads(entry["content"])
+
+        headers.update(self.cache.conditional_headers(entry))
+        response = self.session.request(method, url, headers=headers, **kwargs)
+        span.set(status=response.status_code, bytes=len(response.content))
+        self._check_auth(response)
+        if response.status_code == 304 and entry is not None:
+            self.cache.record_hit(entry, revalidated=True)
+            span.set(cache="revalidated")
+            instrumentation.count("api_cache.revalidated")
+            return json.loads(entry["content"])
         response.raise_for_status()
+        span.set(cache="miss")
+        instrumentation.count("api_cache.miss")
+        self.cache.store(
+            key, ttl, response.content,
+            response.headers.get("ETag"), response.headers.get("Last-Modified"),
+        )
         return response.json()
 
-    def load(self) -> List[Dict]:
+    @staticmethod
+    def _check_auth(response: requests.Response) -> None:
+        """Raise SessionExpired when the API rejects the access token (401)."""
+        if response.status_code == 401:
+            st.session_state[SESSION_EXPIRED_KEY] = True
+            raise SessionExpired("The access token was rejected; please log in again.")
+
+    def invalidate_operations(self) -> None:
+        """Drop cached operation reads for the current user after a write."""
+        self.cache.invalidate(st.session_state.get("user_id"), "/balance/")
+
+    def cache_stats(self) -> Dict[str, int]:
+        return self.cache.stats()
+
+    def load(self) -> "OperationStore":
+        # Imported here so NumPy stays off the login path
+        from services.operation_store import OperationStore
         user_id = st.session_state.get("user_id")
         operations = self._make_request("GET", f"/balance/{user_id}/my-operations")
-        # Add 'type' field based on the 'amount' value
-        for operation in operations:
-            operation["type"] = "income" if operation["amount"] > 0 else "expense"
-        return operations
+        return OperationStore.from_records(operations)
+
+    def load_since(self, cursor: int, deleted_cursor: Optional[int] = None) -> Dict:
+        """Fetch only the operations added after `cursor` (an entry id).
+
+        The backend answers `?since_id=&deleted_since=` with
+        `{"operations": [...], "deleted_ids": [...], "deleted_cursor": n, "total": n}`,
+        listing only the ids deleted after the `deleted_cursor` watermark of the
+        previous delta (all of them without one); a backend that ignores the
+        parameters returns the full list, which is reported as `full`.
+        """
+        from services.operation_store import OperationStore
+        user_id = st.session_state.get("user_id")
+        params = {"since_id": cursor}
+        if deleted_cursor is not None:
+            params["deleted_since"] = deleted_cursor
+        response = self._make_request("GET", f"/balance/{user_id}/my-operations", params=params)
+        if isinstance(response, list):
+            return {"operations": OperationStore.from_records(response), "deleted_ids": [],
+                    "deleted_cursor": None, "total": len(response), "full": True}
+        return {
+            "operations": OperationStore.from_records(response.get("operations", [])),
+            "deleted_ids": response.get("deleted_ids", []),
+            # A backend without deletion watermarks keeps sending every tombstone
+            "deleted_cursor": response.get("deleted_cursor"),
+            "total": response.get("total"),
+            "full": False,
+        }
 
     def add_entry(self, entry_data: Dict) -> None:
         user_id = st.session_state.get("user_id")
         endpoint = f"/operations/{user_id}/add-income" if entry_data['type'] == 'income' else f"/operations/{user_id}/add-expense"
         self._make_request("POST", endpoint, json=entry_data)
+        self.invalidate_operations()
 
     def delete_entry(self, entry_id: int) -> None:
         user_id = st.session_state.get("user_id")
         self._make_request("DELETE", f"/operations/{user_id}/delete-operation/{entry_id}")
+        self.invalidate_operations()
 
     def get_categories(self) -> List[str]:
         response = self._make_request("GET", "/categories/all")
@@ -0,0 +1,207 @@
+# services/auth_session.py
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from typing import Dict, Optional, Tuple
+import streamlit as st
+
+# Browser cookie carrying the session token (kept out of the URL, which leaks
+# through history, shared links, Referer headers and proxy logs)
+SESSION_COOKIE = "spendly_session"
+# Session state: the session's current token, and a cookie update still to send
+TOKEN_KEY = "session_token"
+_COOKIE_UPDATE_KEY = "session_cookie_update"
+# Shown on the login form after a forced logout
+NOTICE_KEY = "login_notice"
+# Session state set by Storage.login that a resumed session needs
+AUTH_FIELDS = ("user_id", "access_token", "currency_symbol")
+DEFAULT_TTL = 12 * 3600.0
+# Seconds a rotated token stays valid, for tabs resuming it at the same time
+ROTATION_GRACE = 30.0
+
+class SessionStore:
+    """Logged-in sessions kept server-side, referenced by signed, expiring tokens.
+
+    A token is `<session id>.<expiry>.<signature>`, where the signature is an
+    HMAC-SHA256 of the id and expiry under `secret`. It carries no credentials:
+    the access token and user details stay in this process, so a token
+    cannot be replayed against the API, and it stops working when it expires,
+    is revoked or the process restarts. Tokens are checked before the store is
+    looked up, so forged or expired ones never touch it.
+
+    Every token issued for one login (rotated in each tab that resumed it)
+    belongs to that login, and revoking any of them revokes them all.
+    """
+
+    def __init__(self, secret: Optional[bytes] = None, ttl: float = DEFAULT_TTL,
+                 grace: float = ROTATION_GRACE):
+        # Without a configured secret, tokens are only valid in this process
+        self.secret = secret or secrets.token_bytes(32)
+        self.ttl = ttl
+        self.grace = grace
+        # Session id -> login id, expiry and resumable-until (earlier once rotated);
+        # login id -> auth data and its session ids
+        self._sessions: Dict[str, Dict] = {}
+        self._logins: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _sign(self, session_id: str, expires: int) -> str:
+        return hmac.new(self.secret, f"{session_id}.{expires}".encode(), hashlib.sha256).hexdigest()
+
+    def issue(self, auth: Dict) -> str:
+        """Store `auth` (the AUTH_FIELDS of a logged-in session) as a new login and return its token."""
+        login_id = secrets.token_urlsafe(16)
+        with self._lock:
+            self._purge()
+            self._logins[login_id] = {"auth": dict(auth), "sessions": set()}
+            return self._issue_locked(login_id)
+
+    def _issue_locked(self, login_id: str) -> str:
+        session_id = secrets.token_urlsafe(16)
+        expires = int(time.time() + self.ttl)
+        self._sessions[session_id] = {"login": login_id, "expires": expires, "resumable": expires}
+        self._logins[login_id]["sessions"].add(session_id)
+        return f"{session_id}.{expires}.{self._sign(session_id, expires)}"
+
+    def _verified_id(self, token: str) -> Optional[str]:
+        """Session id of a well-formed, correctly signed and unexpired token."""
+        # Tokens come from the client: anything malformed is rejected, not raised on
+        if not isinstance(token, str):
+            return None
+        session_id, _, rest = token.partition(".")
+        expires, _, signature = rest.partition(".")
+        if not expires.isascii() or not expires.isdigit() or int(expires) < time.time():
+            return None
+        expected = self._sign(session_id, int(expires))
+        if not hmac.compare_digest(signature.encode(), expected.encode()):
+            return None
+        return session_id
+
+    def verifies(self, token: str) -> bool:
+        """Whether `token` is one this store signed and has not expired (known or not)."""
+        return self._verified_id(token) is not None
+
+    def resume(self, token: str) -> Optional[Tuple[str, Dict]]:
+        """Exchange a valid token for a new one of the same login: (new token, copy of its auth data), or None.
+
+        The old token keeps working for `grace` seconds, so tabs resuming the
+        same cookie at once (a browser restoring its tabs) all succeed; after
+        that, a stolen cookie is only good until the user's next reconnect.
+        """
+        session_id = self._verified_id(token)
+        if session_id is None:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or entry["resumable"] < now:
+                return None
+            # Still known until it expires, so logging out from its tab revokes the login
+            entry["resumable"] = min(entry["resumable"], now + self.grace)
+            login_id = entry["login"]
+            return self._issue_locked(login_id), dict(self._logins[login_id]["auth"])
+
+    def revoke(self, token: str) -> None:
+        """Revoke every token of the login `token` belongs to."""
+        session_id = self._verified_id(token)
+        if session_id is None:
+            return
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return
+            for sibling in self._logins.pop(entry["login"])["sessions"]:
+                self._sessions.pop(sibling, None)
+
+    def _purge(self) -> None:
+        now = time.time()
+        for session_id in [s for s, entry in self._sessions.items() if entry["expires"] < now]:
+            login = self._logins[self._sessions.pop(session_id)["login"]]
+            login["sessions"].discard(session_id)
+        for login_id in [l for l, login in self._logins.items() if not login["sessions"]]:
+            del self._logins[login_id]
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+def _configured_store() -> SessionStore:
+    # SESSION_SECRET keys the token signatures (a random key when unset)
+    secret = os.getenv("SESSION_SECRET")
+    return SessionStore(
+        secret.encode() if secret else None,
+        ttl=float(os.getenv("SESSION_TTL_HOURS", "12")) * 3600,
+    )
+
+# Shared by all sessions in the process
+session_store = _configured_store()
+
+def _set_cookie(token: Optional[str]) -> None:
+    """Queue a cookie update; `write_cookie` sends it on the next rendered run."""
+    st.session_state[_COOKIE_UPDATE_KEY] = (token or "", session_store.ttl if token else 0)
+
+def write_cookie() -> None:
+    """Send the queued cookie update to the browser, if any (call once per full run).
+
+    Streamlit cannot set cookies from the server, so a script does. The
+    cookie is SameSite=Strict and Secure over HTTPS. Scripts can read it,
+    since they write it, but unlike the URL it is not shared along with the page.
+    """
+    update = st.session_state.pop(_COOKIE_UPDATE_KEY, None)
+    if update is None:
+        return
+    token, max_age = update
+    cookie = json.dumps(f"{SESSION_COOKIE}={token}; Max-Age={int(max_age)}; Path=/; SameSite=Strict")
+    st.html(
+        f"<script>document.cookie = {cookie} + (location.protocol === 'https:' ? '; Secure' : '');</script>",
+        unsafe_allow_javascript=True,
+    )
+
+def remember_login() -> None:
+    """Issue a token for the session that just logged in and store it in a cookie."""
+    auth = {field: st.session_state.get(field) for field in AUTH_FIELDS}
+    token = st.session_state[TOKEN_KEY] = session_store.issue(auth)
+    st.session_state.pop(NOTICE_KEY, None)
+    _set_cookie(token)
+
+def _browser_token() -> Optional[str]:
+    """Session cookie the browser sent when this session connected."""
+    return st.context.cookies.get(SESSION_COOKIE)
+
+def restore_login() -> bool:
+    """Log the session in from the browser's session cookie, rotating its token."""
+    token = _browser_token()
+    if not token:
+        return False
+    resumed = session_store.resume(token)
+    if resumed is None:
+        # Only clear tokens that can never work again (forged, malformed or
+        # expired): an unknown but valid one may have been rotated by another
+        # tab, whose new cookie must not be wiped
+        if not session_store.verifies(token):
+            _set_cookie(None)
+        return False
+    token, auth = resumed
+    st.session_state.update(auth)
+    st.session_state[TOKEN_KEY] = token
+    st.session_state["logged_in"] = True
+    _set_cookie(token)
+    return True
+
+def end_login(notice: Optional[str] = None) -> None:
+    """Log the session out: revoke its login's tokens (all tabs), clear its state and its cookie.
+
+    `notice` is shown on the login form (e.g. when the backend rejected the
+    session's access token).
+    """
+    token = st.session_state.get(TOKEN_KEY)
+    if token:
+        session_store.revoke(token)
+    st.session_state.clear()
+    st.session_state["logged_in"] = False
+    if notice:
+        st.session_state[NOTICE_KEY] = notice
+    _set_cookie(None)
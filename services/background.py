@@ -0,0 +1,57 @@
+# services/background.py
+import copy
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+from services import instrumentation
+
+# Shared worker pool for I/O-bound work issued from script runs
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="spendly-io")
+# Separate pool for single writes, so a flush waiting on its writes can never
+# starve the pool it runs on
+_write_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="spendly-write")
+
+def _detached(ctx):
+    """Copy of `ctx` that its script run stopping does not cancel.
+
+    Streamlit stops threads carrying a run's context at their next session state
+    access once that run ends (e.g. after `st.rerun()`); queued writes and
+    syncs must still complete.
+    """
+    if getattr(ctx, "parallel_coordinator", None) is None:
+        return ctx
+    ctx = copy.copy(ctx)
+    ctx.parallel_coordinator = None
+    return ctx
+
+def _with_ctx(fn: Callable, args, kwargs) -> Callable:
+    ctx = _detached(get_script_run_ctx())
+    # Spans recorded by the task count towards the run that started it
+    profile = instrumentation.current()
+
+    def task():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        instrumentation.attach(profile)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            instrumentation.attach(None)
+            # Pool threads are reused: a later task submitted without a session
+            # (add_script_run_ctx ignores None) must not run as this one's
+            vars(threading.current_thread()).pop(SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+
+    return task
+
+def submit(fn: Callable, *args, **kwargs) -> Future:
+    """Run `fn` on the shared pool with the caller's Streamlit session attached.
+
+    Attaching the script run context lets the task read `st.session_state`
+    (credentials, user id) exactly as it would on the script thread.
+    """
+    return _executor.submit(_with_ctx(fn, args, kwargs))
+
+def submit_write(fn: Callable, *args, **kwargs) -> Future:
+    """Like submit, on the pool reserved for individual storage writes."""
+    return _write_executor.submit(_with_ctx(fn, args, kwargs))
@@ -1,26 +1,28 @@
 from typing import List, Dict
+from services.columnar import OperationColumns
 
 class BalanceCalculator:
+    """Totals over the operations, vectorized over an OperationStore's arrays.
+
+    A list of dicts is converted on every call, which costs more than the old
+    per-row loops did: only OperationStore input is faster (see
+    benchmarks/bench_balance.py).
+    """
+
     @staticmethod
     def calculate_total_balance(operations: List[Dict]) -> float:
-        balance = 0
-        for op in operations:
-            if op['type'] == 'income':
-                balance += op['amount']
-            else:
-                balance -= op['amount']
-        return balance
+        if not operations:
+            return 0
+        return OperationColumns.from_operations(operations).balance()
     
     @staticmethod
     def calculate_category_totals(operations: List[Dict]) -> Dict[str, float]:
-        totals = {}
-        for op in operations:
-            category = op['category']
-            amount = op['amount']
-            if category not in totals:
-                totals[category] = 0
-            if op['type'] == 'income':
-                totals[category] += amount
-            else:
-                totals[category] -= amount
-        return totals
\ No newline at end of file
+        if not operations:
+            return {}
+        return OperationColumns.from_operations(operations).category_totals()
+
+    @staticmethod
+    def calculate_type_totals(operations: List[Dict]) -> Dict[str, float]:
+        if not operations:
+            return {'income': 0, 'expense': 0}
+        return OperationColumns.from_operations(operations).type_totals()
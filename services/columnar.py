@@ -0,0 +1,82 @@
+# services/columnar.py
+from typing import Dict, List, Optional, Union
+import numpy as np
+from services.operation_store import OperationStore
+
+class OperationColumns:
+    """Operations converted once into typed arrays for vectorized reductions.
+
+    Amounts are kept as int64 cents so totals are exact; results are converted
+    back to currency units. `signed` follows BalanceCalculator's convention:
+    income adds `amount`, anything else subtracts it.
+    """
+
+    def __init__(self, cents: np.ndarray, is_income: np.ndarray,
+                 category_codes: np.ndarray, categories: List[str],
+                 raw_dates: Optional[List[str]] = None, days: Optional[np.ndarray] = None):
+        self.cents = cents
+        self.is_income = is_income
+        self.signed = np.where(is_income, cents, -cents)
+        self.category_codes = category_codes
+        self.categories = categories
+        self._raw_dates = raw_dates
+        self._days = days
+
+    @classmethod
+    def from_operations(cls, operations: Union[OperationStore, List[Dict]]) -> "OperationColumns":
+        if isinstance(operations, OperationStore):
+            return cls.from_store(operations)
+        n = len(operations)
+        amount = np.fromiter((op['amount'] for op in operations), dtype=np.float64, count=n)
+        is_income = np.fromiter((op['type'] == 'income' for op in operations), dtype=bool, count=n)
+        lookup: Dict[str, int] = {}
+        category_codes = np.fromiter(
+            (lookup.setdefault(op['category'], len(lookup)) for op in operations),
+            dtype=np.int32, count=n,
+        )
+        raw_dates = [op.get('entry_date') for op in operations]
+        return cls(np.rint(amount * 100).astype(np.int64), is_income, category_codes, list(lookup), raw_dates)
+
+    @classmethod
+    def from_store(cls, store: OperationStore) -> "OperationColumns":
+        """Use the store's arrays as they are (no per-row conversion)."""
+        return cls(store.cents, store.type_codes == 0, store.category_codes,
+                   store.categories.values, days=store.days.astype(np.int64))
+
+    @property
+    def days(self) -> np.ndarray:
+        """Entry dates as int64 days since the epoch (parsed on first use)."""
+        if self._days is None:
+            dates = [str(d)[:10] for d in self._raw_dates]
+            self._days = np.array(dates, dtype='datetime64[D]').astype(np.int64)
+        return self._days
+
+    def __len__(self) -> int:
+        return len(self.cents)
+
+    def balance(self) -> float:
+        return int(self.signed.sum()) / 100
+
+    def type_totals(self) -> Dict[str, float]:
+        """Raw `amount` sums for income rows and for expense rows."""
+        return {
+            'income': int(self.cents[self.is_income].sum()) / 100,
+            'expense': int(self.cents[~self.is_income].sum()) / 100,
+        }
+
+    def category_totals(self) -> Dict[str, float]:
+        # Sums of whole cents are exact in float64 up to 2**53 cents
+        n = len(self.categories)
+        sums = np.bincount(self.category_codes, weights=self.signed, minlength=n)
+        present = np.bincount(self.category_codes, minlength=n) > 0
+        return {category: round(total) / 100
+                for category, total, used in zip(self.categories, sums, present) if used}
+
+    def period_totals(self, freq: str = 'M') -> Dict[str, float]:
+        """Net signed totals per period; `freq` is a NumPy datetime unit ('D', 'W', 'M', 'Y')."""
+        if not len(self):
+            return {}
+        periods = self.days.astype('datetime64[D]').astype(f'datetime64[{freq}]')
+        keys, codes = np.unique(periods, return_inverse=True)
+        sums = np.bincount(codes.ravel(), weights=self.signed)
+        return {str(key): round(total) / 100 for key, total in zip(keys, sums)}
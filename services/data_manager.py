@@ -1,28 +1,690 @@
 # services/data_manager.py
-from typing import Dict, List
-from services.api_manager import APIStorage
+import hashlib
+import secrets
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import streamlit as st
+from services import background, instrumentation
 from services.balance_calculator import BalanceCalculator
+from services.operations_frame import build_operations_frame, dated_rows, filter_operations
+from services.rollups import Rollup
+from services.exporter import export_operations
+from services.importer import CategoryGuesser, DuplicateIndex, prepare_chunk
+from services.local_cache import LocalCache
+from services.operation_store import OperationStore
+from services.pagination import OperationsPager
+from services.search_index import SearchIndex
+from services.series import DEFAULT_POINT_BUDGET, balance_series
+from services.shared_cache import shared_cache
+from services.storage import AggregateStorage, Storage
+from services.write_queue import WriteQueue
+
+# Bytes charged for a user's ("latest", user_id) pointer; the rows it names are charged separately
+_LATEST_SIZE = 256
 
 class DataManager:
-    def __init__(self, storage: APIStorage):
+    SNAPSHOT_KEY = "operations_snapshot"
+    RUN_KEY = "script_run"
+    PREFETCH_KEY = "prefetch"
+    SEARCH_KEY = "search_index"
+    RECONCILE_KEY = "reconcile"
+    WARM_KEY = "warm_up"
+    STORAGE_VERSION_KEY = "storage_version"
+    WRITES_KEY = "write_queue"
+    VIEW_KEY = "operations_view"
+    CACHE_SESSION_KEY = "cache_session"
+
+    def __init__(self, storage: Storage, snapshot_ttl: float = 60.0, incremental: bool = True,
+                 local_cache: Optional[LocalCache] = None, write_parallelism: int = 4):
         self.storage = storage
-        
+        self.snapshot_ttl = snapshot_ttl
+        # Delta sync needs a backend that understands the since_id cursor
+        self.incremental = incremental and hasattr(storage, "load_since")
+        self.local_cache = local_cache
+        # Aggregates are pushed down to storages that can compute them
+        self.pushdown = isinstance(storage, AggregateStorage)
+        self.write_parallelism = write_parallelism
+
+    def begin_run(self) -> None:
+        """Mark the start of a script run so the snapshot is validated at most once per run.
+
+        Writes confirmed since the last run are folded into the snapshot here, and
+        writes queued meanwhile are sent as the next batch.
+        """
+        st.session_state[self.RUN_KEY] = st.session_state.get(self.RUN_KEY, 0) + 1
+        self.sync_writes()
+
+    def sync_writes(self) -> None:
+        """Fold confirmed writes into the snapshot and send the ones queued meanwhile.
+
+        Full runs do this in begin_run; fragments showing the write status call
+        it themselves, as fragment-only reruns skip begin_run.
+        """
+        queue = st.session_state.get(self.WRITES_KEY)
+        if queue is not None:
+            self._settle_writes(queue)
+            queue.start_flush(self.storage)
+
+    def _snapshot(self) -> Dict:
+        """Return the session's operations snapshot, fetching it at most once per script run."""
+        run = st.session_state.get(self.RUN_KEY, 0)
+        snapshot: Optional[Dict] = st.session_state.get(self.SNAPSHOT_KEY)
+        if snapshot is not None and snapshot["checked_run"] == run:
+            return snapshot
+        previous = snapshot
+        reconciled = self._take_reconciled()
+        warmed = self._take_warmed() if snapshot is None else None
+        pending = self._take_prefetched("operations")
+        if reconciled is not None:
+            snapshot = reconciled
+            instrumentation.count("snapshot.reconciled")
+        elif warmed is not None:
+            snapshot = warmed
+            instrumentation.count("snapshot.warmed")
+        elif pending is not None:
+            with instrumentation.span("data", "wait_prefetch"):
+                snapshot = pending.result()
+            instrumentation.count("snapshot.prefetched")
+        elif self._is_stale(snapshot):
+            with instrumentation.span("data", "sync"):
+                snapshot = self._load(snapshot)
+            instrumentation.count("snapshot.synced")
+        else:
+            instrumentation.count("snapshot.fresh")
+        if snapshot is not previous:
+            if self.pushdown:
+                snapshot["storage_version"] = self.get_data_version()
+            self._share(snapshot)
+            self._commit(snapshot)
+        snapshot["checked_run"] = run
+        st.session_state[self.SNAPSHOT_KEY] = snapshot
+        return snapshot
+
+    def _share(self, snapshot: Dict) -> None:
+        """Point the snapshot at the process-wide copy of its rows, so a user's sessions hold them once."""
+        operations = snapshot["operations"]
+        fingerprint = self._fingerprint(operations)
+        if fingerprint is not None:
+            user_id = st.session_state.get("user_id")
+            operations = snapshot["operations"] = shared_cache.put(("operations", user_id, fingerprint), operations)
+            # Where the user's next new session (a reconnect, another tab) starts from
+            shared_cache.pop(("latest", user_id))
+            shared_cache.put(("latest", user_id), (fingerprint, snapshot["cursor"], snapshot.get("deleted_cursor")),
+                             size=_LATEST_SIZE)
+        # Kept with the store it describes, as snapshot copies carry it along
+        snapshot["fingerprint"] = (operations, fingerprint)
+
+    @staticmethod
+    def _latest(user_id) -> Optional[Dict]:
+        """Rows (and cursors) most recently adopted by a session of the user, while still cached."""
+        latest = shared_cache.get(("latest", user_id))
+        if latest is None:
+            return None
+        fingerprint, cursor, deleted_cursor = latest
+        operations = shared_cache.get(("operations", user_id, fingerprint))
+        if operations is None:
+            return None
+        return {"operations": operations, "cursor": cursor, "deleted_cursor": deleted_cursor}
+
+    @staticmethod
+    def _fingerprint(operations: OperationStore) -> Optional[str]:
+        """Digest of the entry ids, which identify the rows (operations are never edited in place).
+
+        None when a row has no id yet, as the digest would not tell such rows apart.
+        """
+        ids = operations.ids
+        if (ids <= 0).any():
+            return None
+        return hashlib.blake2b(ids.tobytes(), digest_size=16).hexdigest()
+
+    def _scope(self) -> Tuple:
+        """Shared-cache key prefix identifying the rows the current view shows.
+
+        Sessions of the same user looking at the same rows get the same scope;
+        a view with pending writes is private to its session.
+        """
+        user_id = st.session_state.get("user_id")
+        if self.pushdown:
+            return ("user", user_id, self.get_data_version())
+        view = self._view()
+        fingerprint = view.get("fingerprint")
+        if fingerprint is not None and fingerprint[0] is view["operations"] and fingerprint[1] is not None:
+            return ("user", user_id, fingerprint[1])
+        token = st.session_state.get(self.CACHE_SESSION_KEY)
+        if token is None:
+            token = st.session_state[self.CACHE_SESSION_KEY] = secrets.token_hex(8)
+        return ("session", token, view["version"])
+
+    def _load(self, snapshot: Optional[Dict]) -> Dict:
+        """Sync a snapshot; a session without one starts from cached rows when available.
+
+        Rows another session of the user holds in memory come first, then the
+        local cache.
+        """
+        if snapshot is None:
+            user_id = st.session_state.get("user_id")
+            cached, source = self._latest(user_id), "memory"
+            if cached is None and self.local_cache is not None:
+                cached, source = self.local_cache.load(user_id), "disk"
+            if cached is not None and cached["operations"] is not None:
+                return {
+                    "version": 1,
+                    "operations": cached["operations"],
+                    "cursor": cached["cursor"],
+                    # The local cache keeps no deletion watermark: the first delta lists every tombstone
+                    "deleted_cursor": cached.get("deleted_cursor"),
+                    "fetched_at": time.time(),
+                    "source": source,
+                    "delta": None,
+                }
+        return self._sync(snapshot)
+
+    def _commit(self, snapshot: Dict) -> None:
+        """Side effects of adopting a new snapshot: reconcile cached data, persist API data."""
+        if snapshot["source"] in ("memory", "disk"):
+            # Rendered from a cache; catch up with the API without blocking this run
+            st.session_state[self.RECONCILE_KEY] = background.submit(self._sync, snapshot)
+        elif self.local_cache is not None:
+            background.submit(self._persist, st.session_state.get("user_id"), snapshot)
+
+    def _persist(self, user_id, snapshot: Dict) -> None:
+        try:
+            if snapshot["delta"] is None:
+                self.local_cache.save_operations(user_id, snapshot["operations"], snapshot["cursor"])
+            elif snapshot["delta"]:
+                self.local_cache.save_operations(user_id, snapshot["delta"], snapshot["cursor"], replace=False)
+        except Exception as e:
+            print(f"Failed to persist operations locally: {e}")
+
+    def _take_reconciled(self) -> Optional[Dict]:
+        """Result of a finished background reconciliation, if any."""
+        future = st.session_state.get(self.RECONCILE_KEY)
+        if future is None or not future.done():
+            return None
+        del st.session_state[self.RECONCILE_KEY]
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Background sync failed: {e}")
+            return None
+
+    def warm_up(self) -> None:
+        """Start loading what the first page needs, right after login.
+
+        The load runs while the login run finishes; until it is done,
+        `loading()` is True and the app shows a placeholder instead of waiting
+        for it. The first read afterwards adopts the rows, and the frame and
+        rollup are already in the shared cache under the keys it looks up.
+        """
+        task = self._warm_aggregates if self.pushdown else self._warm_operations
+        st.session_state[self.WARM_KEY] = background.submit(task, st.session_state.get("user_id"))
+
+    def loading(self) -> bool:
+        """Whether the data warm_up started is still on its way."""
+        future = st.session_state.get(self.WARM_KEY)
+        return future is not None and not future.done()
+
+    def _warm_operations(self, user_id) -> Dict:
+        snapshot = self._load(None)
+        operations = snapshot["operations"]
+        fingerprint = self._fingerprint(operations)
+        if fingerprint is not None:
+            prefix = ("derived", "user", user_id, fingerprint)
+            with instrumentation.span("build", "warm_up"):
+                frame = shared_cache.get_or_build(prefix + ("frame",), lambda: build_operations_frame(operations))
+                shared_cache.get_or_build(prefix + ("rollup",), lambda: Rollup.from_frame(frame))
+        return snapshot
+
+    def _warm_aggregates(self, user_id) -> None:
+        # Aggregate storages serve the first page from the rollup, without rows
+        prefix = ("derived", "user", user_id, self.storage.data_version())
+        with instrumentation.span("build", "warm_up"):
+            shared_cache.get_or_build(prefix + ("rollup",), lambda: Rollup.from_daily(*self.storage.daily_aggregates()))
+
+    def _take_warmed(self) -> Optional[Dict]:
+        """Snapshot loaded by warm_up, waiting for it if a page reads before it is done."""
+        future = st.session_state.pop(self.WARM_KEY, None)
+        if future is None:
+            return None
+        try:
+            with instrumentation.span("data", "wait_warm_up"):
+                return future.result()
+        except Exception as e:
+            print(f"Warm-up failed: {e}")
+            return None
+
+    def _is_stale(self, snapshot: Optional[Dict]) -> bool:
+        if snapshot is None or snapshot["fetched_at"] == 0.0:
+            return True
+        if self.pushdown:
+            return snapshot.get("storage_version") != self.get_data_version()
+        return time.time() - snapshot["fetched_at"] > self.snapshot_ttl
+
+    def prefetch(self, *names: str) -> Dict[str, Future]:
+        """Start independent reads concurrently; later getters in this run consume the results.
+
+        `names` are keys of `prefetchers()`. Reads that are already cached for this
+        run are skipped. Returns the futures that were started.
+        """
+        run = st.session_state.get(self.RUN_KEY, 0)
+        pending = st.session_state.setdefault(self.PREFETCH_KEY, {})
+        prefetchers = self.prefetchers()
+        started = {}
+        for name in names:
+            if name in pending and pending[name][0] == run:
+                started[name] = pending[name][1]
+                continue
+            fn = prefetchers[name]
+            if fn is None:
+                continue
+            started[name] = background.submit(fn)
+            pending[name] = (run, started[name])
+        return started
+
+    def prefetchers(self) -> Dict:
+        """Loaders that can run off the script thread, keyed by prefetch name."""
+        snapshot = st.session_state.get(self.SNAPSHOT_KEY)
+        # Aggregate storages answer most pages without rows, so those are loaded lazily;
+        # after login, warm_up is already loading them
+        skip = (self.pushdown or self.WARM_KEY in st.session_state
+                or (snapshot is not None and not self._is_stale(snapshot)))
+        return {
+            # The sync itself is pure; the result is committed by the consumer
+            "operations": None if skip else (lambda: self._load(snapshot)),
+            "categories": self.storage.get_categories,
+        }
+
+    def _take_prefetched(self, name: str) -> Optional[Future]:
+        """Pop this run's prefetch future for `name`, if one was started."""
+        pending = st.session_state.get(self.PREFETCH_KEY, {})
+        entry = pending.pop(name, None)
+        if entry is None or entry[0] != st.session_state.get(self.RUN_KEY, 0):
+            return None
+        return entry[1]
+
+    def _sync(self, snapshot: Optional[Dict]) -> Dict:
+        """Bring a snapshot up to date, fetching only new rows when a cursor is known."""
+        cursor = snapshot["cursor"] if snapshot else None
+        if not self.incremental or cursor is None:
+            return self._full_snapshot(snapshot)
+
+        delta = self.storage.load_since(cursor, snapshot.get("deleted_cursor"))
+        if delta["full"]:
+            return self._full_snapshot(snapshot, delta["operations"])
+
+        operations = snapshot["operations"]
+        received = delta["operations"]
+        new_rows = received.take(~np.isin(received.ids, operations.ids))
+        expected_total = len(operations) + len(new_rows)
+        if np.isin(operations.ids, delta["deleted_ids"]).any() or (
+            delta["total"] is not None and delta["total"] != expected_total
+        ):
+            # A tombstone (or a count mismatch) means local rows are stale; the
+            # reload covers every deletion up to this delta's watermark
+            return self._full_snapshot(snapshot, deleted_cursor=delta["deleted_cursor"])
+
+        snapshot = dict(snapshot, fetched_at=time.time(), source="api", delta=new_rows,
+                        deleted_cursor=delta["deleted_cursor"])
+        if len(new_rows):
+            snapshot["operations"] = operations.extend(new_rows)
+            snapshot["cursor"] = self._cursor_of(new_rows, cursor)
+            snapshot["version"] += 1
+        return snapshot
+
+    def _full_snapshot(self, previous: Optional[Dict], operations: Optional[OperationStore] = None,
+                       deleted_cursor: Optional[int] = None) -> Dict:
+        if operations is None:
+            operations = self.storage.load()
+        return {
+            "version": previous["version"] + 1 if previous else 1,
+            "operations": operations,
+            "cursor": self._cursor_of(operations),
+            # Deletions after this watermark are listed by the next delta
+            "deleted_cursor": deleted_cursor,
+            "fetched_at": time.time(),
+            "source": "api",
+            "delta": None,
+        }
+
+    @staticmethod
+    def _cursor_of(operations: OperationStore, cursor: Optional[int] = None) -> Optional[int]:
+        """Highest entry id seen so far (the delta sync watermark)."""
+        if not len(operations):
+            return cursor
+        top = int(operations.ids.max())
+        return top if cursor is None else max(cursor, top)
+
+    def invalidate(self, full: bool = False) -> None:
+        """Force the next read to resync; `full` discards the cursor and reloads everything."""
+        st.session_state.get(self.PREFETCH_KEY, {}).pop("operations", None)
+        # A sync started before this write may not include it
+        st.session_state.pop(self.RECONCILE_KEY, None)
+        st.session_state.pop(self.STORAGE_VERSION_KEY, None)
+        snapshot = st.session_state.get(self.SNAPSHOT_KEY)
+        if snapshot is not None:
+            snapshot["fetched_at"] = 0.0
+            snapshot["checked_run"] = None
+            if full:
+                snapshot["cursor"] = None
+
+    def refresh(self) -> None:
+        """Reload the full operation history immediately (manual refresh)."""
+        self.invalidate(full=True)
+        self._snapshot()
+
+    def _view(self) -> Dict:
+        """The snapshot with the session's pending writes applied (what pages show)."""
+        snapshot = self._snapshot()
+        queue = st.session_state.get(self.WRITES_KEY)
+        if not queue:
+            return snapshot
+        version = (snapshot["version"], queue.revision)
+        view = st.session_state.get(self.VIEW_KEY)
+        if view is None or view["version"] != version:
+            view = {"version": version, "operations": queue.apply(snapshot["operations"])}
+            st.session_state[self.VIEW_KEY] = view
+        return view
+
+    def _writes(self) -> WriteQueue:
+        queue = st.session_state.get(self.WRITES_KEY)
+        if queue is None:
+            queue = WriteQueue(parallelism=self.write_parallelism)
+            st.session_state[self.WRITES_KEY] = queue
+        return queue
+
+    @staticmethod
+    def _write_key(row) -> Tuple:
+        return (str(row["entry_date"])[:10], row["description"], round(row["amount"] * 100), row["category"])
+
+    def _reconcile_unconfirmed(self, queue: WriteQueue, items: List[Dict]) -> None:
+        """Check adds whose outcome is unknown (e.g. a timeout) against the stored rows.
+
+        The rows the sync brought beyond the current snapshot are matched with
+        the adds on date, description, amount and category: matched adds were
+        stored, the others are marked failed and can be retried safely.
+        """
+        snapshot = st.session_state.get(self.SNAPSHOT_KEY)
+        with instrumentation.span("data", "reconcile_writes"):
+            fresh = self._sync(snapshot)
+        if fresh.get("delta") is not None:
+            appeared = Counter(map(self._write_key, fresh["delta"]))
+        else:
+            appeared = Counter(map(self._write_key, fresh["operations"]))
+            if snapshot is not None:
+                appeared -= Counter(map(self._write_key, snapshot["operations"]))
+        stored, missing = [], []
+        for item in items:
+            key = self._write_key(item["row"])
+            if appeared[key] > 0:
+                appeared[key] -= 1
+                stored.append(item)
+            else:
+                missing.append(item)
+        queue.resolve(stored, missing)
+        if fresh is not snapshot:
+            self._share(fresh)
+            self._commit(fresh)
+            fresh["checked_run"] = None
+            st.session_state[self.SNAPSHOT_KEY] = fresh
+
+    def _settle_writes(self, queue: WriteQueue) -> None:
+        """Move confirmed writes from the queue into the snapshot."""
+        unconfirmed = queue.unconfirmed()
+        if unconfirmed:
+            self._reconcile_unconfirmed(queue, unconfirmed)
+        done = queue.settle()
+        if not done:
+            return
+        snapshot = st.session_state.get(self.SNAPSHOT_KEY)
+        deleted = {item["entry_id"] for item in done if item["kind"] == "delete"}
+        if deleted and snapshot is not None:
+            # Dropping the rows here means the tombstones later seen by the delta
+            # sync refer to unknown ids, so no full reload is needed
+            remaining = snapshot["operations"].without(deleted)
+            if remaining is not snapshot["operations"]:
+                snapshot = dict(snapshot, operations=remaining, version=snapshot["version"] + 1)
+                self._share(snapshot)
+                st.session_state[self.SNAPSHOT_KEY] = snapshot
+        if any(item["kind"] == "add" for item in done):
+            # Stored adds come back with their real ids through a delta sync
+            self.invalidate()
+        elif self.pushdown:
+            st.session_state.pop(self.STORAGE_VERSION_KEY, None)
+
+    def flush_writes(self, wait: bool = False) -> None:
+        """Send queued writes now; with `wait`, block until they are stored (or failed)."""
+        queue = self._writes()
+        if wait or self.pushdown:
+            # Aggregate storages compute from stored rows, so they are written through
+            queue.wait()
+            queue.start_flush(self.storage, wait=True)
+            self._settle_writes(queue)
+        else:
+            queue.start_flush(self.storage)
+
+    def get_write_status(self) -> Dict:
+        """Pending and failed write counts (and the last error) for this session."""
+        queue = st.session_state.get(self.WRITES_KEY)
+        if queue is None:
+            return {"pending": 0, "failed": 0, "error": None}
+        return queue.status()
+
+    def retry_failed_writes(self) -> None:
+        self._writes().retry_failed()
+        self.flush_writes()
+
+    def discard_failed_writes(self) -> None:
+        self._writes().discard_failed()
+
+    def get_data_version(self):
+        """Token that changes whenever the operations (or the pending writes) change.
+
+        Aggregate storages are asked for their own fingerprint (once per run), so
+        derived data can be served without loading the operations at all.
+        """
+        if not self.pushdown:
+            return self._view()["version"]
+        run = st.session_state.get(self.RUN_KEY, 0)
+        cached = st.session_state.get(self.STORAGE_VERSION_KEY)
+        if cached is None or cached[0] != run:
+            cached = (run, self.storage.data_version())
+            st.session_state[self.STORAGE_VERSION_KEY] = cached
+        return cached[1]
+
     def get_current_balance(self) -> float:
-        operations = self.get_operations()
-        return BalanceCalculator.calculate_total_balance(operations)
-    
+        if self.pushdown:
+            return self._derived("balance", self.storage.balance)
+        return self._derived("balance", lambda: BalanceCalculator.calculate_total_balance(self.get_operations()))
+
+    def has_operations(self) -> bool:
+        return not self.get_rollup().empty
+
+    def get_type_totals(self) -> Dict[str, float]:
+        """Raw amount sums of income and of expense operations."""
+        if self.pushdown:
+            return self._derived("type_totals", self.storage.type_totals)
+        return self._derived("type_totals", lambda: BalanceCalculator.calculate_type_totals(self.get_operations()))
+
     def add_operation(self, operation: Dict) -> None:
-        self.storage.add_entry(operation)
-    
+        """Queue an add; it shows up immediately and is stored in the background."""
+        self._writes().add(operation)
+        self.flush_writes()
+
+    def add_operations(self, operations: List[Dict]) -> None:
+        """Queue several adds, sent together as one batch."""
+        queue = self._writes()
+        for operation in operations:
+            queue.add(operation)
+        self.flush_writes()
+
     def delete_operation(self, entry_id: int) -> None:
-        self.storage.delete_entry(entry_id)
-    
-    def get_operations(self) -> List[Dict]:
-        return self.storage.load()
-    
+        """Queue a delete (cancelling the add instead if it was not sent yet)."""
+        self._writes().delete(entry_id)
+        self.flush_writes()
+
+    def get_operations(self) -> OperationStore:
+        """The operations pages show (read-only; rows are dict-like, see OperationStore)."""
+        return self._view()["operations"]
+
+    def _derived(self, name, build: Callable):
+        """Memoize `build()` for the current data in the process-wide shared cache.
+
+        Results are shared by the user's sessions that show the same rows, so
+        they must be treated as read-only.
+        """
+        label = name if isinstance(name, str) else name[0]
+        built = []
+
+        def timed_build():
+            built.append(True)
+            with instrumentation.span("build", label):
+                return build()
+
+        value = shared_cache.get_or_build(("derived",) + self._scope() + (name,), timed_build)
+        instrumentation.count(f"derived.{label}.{'miss' if built else 'hit'}")
+        return value
+
+    def _frame(self):
+        return self._derived("frame", lambda: build_operations_frame(self.get_operations()))
+
+    def get_operations_frame(self):
+        """Typed, date-sorted DataFrame of the operations, built once per data version.
+
+        Callers get a shallow copy, shared with other widgets and reruns. On
+        pandas >= 3 (copy-on-write by default) writes to it never reach the
+        cached frame; on older pandas they can, so treat it as read-only.
+        """
+        return self._frame().copy(deep=False)
+
+    def get_rollup(self) -> Rollup:
+        """Daily aggregates for window/period queries, built once per data version."""
+        if self.pushdown:
+            return self._derived("rollup", lambda: Rollup.from_daily(*self.storage.daily_aggregates()))
+        return self._derived("rollup", lambda: Rollup.from_frame(self._frame()))
+
+    def get_operations_between(self, start, end):
+        """Operations frame restricted to start <= entry_date <= end (read-only)."""
+        if self.pushdown:
+            # Only the window's rows leave the database
+            first_day, last_day = pd.Timestamp(start).date(), pd.Timestamp(end).date()
+            df = self._derived(("between", first_day, last_day), lambda: build_operations_frame(
+                self.storage.load_between(first_day, last_day)))
+        else:
+            df = self._frame()
+        return dated_rows(df).loc[pd.Timestamp(start):pd.Timestamp(end)].copy(deep=False)
+
+    def get_category_expenses(self):
+        """Expense total per category (the analytics table), memoized per data version."""
+        return self._derived("category_expenses", lambda: self.get_rollup().category_expenses())
+
+    def get_chart(self, kind: str, build: Callable, **params):
+        """Figure from `build(self, **params)`, memoized per data version, chart kind and params.
+
+        Figures are shared by the sessions showing the same rows; pass them to
+        st.plotly_chart as they are and do not update them in place.
+        """
+        return self._derived((f"chart:{kind}",) + tuple(sorted(params.items())),
+                             lambda: build(self, **params))
+
+    def get_balance_series(self, max_points: int = DEFAULT_POINT_BUDGET):
+        """Downsampled daily-close balance series for charts, memoized per data version."""
+        return self._derived(
+            f"balance_series:{max_points}", lambda: balance_series(self.get_rollup(), max_points)
+        )
+
+    def get_search_index(self) -> SearchIndex:
+        """Search index for the current data, updated incrementally from this session's previous one."""
+        key = ("derived",) + self._scope() + ("search_index",)
+        previous = st.session_state.get(self.SEARCH_KEY)
+        built = []
+
+        def build():
+            built.append(True)
+            operations = self._view()["operations"]
+            with instrumentation.span("build", "search_index"):
+                if previous is not None and previous[1] == "session":
+                    # Private to this session: nobody else can be reading it
+                    index = shared_cache.pop(previous)
+                else:
+                    base = shared_cache.get(previous) if previous is not None else None
+                    index = base.copy() if base is not None else None
+                if index is None:
+                    return SearchIndex.build(operations)
+                # Only index rows that appeared and drop rows that disappeared
+                index.remove(index.ids() - set(operations.ids.tolist()))
+                known_ids = np.fromiter(index.ids(), dtype=np.int64)
+                index.add(operations.take(~np.isin(operations.ids, known_ids)))
+                return index
+
+        index = shared_cache.get_or_build(key, build)
+        instrumentation.count(f"derived.search_index.{'miss' if built else 'hit'}")
+        st.session_state[self.SEARCH_KEY] = key
+        return index
+
+    def get_operations_pager(self, sort_by: str = "entry_date", ascending: bool = False,
+                             start=None, end=None, types=None, categories=None) -> OperationsPager:
+        """Keyset pager over the filtered operations, memoized per data version and view."""
+        signature = (sort_by, ascending, start, end,
+                     None if types is None else tuple(types),
+                     None if categories is None else tuple(categories))
+        return self._derived(("pager",) + signature, lambda: OperationsPager(
+            filter_operations(self._frame(), start=start, end=end, types=types, categories=categories),
+            sort_by=sort_by, ascending=ascending,
+        ))
+
+    def get_export(self, fmt: str, start=None, end=None, categories=None) -> bytes:
+        """Exported file bytes for the filtered operations, cached per data version."""
+        key = ("export", fmt, start, end, None if categories is None else tuple(categories))
+        return self._derived(key, lambda: export_operations(
+            filter_operations(self._frame(), start=start, end=end, categories=categories), fmt))
+
+    def get_category_guesser(self) -> CategoryGuesser:
+        """Category suggestions learned from the operations, built once per data version."""
+        return self._derived("category_guesser", lambda: CategoryGuesser(self.get_operations()))
+
+    def import_operations(self, chunks: Iterable, default_category: str = "Other",
+                          auto_categorize: bool = True) -> Iterator[Dict[str, int]]:
+        """Import normalized statement chunks (see services.importer), yielding running totals.
+
+        Rows matching existing operations are skipped. Each chunk is submitted as
+        one batch and stored before the next is parsed, so memory stays bounded
+        by the chunk size whatever the statement length.
+        """
+        operations = self.get_operations()
+        duplicates = DuplicateIndex(operations)
+        guesser = self.get_category_guesser() if auto_categorize else None
+        totals = {"rows": 0, "imported": 0, "duplicates": 0, "zero_amount": 0, "invalid": 0}
+        for chunk in chunks:
+            batch, stats = prepare_chunk(chunk, duplicates, guesser, default_category)
+            if batch:
+                self.add_operations(batch)
+                self.flush_writes(wait=True)
+            totals["rows"] += len(chunk)
+            totals["imported"] += len(batch)
+            for key in ("duplicates", "zero_amount", "invalid"):
+                totals[key] += stats[key]
+            yield dict(totals)
+
     def get_categories(self) -> List[str]:
-        return self.storage.get_categories()
+        pending = self._take_prefetched("categories")
+        user_id = st.session_state.get("user_id")
+        try:
+            categories = pending.result() if pending is not None else self.storage.get_categories()
+        except Exception:
+            # Offline fallback to the last categories seen for this user
+            cached = self.local_cache.load(user_id) if self.local_cache is not None else None
+            if cached is None or not cached["categories"]:
+                raise
+            return cached["categories"]
+        if self.local_cache is not None and categories and categories != st.session_state.get("persisted_categories"):
+            st.session_state["persisted_categories"] = categories
+            background.submit(self.local_cache.save_categories, user_id, categories)
+        return categories
 
     def clear_data(self) -> None:
         # Implementation for clearing data via API if needed
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,69 @@
+# services/exporter.py
+import gzip
+import io
+from typing import Dict
+import pandas as pd
+
+# Label -> (file extension, MIME type)
+EXPORT_FORMATS: Dict[str, tuple] = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+# Rows serialized per chunk, which bounds the intermediate copies on large accounts
+CHUNK_ROWS = 50_000
+
+def _chunks(df: pd.DataFrame):
+    for start in range(0, max(len(df), 1), CHUNK_ROWS):
+        yield start, df.iloc[start:start + CHUNK_ROWS]
+
+def _write_csv(df: pd.DataFrame, binary: io.BufferedIOBase) -> None:
+    text = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+    for start, chunk in _chunks(df):
+        chunk.to_csv(text, index=False, header=start == 0)
+    text.flush()
+    text.detach()
+
+def _write_excel(df: pd.DataFrame, buffer: io.BytesIO) -> None:
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+        for start, chunk in _chunks(df):
+            chunk.to_excel(
+                writer, index=False, sheet_name="Operations",
+                startrow=start + 1 if start else 0, header=start == 0,
+            )
+
+def _write_parquet(df: pd.DataFrame, buffer: io.BytesIO) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = pa.BufferOutputStream()
+    writer = None
+    for _, chunk in _chunks(df):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema, compression="snappy")
+        writer.write_table(table)
+    writer.close()
+    buffer.write(sink.getvalue().to_pybytes())
+
+def export_operations(df: pd.DataFrame, fmt: str) -> bytes:
+    """Serialize operations into an in-memory file of format `fmt` (a key of EXPORT_FORMATS).
+
+    Raises ImportError when the format's optional engine (xlsxwriter, pyarrow) is missing.
+    """
+    df = df.reset_index(drop=True)
+    buffer = io.BytesIO()
+    if fmt == "CSV":
+        _write_csv(df, buffer)
+    elif fmt == "CSV (gzip)":
+        with gzip.GzipFile(fileobj=buffer, mode="wb") as compressed:
+            _write_csv(df, compressed)
+    elif fmt == "Excel":
+        _write_excel(df, buffer)
+    elif fmt == "Parquet":
+        _write_parquet(df, buffer)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return buffer.getvalue()
@@ -0,0 +1,257 @@
+# services/importer.py
+import io
+import re
+import unicodedata
+from collections import Counter
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+import pandas as pd
+from services.search_index import tokenize
+
+IMPORT_FORMATS = ["csv", "ofx", "qfx"]
+
+# Rows parsed, checked and submitted per step; bounds memory on large statements
+CHUNK_ROWS = 5_000
+
+# Schema field -> header names commonly used by bank exports
+_HEADER_HINTS = {
+    "entry_date": ["date", "entry_date", "booking date", "transaction date", "posted", "value date"],
+    "description": ["description", "details", "payee", "name", "memo", "narrative", "label", "libelle"],
+    "amount": ["amount", "value", "sum", "montant", "betrag"],
+    "type": ["type", "credit/debit", "debit/credit", "direction"],
+    "category": ["category", "categorie"],
+}
+_INCOME_WORDS = {"income", "credit", "cr", "deposit", "in"}
+
+def normalize_description(text: str) -> str:
+    return " ".join(str(text).lower().split())
+
+def _plain(name) -> str:
+    """Lower-case header name without accents ("Libellé" -> "libelle")."""
+    decomposed = unicodedata.normalize("NFKD", str(name).strip().lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def guess_mapping(columns: List[str]) -> Dict[str, Optional[str]]:
+    """Best-effort column for each schema field (None when nothing looks right)."""
+    lowered = {_plain(column): column for column in columns}
+    mapping = {}
+    for field, hints in _HEADER_HINTS.items():
+        mapping[field] = next((lowered[hint] for hint in hints if hint in lowered), None)
+        if mapping[field] is None:
+            mapping[field] = next(
+                (column for name, column in lowered.items() if any(hint in name for hint in hints)), None)
+    return mapping
+
+def read_csv_header(file: BinaryIO, sep: str = ",") -> List[str]:
+    file.seek(0)
+    columns = pd.read_csv(file, sep=sep, nrows=0, encoding="utf-8-sig").columns.tolist()
+    file.seek(0)
+    return columns
+
+def iter_csv(file: BinaryIO, mapping: Dict[str, Optional[str]], sep: str = ",", decimal: str = ".",
+             dayfirst: bool = False) -> Iterator[pd.DataFrame]:
+    """Stream a CSV statement as normalized chunks (see _normalize) of at most CHUNK_ROWS rows."""
+    file.seek(0)
+    columns = list(dict.fromkeys(column for column in mapping.values() if column))
+    reader = pd.read_csv(file, sep=sep, usecols=columns, dtype=str, keep_default_na=False,
+                         encoding="utf-8-sig", chunksize=CHUNK_ROWS)
+    for chunk in reader:
+        yield _normalize(
+            dates=pd.to_datetime(chunk[mapping["entry_date"]], dayfirst=dayfirst, errors="coerce"),
+            descriptions=chunk[mapping["description"]] if mapping.get("description") else "",
+            amounts=_parse_amounts(chunk[mapping["amount"]], decimal),
+            types=chunk[mapping["type"]] if mapping.get("type") else None,
+            categories=chunk[mapping["category"]] if mapping.get("category") else None,
+        )
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)")
+
+def _ofx_transactions(text: io.TextIOBase) -> Iterator[Dict[str, str]]:
+    """Yield each <STMTTRN> block's fields; handles SGML (OFX 1.x) and XML (2.x) files."""
+    current = None
+    for line in text:
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            # SGML files may leave </STMTTRN> out; the next block or the list end closes it
+            if tag in ("STMTTRN", "BANKTRANLIST"):
+                if current is not None:
+                    yield current
+                current = {} if tag == "STMTTRN" and not closing else None
+            elif current is not None and not closing and value.strip():
+                current[tag] = value.strip()
+    if current is not None:
+        yield current
+
+def iter_ofx(file: BinaryIO) -> Iterator[pd.DataFrame]:
+    """Stream an OFX/QFX statement as normalized chunks of at most CHUNK_ROWS rows."""
+    file.seek(0)
+    text = io.TextIOWrapper(file, encoding="utf-8", errors="replace")
+    try:
+        batch: List[Dict[str, str]] = []
+        for transaction in _ofx_transactions(text):
+            batch.append(transaction)
+            if len(batch) == CHUNK_ROWS:
+                yield _ofx_chunk(batch)
+                batch = []
+        if batch:
+            yield _ofx_chunk(batch)
+    finally:
+        text.detach()
+
+def _ofx_chunk(transactions: List[Dict[str, str]]) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(transactions)
+    for column in ("DTPOSTED", "TRNAMT", "NAME", "MEMO"):
+        if column not in frame.columns:
+            frame[column] = ""
+    frame = frame.fillna("")
+    # Payee name, with the memo when it adds anything
+    descriptions = frame["NAME"].where(
+        (frame["MEMO"] == "") | (frame["MEMO"] == frame["NAME"]),
+        frame["NAME"] + " " + frame["MEMO"],
+    ).str.strip()
+    return _normalize(
+        dates=pd.to_datetime(frame["DTPOSTED"].str[:8], format="%Y%m%d", errors="coerce"),
+        descriptions=descriptions,
+        amounts=_parse_amounts(frame["TRNAMT"], "."),
+    )
+
+def _parse_amounts(values: pd.Series, decimal: str) -> pd.Series:
+    """Parse bank-formatted numbers: currency signs, thousands separators, (negatives)."""
+    text = values.astype(str).str.strip()
+    negative = text.str.startswith("(") & text.str.endswith(")")
+    text = text.str.replace(r"[^\d,.\-+]", "", regex=True)
+    if decimal == ",":
+        text = text.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    else:
+        text = text.str.replace(",", "", regex=False)
+    amounts = pd.to_numeric(text, errors="coerce")
+    return amounts.where(~negative, -amounts.abs())
+
+def _normalize(dates: pd.Series, descriptions, amounts: pd.Series,
+               types: Optional[pd.Series] = None, categories: Optional[pd.Series] = None) -> pd.DataFrame:
+    """Rows in the operation schema; amounts become absolute with the sign carried by 'type'.
+
+    Rows whose date or amount could not be parsed are kept with a NaN amount or
+    NaT date so callers can count them as invalid.
+    """
+    if types is None:
+        is_income = amounts > 0
+    else:
+        is_income = types.astype(str).str.strip().str.lower().isin(_INCOME_WORDS)
+    return pd.DataFrame({
+        "entry_date": dates.dt.strftime("%Y-%m-%d"),
+        "description": descriptions.astype(str).str.strip() if isinstance(descriptions, pd.Series) else descriptions,
+        "amount": amounts.abs(),
+        "type": is_income.map({True: "income", False: "expense"}),
+        "category": categories.astype(str).str.strip() if categories is not None else "",
+    }, index=amounts.index)
+
+def fingerprint(entry_date, signed_amount: float, description: str) -> int:
+    """Hash of the fields that identify a bank transaction (`description` already normalized).
+
+    Python's hash is only stable within a process, which is all an import needs.
+    """
+    return hash((str(entry_date)[:10], round(float(signed_amount) * 100), description))
+
+class DuplicateIndex:
+    """Multiset of operation fingerprints.
+
+    A statement row counts as a duplicate while an existing operation with the
+    same date, amount and description is still unmatched, so re-importing a file
+    adds nothing while genuinely repeated transactions (two identical coffees on
+    one day) are kept the first time.
+    """
+
+    def __init__(self, operations: Iterable[Mapping]):
+        # Histories repeat the same descriptions; normalize each one once
+        normalized: Dict[str, str] = {}
+        self._counts = Counter()
+        for op in operations:
+            description = op.get("description", "")
+            key = normalized.get(description)
+            if key is None:
+                key = normalized[description] = normalize_description(description)
+            self._counts[fingerprint(op.get("entry_date"), op.get("amount", 0), key)] += 1
+
+    def is_duplicate(self, entry_date, signed_amount: float, description: str) -> bool:
+        key = fingerprint(entry_date, signed_amount, description)
+        if self._counts[key] > 0:
+            self._counts[key] -= 1
+            return True
+        return False
+
+class CategoryGuesser:
+    """Suggests categories from the user's history.
+
+    An exact description match wins; otherwise every word of the description
+    votes with the category shares it had in past operations of the same type.
+    Guesses are memoized, as statements repeat the same payees over and over.
+    """
+
+    def __init__(self, operations: Iterable[Mapping]):
+        self._by_description: Dict[Tuple[str, str], Counter] = {}
+        by_token: Dict[Tuple[str, str], Counter] = {}
+        # Each distinct (type, description, category) is analysed once, weighted by its rows
+        rows = Counter(
+            (op.get("type", "expense"), op.get("description", ""), op.get("category"))
+            for op in operations
+        )
+        for (kind, description, category), n in rows.items():
+            if not category:
+                continue
+            description = normalize_description(description)
+            self._by_description.setdefault((kind, description), Counter())[category] += n
+            for token in set(tokenize(description)):
+                if not any(ch.isdigit() for ch in token):
+                    by_token.setdefault((kind, token), Counter())[category] += n
+        self._by_token = {
+            key: {category: n / sum(counts.values()) for category, n in counts.items()}
+            for key, counts in by_token.items()
+        }
+        self._guesses: Dict[Tuple[str, str], Optional[str]] = {}
+
+    def guess(self, description: str, kind: str, default: str) -> str:
+        key = (kind, description)
+        if key not in self._guesses:
+            self._guesses[key] = self._guess(normalize_description(description), kind)
+        return self._guesses[key] or default
+
+    def _guess(self, description: str, kind: str) -> Optional[str]:
+        exact = self._by_description.get((kind, description))
+        if exact:
+            return exact.most_common(1)[0][0]
+        votes: Counter = Counter()
+        for token in set(tokenize(description)):
+            for category, share in self._by_token.get((kind, token), {}).items():
+                votes[category] += share
+        return votes.most_common(1)[0][0] if votes else None
+
+def prepare_chunk(chunk: pd.DataFrame, duplicates: DuplicateIndex, guesser: Optional[CategoryGuesser],
+                  default_category: str) -> Tuple[List[Dict], Dict[str, int]]:
+    """Operations to submit from a normalized chunk, with invalid/zero-amount/duplicate counts.
+
+    Zero amounts (fee reversals, 0.00 authorizations) are readable but move no
+    money, so they are skipped under their own count rather than as invalid.
+    """
+    valid = chunk["entry_date"].notna() & chunk["amount"].notna()
+    zero = valid & (chunk["amount"] == 0)
+    stats = {"invalid": int((~valid).sum()), "zero_amount": int(zero.sum()), "duplicates": 0}
+    rows = chunk[valid & ~zero]
+    normalized = rows["description"].str.lower().str.split().str.join(" ")
+    signed = rows["amount"].where(rows["type"] == "income", -rows["amount"])
+    operations = []
+    for entry_date, description, key, amount, signed_amount, kind, category in zip(
+        rows["entry_date"], rows["description"], normalized, rows["amount"], signed, rows["type"], rows["category"]
+    ):
+        if duplicates.is_duplicate(entry_date, signed_amount, key):
+            stats["duplicates"] += 1
+            continue
+        if not category:
+            category = guesser.guess(description, kind, default_category) if guesser else default_category
+        operations.append({
+            "entry_date": entry_date,
+            "description": description,
+            "amount": float(amount),
+            "type": kind,
+            "category": category,
+        })
+    return operations, stats
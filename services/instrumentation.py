@@ -0,0 +1,304 @@
+# services/instrumentation.py
+import json
+import logging
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+import streamlit as st
+from services.shared_cache import shared_cache
+
+logger = logging.getLogger("spendly.profile")
+
+RUNS_KEY = "profile_runs"
+ENABLED_KEY = "profile_enabled"
+# Completed runs kept per session for the debug panel
+HISTORY_SIZE = 20
+
+class _RunLocal(threading.local):
+    # Class-level default: a missed attribute lookup would raise (and be slow)
+    profile: Optional["RunProfile"] = None
+
+_local = _RunLocal()
+
+class RunProfile:
+    """Spans and counters recorded during one script run (from any thread)."""
+
+    def __init__(self, run: int, page: Optional[str] = None):
+        self.run = run
+        self.page = page
+        self.started_at = time.time()
+        self.last_activity = self.started_at
+        # Wall time in ms, set when the run is closed
+        self.wall: Optional[float] = None
+        self.interrupted = False
+        self.spans: List[Dict] = []
+        self.counters: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add_span(self, record: Dict) -> None:
+        with self._lock:
+            self.spans.append(record)
+            self.last_activity = time.time()
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def summary(self) -> List[Dict]:
+        """Spans aggregated per (kind, name), slowest total first."""
+        groups: Dict = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            group = groups.setdefault((span["kind"], span["name"]), {
+                "kind": span["kind"], "name": span["name"], "calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+            })
+            group["calls"] += 1
+            group["total_ms"] += span["ms"]
+            group["max_ms"] = max(group["max_ms"], span["ms"])
+        return sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+
+class _Span:
+    __slots__ = ("profile", "kind", "name", "attrs", "start")
+
+    def __init__(self, profile: RunProfile, kind: str, name: str, attrs: Dict):
+        self.profile, self.kind, self.name, self.attrs = profile, kind, name, attrs
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.start) * 1e3
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.profile.add_span(dict(self.attrs, kind=self.kind, name=self.name, ms=ms))
+        _registry.observe(self.kind, self.name, ms / 1e3)
+        return False
+
+class _NoSpan:
+    """Shared do-nothing span handed out while profiling is off."""
+    __slots__ = ()
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+def current() -> Optional[RunProfile]:
+    """Profile of the run this thread works for (None when profiling is off)."""
+    return _local.profile
+
+def attach(profile: Optional[RunProfile]) -> None:
+    """Make worker threads record into the profile of the run that started them."""
+    _local.profile = profile
+
+def span(kind: str, name: str, **attrs):
+    """Context manager timing a block; a shared no-op when profiling is off."""
+    profile = _local.profile
+    if profile is None:
+        return _NO_SPAN
+    return _Span(profile, kind, name, attrs)
+
+def count(name: str, n: int = 1) -> None:
+    profile = _local.profile
+    if profile is not None:
+        profile.count(name, n)
+        _registry.increment(name, n)
+
+def timed(kind: str, name: Optional[str] = None) -> Callable:
+    """Decorator recording each call of the function as a span."""
+    def decorator(fn: Callable) -> Callable:
+        label = name or fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _local.profile is None:
+                return fn(*args, **kwargs)
+            with span(kind, label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def start_run(enabled: bool) -> None:
+    """Begin recording this script run when `enabled` (the per-session opt-in)."""
+    _local.profile = None
+    st.session_state[ENABLED_KEY] = enabled
+    runs = st.session_state.get(RUNS_KEY)
+    if runs and runs[-1].wall is None:
+        # Cut short by st.rerun(); its last recorded activity marks the end
+        _close(runs[-1], runs[-1].last_activity, interrupted=True)
+    if not enabled:
+        return
+    if runs is None:
+        runs = st.session_state[RUNS_KEY] = deque(maxlen=HISTORY_SIZE)
+    profile = RunProfile(run=(runs[-1].run + 1) if runs else 1)
+    runs.append(profile)
+    _local.profile = profile
+
+def label_run(page: str) -> None:
+    """Name the page the current run renders (known only after the sidebar)."""
+    profile = _local.profile
+    if profile is not None:
+        profile.page = page
+
+def finish_run() -> None:
+    """Close the current run's profile at the end of the script."""
+    profile = _local.profile
+    if profile is not None and profile.wall is None:
+        _close(profile, time.time())
+    _local.profile = None
+
+@contextmanager
+def fragment_run(name: str):
+    """Time a fragment body: a span of the full run, or a run of its own when it reruns alone.
+
+    Fragment reruns skip app.py, so the opt-in of the session's last full run applies.
+    """
+    if _local.profile is not None or not st.session_state.get(ENABLED_KEY):
+        with span("fragment", name):
+            yield
+        return
+    start_run(True)
+    label_run(f"fragment:{name}")
+    try:
+        with span("fragment", name):
+            yield
+    finally:
+        finish_run()
+
+def _close(profile: RunProfile, ended_at: float, interrupted: bool = False) -> None:
+    """Record the run's wall time and emit it as one structured (JSON) log line."""
+    profile.wall = (ended_at - profile.started_at) * 1e3
+    profile.interrupted = interrupted
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({
+            "event": "rerun",
+            "run": profile.run,
+            "page": profile.page,
+            "wall_ms": round(profile.wall, 2),
+            "interrupted": interrupted,
+            "spans": [dict(g, total_ms=round(g["total_ms"], 2), max_ms=round(g["max_ms"], 2))
+                      for g in profile.summary()],
+            "counters": dict(profile.counters),
+        }))
+
+def history() -> List[RunProfile]:
+    """This session's recent run profiles, oldest first."""
+    return list(st.session_state.get(RUNS_KEY, ()))
+
+class _Registry:
+    """Process-wide totals across sessions, rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._spans: Dict = defaultdict(lambda: [0, 0.0])
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def observe(self, kind: str, name: str, seconds: float) -> None:
+        with self._lock:
+            totals = self._spans[(kind, name)]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def increment(self, name: str, n: int) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def prometheus_text(self) -> str:
+        lines = [
+            "# HELP spendly_span_seconds Time spent in instrumented spans.",
+            "# TYPE spendly_span_seconds summary",
+        ]
+        with self._lock:
+            spans = sorted(self._spans.items())
+            counters = sorted(self._counters.items())
+        for (kind, name), (calls, seconds) in spans:
+            labels = f'kind="{_escape(kind)}",name="{_escape(name)}"'
+            lines.append(f"spendly_span_seconds_count{{{labels}}} {calls}")
+            lines.append(f"spendly_span_seconds_sum{{{labels}}} {seconds:.6f}")
+        lines += ["# HELP spendly_events_total Instrumented events (cache hits, misses...).",
+                  "# TYPE spendly_events_total counter"]
+        for name, value in counters:
+            lines.append(f'spendly_events_total{{name="{_escape(name)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+_registry = _Registry()
+
+def prometheus_text() -> str:
+    return _registry.prometheus_text() + _shared_cache_text()
+
+def _shared_cache_text() -> str:
+    stats = shared_cache.stats()
+    lines = [
+        "# HELP spendly_shared_cache_bytes Estimated bytes held by the shared cache, per kind of data.",
+        "# TYPE spendly_shared_cache_bytes gauge",
+    ]
+    lines += [f'spendly_shared_cache_bytes{{kind="{_escape(kind)}"}} {usage["bytes"]}'
+              for kind, usage in sorted(stats["kinds"].items())]
+    lines += ["# HELP spendly_shared_cache_entries Entries in the shared cache, per kind of data.",
+              "# TYPE spendly_shared_cache_entries gauge"]
+    lines += [f'spendly_shared_cache_entries{{kind="{_escape(kind)}"}} {usage["entries"]}'
+              for kind, usage in sorted(stats["kinds"].items())]
+    lines += ["# HELP spendly_shared_cache_budget_bytes Memory budget of the shared cache.",
+              "# TYPE spendly_shared_cache_budget_bytes gauge",
+              f"spendly_shared_cache_budget_bytes {stats['budget']}",
+              "# HELP spendly_shared_cache_evictions_total Entries evicted to stay within the budget.",
+              "# TYPE spendly_shared_cache_evictions_total counter",
+              f"spendly_shared_cache_evictions_total {stats['evictions']}"]
+    return "\n".join(lines) + "\n"
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+def endpoint_label(endpoint: str) -> str:
+    """Endpoint with numeric path segments collapsed, to keep label cardinality low."""
+    return _ID_SEGMENT.sub("/{id}", endpoint)
+
+_server_lock = threading.Lock()
+_server: Optional[ThreadingHTTPServer] = None
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> None:
+    """Expose prometheus_text() on http://<host>:<port>/metrics (once per process).
+
+    The endpoint has no authentication, so it only listens locally by default;
+    bind another address only on a network the scraper alone can reach.
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        _server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=_server.serve_forever, name="spendly-metrics", daemon=True).start()
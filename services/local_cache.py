@@ -0,0 +1,126 @@
+# services/local_cache.py
+import json
+import threading
+import time
+from typing import Dict, Iterable, List, Mapping, Optional
+from sqlalchemy import (
+    Column, Float, Integer, MetaData, String, Table, Text, create_engine, delete, insert, select,
+)
+from services.api_manager import ID_FIELD
+from services.operation_store import OperationStore
+
+metadata = MetaData()
+
+cached_operations = Table(
+    "cached_operations", metadata,
+    Column("user_id", String, primary_key=True),
+    Column("entry_id", Integer, primary_key=True),
+    Column("payload", Text, nullable=False),
+)
+
+sync_state = Table(
+    "sync_state", metadata,
+    Column("user_id", String, primary_key=True),
+    Column("cursor", Integer),
+    Column("synced_at", Float, nullable=False),
+    Column("categories", Text),
+)
+
+_engines: Dict[str, object] = {}
+_engines_lock = threading.Lock()
+
+def _engine_for(url: str):
+    """One engine (and one schema check) per URL for the whole process."""
+    with _engines_lock:
+        if url not in _engines:
+            connect_args = {"check_same_thread": False, "timeout": 30} if url.startswith("sqlite") else {}
+            engine = create_engine(url, connect_args=connect_args, future=True)
+            metadata.create_all(engine)
+            _engines[url] = engine
+        return _engines[url]
+
+class LocalCache:
+    """On-disk copy of each user's operations, categories and sync watermark.
+
+    Lets a new session render from disk immediately and reconcile with the API
+    afterwards. Any SQLAlchemy URL works; SQLite is the default.
+    """
+
+    def __init__(self, url: str = "sqlite:///.spendly_cache.db"):
+        self.engine = _engine_for(url)
+
+    def load(self, user_id) -> Optional[Dict]:
+        """Cached data for `user_id` (None if unknown; `operations`, an OperationStore, is None until first synced)."""
+        user_id = str(user_id)
+        with self.engine.connect() as conn:
+            state = conn.execute(select(sync_state).where(sync_state.c.user_id == user_id)).first()
+            if state is None:
+                return None
+            operations = None
+            if state.cursor is not None:
+                rows = conn.execute(
+                    select(cached_operations.c.payload)
+                    .where(cached_operations.c.user_id == user_id)
+                    .order_by(cached_operations.c.entry_id)
+                ).scalars()
+                operations = OperationStore.from_records(json.loads(payload) for payload in rows)
+        return {
+            "operations": operations,
+            "cursor": state.cursor,
+            "synced_at": state.synced_at,
+            "categories": json.loads(state.categories) if state.categories else None,
+        }
+
+    def save_operations(self, user_id, operations: Iterable[Mapping], cursor: Optional[int],
+                        replace: bool = True) -> None:
+        """Store `operations` (all of them, or only new ones when `replace` is False)."""
+        user_id = str(user_id)
+        rows = [
+            {"user_id": user_id, "entry_id": op[ID_FIELD], "payload": json.dumps(dict(op), default=str)}
+            for op in operations if op.get(ID_FIELD)
+        ]
+        with self.engine.begin() as conn:
+            if replace:
+                conn.execute(delete(cached_operations).where(cached_operations.c.user_id == user_id))
+            if rows:
+                self._upsert_operations(conn, rows)
+            self._upsert_state(conn, user_id, cursor=cursor)
+
+    @staticmethod
+    def _upsert_operations(conn, rows: List[Dict]) -> None:
+        """Insert `rows`, replacing cached rows with the same (user_id, entry_id)."""
+        dialect = conn.dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            statement = dialect_insert(cached_operations)
+            conn.execute(statement.on_conflict_do_update(
+                index_elements=[cached_operations.c.user_id, cached_operations.c.entry_id],
+                set_={"payload": statement.excluded.payload},
+            ), rows)
+            return
+        # Other databases: drop the rows being re-saved first (same transaction)
+        conn.execute(delete(cached_operations).where(
+            cached_operations.c.user_id == rows[0]["user_id"],
+            cached_operations.c.entry_id.in_([row["entry_id"] for row in rows]),
+        ))
+        conn.execute(insert(cached_operations), rows)
+
+    def save_categories(self, user_id, categories: List[str]) -> None:
+        with self.engine.begin() as conn:
+            self._upsert_state(conn, str(user_id), categories=json.dumps(categories))
+
+    def _upsert_state(self, conn, user_id: str, **values) -> None:
+        values["synced_at"] = time.time()
+        updated = conn.execute(
+            sync_state.update().where(sync_state.c.user_id == user_id).values(**values)
+        ).rowcount
+        if not updated:
+            conn.execute(insert(sync_state).values(user_id=user_id, **values))
+
+    def clear(self, user_id) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(cached_operations).where(cached_operations.c.user_id == str(user_id)))
+            conn.execute(delete(sync_state).where(sync_state.c.user_id == str(user_id)))
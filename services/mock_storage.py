@@ -0,0 +1,150 @@
+# services/mock_storage.py
+import copy
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import streamlit as st
+from services.api_manager import ID_FIELD
+from services.storage import Storage
+
+if TYPE_CHECKING:
+    from services.operation_store import OperationStore
+
+DEFAULT_CATEGORIES = ['Food', 'Transport', 'Housing', 'Entertainment', 'Utilities', 'Salary', 'Other']
+
+class MockBackend:
+    """In-memory stand-in for the Spendly API, implementing the same endpoint contract."""
+
+    def __init__(self, categories: Optional[List[str]] = None, currency: str = "€"):
+        self.categories = list(categories or DEFAULT_CATEGORIES)
+        self.currency = currency
+        self._operations: Dict[int, List[Dict]] = {}
+        # (deletion sequence number, entry id) per user, in deletion order
+        self._tombstones: Dict[int, List[Tuple[int, int]]] = {}
+        self._next_id = 1
+        self._next_deletion = 1
+        self._lock = threading.Lock()
+
+    def authenticate(self, email: str, password: str) -> Optional[Dict]:
+        """Accept any non-empty credentials; the user id is derived from the email."""
+        if not email or not password:
+            return None
+        user_id = sum(email.encode()) % 10_000 + 1
+        with self._lock:
+            self._operations.setdefault(user_id, [])
+        return {
+            "user_id": user_id,
+            "access_token": f"mock-token-{user_id}",
+            "currency": self.currency,
+        }
+
+    def seed(self, user_id: int, operations: List[Dict]) -> None:
+        """Replace a user's history with `operations` (ids are assigned when missing)."""
+        with self._lock:
+            rows = []
+            for operation in operations:
+                row = {k: v for k, v in operation.items() if k != "type"}
+                if ID_FIELD not in row:
+                    row[ID_FIELD] = self._next_id
+                    self._next_id += 1
+                else:
+                    self._next_id = max(self._next_id, row[ID_FIELD] + 1)
+                rows.append(row)
+            self._operations[user_id] = rows
+            self._tombstones[user_id] = []
+
+    def operations(self, user_id: int, since_id: Optional[int] = None, deleted_since: Optional[int] = None):
+        """GET /balance/{user_id}/my-operations[?since_id=[&deleted_since=]]
+
+        A delta lists the tombstones recorded after the `deleted_since`
+        watermark (all of them without one) and returns the new watermark as
+        `deleted_cursor`.
+        """
+        with self._lock:
+            rows = self._operations.get(user_id, [])
+            if since_id is None:
+                return copy.deepcopy(rows)
+            tombstones = self._tombstones.get(user_id, [])
+            return {
+                "operations": copy.deepcopy([r for r in rows if r[ID_FIELD] > since_id]),
+                "deleted_ids": [i for seq, i in tombstones if i <= since_id and seq > (deleted_since or 0)],
+                "deleted_cursor": tombstones[-1][0] if tombstones else deleted_since,
+                "total": len(rows),
+            }
+
+    def add(self, user_id: int, entry_data: Dict) -> Dict:
+        """POST /operations/{user_id}/add-income and /add-expense"""
+        with self._lock:
+            amount = abs(float(entry_data["amount"]))
+            row = {
+                ID_FIELD: self._next_id,
+                "entry_date": entry_data.get("entry_date") or datetime.now().strftime('%Y-%m-%d'),
+                "description": entry_data.get("description", ""),
+                "amount": amount if entry_data.get("type") == "income" else -amount,
+                "category": entry_data.get("category", "Other"),
+            }
+            self._next_id += 1
+            self._operations.setdefault(user_id, []).append(row)
+            return copy.deepcopy(row)
+
+    def delete(self, user_id: int, entry_id: int) -> None:
+        """DELETE /operations/{user_id}/delete-operation/{entry_id}"""
+        with self._lock:
+            rows = self._operations.get(user_id, [])
+            self._operations[user_id] = [r for r in rows if r[ID_FIELD] != entry_id]
+            if len(rows) != len(self._operations[user_id]):
+                self._tombstones.setdefault(user_id, []).append((self._next_deletion, entry_id))
+                self._next_deletion += 1
+
+    def category_rows(self) -> List[Dict]:
+        """GET /categories/all"""
+        return [{"category_name": name} for name in self.categories]
+
+# Shared across reruns and sessions, like the real backend
+default_backend = MockBackend()
+
+class MockStorage(Storage):
+    """Drop-in replacement for APIStorage backed by a MockBackend (offline use)."""
+
+    def __init__(self, backend: Optional[MockBackend] = None):
+        self.backend = backend or default_backend
+
+    def login(self, username: str, password: str) -> bool:
+        auth_data = self.backend.authenticate(username, password)
+        if auth_data is None:
+            return False
+        st.session_state["logged_in"] = True
+        st.session_state["currency_symbol"] = auth_data.get("currency")
+        st.session_state["user_id"] = auth_data.get("user_id")
+        st.session_state["access_token"] = auth_data.get("access_token")
+        return True
+
+    def _user_id(self) -> int:
+        if not st.session_state.get("access_token") or not st.session_state.get("user_id"):
+            raise Exception("Not authenticated. Please log in first.")
+        return st.session_state["user_id"]
+
+    def load(self) -> "OperationStore":
+        # Imported here so NumPy stays off the login path, as for APIStorage
+        from services.operation_store import OperationStore
+        return OperationStore.from_records(self.backend.operations(self._user_id()))
+
+    def load_since(self, cursor: int, deleted_cursor: Optional[int] = None) -> Dict:
+        from services.operation_store import OperationStore
+        response = self.backend.operations(self._user_id(), since_id=cursor, deleted_since=deleted_cursor)
+        return {
+            "operations": OperationStore.from_records(response["operations"]),
+            "deleted_ids": response["deleted_ids"],
+            "deleted_cursor": response["deleted_cursor"],
+            "total": response["total"],
+            "full": False,
+        }
+
+    def add_entry(self, entry_data: Dict) -> None:
+        self.backend.add(self._user_id(), entry_data)
+
+    def delete_entry(self, entry_id: int) -> None:
+        self.backend.delete(self._user_id(), entry_id)
+
+    def get_categories(self) -> List[str]:
+        return [cat['category_name'] for cat in self.backend.category_rows()]
@@ -0,0 +1,224 @@
+# services/operation_store.py
+import sys
+import threading
+from collections.abc import Mapping
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+import numpy as np
+from services.api_manager import ID_FIELD
+
+FIELDS = (ID_FIELD, "entry_date", "description", "amount", "type", "category")
+# Type codes; the order is the one of the frame's `type` categories
+TYPES = ("income", "expense")
+# Day number of rows without a (parseable) date
+NO_DAY = np.iinfo(np.int32).min
+_EPOCH = date(1970, 1, 1)
+
+class StringPool:
+    """Append-only table of distinct strings; rows refer to them by code.
+
+    Stores derived from one another share their pools, so codes stay valid
+    across versions and each distinct description is held once.
+    """
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._array: Optional[np.ndarray] = None
+        self.codes(values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def codes(self, strings: Iterable[str]) -> np.ndarray:
+        """Codes of `strings`, adding the ones not seen yet."""
+        with self._lock:
+            codes, values = self._codes, self.values
+            result = []
+            for text in strings:
+                code = codes.get(text)
+                if code is None:
+                    code = codes[text] = len(values)
+                    values.append(text)
+                result.append(code)
+        return np.array(result, dtype=np.int32)
+
+    def array(self) -> np.ndarray:
+        """The strings as an object array, for vectorized lookups of many codes."""
+        array = self._array
+        if array is None or len(array) != len(self.values):
+            array = self._array = np.array(self.values, dtype=object)
+        return array
+
+    @property
+    def nbytes(self) -> int:
+        return (sum(map(sys.getsizeof, self.values))
+                + sys.getsizeof(self.values) + sys.getsizeof(self._codes))
+
+@lru_cache(maxsize=None)
+def day_to_iso(day: int) -> Optional[str]:
+    """'YYYY-MM-DD' of a day number (histories span a few thousand distinct days)."""
+    return None if day == NO_DAY else (_EPOCH + timedelta(days=day)).isoformat()
+
+_GETTERS = {
+    ID_FIELD: lambda store, i: int(store.ids[i]),
+    "entry_date": lambda store, i: day_to_iso(int(store.days[i])),
+    "description": lambda store, i: store.descriptions.values[store.description_codes[i]],
+    "amount": lambda store, i: int(store.cents[i]) / 100,
+    "type": lambda store, i: TYPES[store.type_codes[i]],
+    "category": lambda store, i: store.categories.values[store.category_codes[i]],
+}
+
+class OperationRow(Mapping):
+    """Read-only dict-like view of one row of an OperationStore.
+
+    Fields are the API's: `entry_id`, `entry_date` ('YYYY-MM-DD'), `description`,
+    `amount` (signed, in currency units), `type` and `category`. Use `dict(row)`
+    for a mutable copy.
+    """
+
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store: "OperationStore", i: int):
+        self._store = store
+        self._i = i
+
+    def __getitem__(self, field: str):
+        try:
+            getter = _GETTERS[field]
+        except KeyError:
+            raise KeyError(field) from None
+        return getter(self._store, self._i)
+
+    def get(self, field: str, default=None):
+        getter = _GETTERS.get(field)
+        return default if getter is None else getter(self._store, self._i)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+class OperationStore:
+    """Operations of one user as parallel typed arrays (struct of arrays).
+
+    Amounts are int64 cents, so sums are exact; dates are int32 days since the
+    epoch; types, categories and descriptions are codes into shared tables. A
+    row costs 29 bytes plus its share of the distinct descriptions, against
+    several hundred for a dict per row. Stores are immutable: `extend` and `without`
+    return new stores sharing the string pools.
+
+    The arrays are exposed as-is (read-only NumPy views) for vectorized code;
+    existing per-row callers iterate the store or index it, which yields
+    dict-like OperationRow views.
+    """
+
+    def __init__(self, ids: np.ndarray, cents: np.ndarray, days: np.ndarray, type_codes: np.ndarray,
+                 category_codes: np.ndarray, description_codes: np.ndarray,
+                 categories: StringPool, descriptions: StringPool):
+        self.ids = ids
+        self.cents = cents
+        self.days = days
+        self.type_codes = type_codes
+        self.category_codes = category_codes
+        self.description_codes = description_codes
+        self.categories = categories
+        self.descriptions = descriptions
+        for array in (ids, cents, days, type_codes, category_codes, description_codes):
+            array.flags.writeable = False
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict], categories: Optional[StringPool] = None,
+                     descriptions: Optional[StringPool] = None) -> "OperationStore":
+        """Convert API-shaped dicts (a missing `type` is derived from the amount's sign)."""
+        records = records if isinstance(records, list) else list(records)
+        n = len(records)
+        ids = np.fromiter((r.get(ID_FIELD) or 0 for r in records), dtype=np.int64, count=n)
+        amounts = np.fromiter((r["amount"] for r in records), dtype=np.float64, count=n)
+        # Round once at the boundary; every later sum is exact
+        cents = np.rint(amounts * 100).astype(np.int64)
+        types = [r.get("type") for r in records]
+        type_codes = np.where(
+            [t == "income" if t else a > 0 for t, a in zip(types, amounts)], 0, 1
+        ).astype(np.int8)
+        dates = [str(r.get("entry_date") or "NaT")[:10] for r in records]
+        days = np.array(dates, dtype="datetime64[D]").astype(np.int64)
+        days = np.where(days == np.iinfo(np.int64).min, NO_DAY, days).astype(np.int32)
+        categories = categories if categories is not None else StringPool()
+        descriptions = descriptions if descriptions is not None else StringPool()
+        return cls(
+            ids, cents, days, type_codes,
+            categories.codes(r.get("category") or "" for r in records),
+            descriptions.codes(r.get("description") or "" for r in records),
+            categories, descriptions,
+        )
+
+    @classmethod
+    def empty(cls) -> "OperationStore":
+        return cls.from_records([])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i: int) -> OperationRow:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return OperationRow(self, i)
+
+    def __iter__(self) -> Iterator[OperationRow]:
+        return (OperationRow(self, i) for i in range(len(self)))
+
+    def __repr__(self) -> str:
+        return f"<OperationStore of {len(self)} operations>"
+
+    @property
+    def amounts(self) -> np.ndarray:
+        """Signed amounts in currency units (a float64 copy)."""
+        return self.cents / 100
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.ids, self.cents, self.days, self.type_codes, self.category_codes, self.description_codes)
+        return sum(array.nbytes for array in arrays) + self.categories.nbytes + self.descriptions.nbytes
+
+    def take(self, positions: np.ndarray) -> "OperationStore":
+        """Rows at `positions` (indices or a boolean mask), in that order."""
+        return OperationStore(
+            self.ids[positions], self.cents[positions], self.days[positions], self.type_codes[positions],
+            self.category_codes[positions], self.description_codes[positions],
+            self.categories, self.descriptions,
+        )
+
+    def without(self, entry_ids: Iterable[int]) -> "OperationStore":
+        """This store minus the rows with the given ids (itself when none match)."""
+        drop = np.isin(self.ids, np.fromiter(entry_ids, dtype=np.int64))
+        return self.take(~drop) if drop.any() else self
+
+    def extend(self, rows: Union["OperationStore", Iterable[Dict]]) -> "OperationStore":
+        """This store followed by `rows` (itself when there are none)."""
+        if not isinstance(rows, OperationStore) or rows.descriptions is not self.descriptions:
+            rows = OperationStore.from_records(rows, self.categories, self.descriptions)
+        if not len(rows):
+            return self
+        return OperationStore(*(
+            np.concatenate([mine, theirs]) for mine, theirs in zip(
+                (self.ids, self.cents, self.days, self.type_codes, self.category_codes, self.description_codes),
+                (rows.ids, rows.cents, rows.days, rows.type_codes, rows.category_codes, rows.description_codes),
+            )
+        ), self.categories, self.descriptions)
+
+    def category_names(self) -> np.ndarray:
+        """Category of every row as an object array of (shared) strings."""
+        return self.categories.array()[self.category_codes]
+
+    def description_texts(self) -> np.ndarray:
+        """Description of every row as an object array of (shared) strings."""
+        return self.descriptions.array()[self.description_codes]
@@ -0,0 +1,80 @@
+# services/operations_frame.py
+from typing import Dict, List, Union
+import numpy as np
+import pandas as pd
+from services.operation_store import NO_DAY, TYPES, OperationStore
+
+FRAME_COLUMNS = ["entry_id", "entry_date", "description", "amount", "type", "category"]
+
+def build_operations_frame(operations: Union[OperationStore, List[Dict]]) -> pd.DataFrame:
+    """Convert operations to the fixed, typed schema used by every page.
+
+    Rows are sorted by date (stable, so same-day rows keep API order) and indexed
+    by a DatetimeIndex named 'date'; `entry_date` is kept as a column as well.
+    """
+    if isinstance(operations, OperationStore):
+        return _frame_from_store(operations)
+    df = pd.DataFrame.from_records(operations) if operations else pd.DataFrame()
+    for column in FRAME_COLUMNS:
+        if column not in df.columns:
+            df[column] = pd.Series(dtype="object")
+    df = df[FRAME_COLUMNS]
+
+    df["entry_id"] = pd.to_numeric(df["entry_id"], errors="coerce").astype("Int64")
+    df["entry_date"] = pd.to_datetime(df["entry_date"])
+    df["description"] = df["description"].fillna("").astype(str)
+    df["amount"] = pd.to_numeric(df["amount"]).astype("float64")
+    df["type"] = pd.Categorical(df["type"], categories=["income", "expense"])
+    df["category"] = df["category"].astype("category")
+
+    df = df.sort_values("entry_date", kind="mergesort")
+    df.index = pd.DatetimeIndex(df["entry_date"], name="date")
+    return df
+
+def _frame_from_store(store: OperationStore) -> pd.DataFrame:
+    """Same schema as for dicts, built straight from the store's arrays."""
+    undated = store.days == NO_DAY
+    # Undated rows sort last, as sort_values places NaT
+    order = np.argsort(np.where(undated, np.iinfo(np.int32).max, store.days), kind="stable")
+    days = store.days[order].astype("datetime64[D]")
+    days[undated[order]] = np.datetime64("NaT")
+    entry_date = days.astype("datetime64[ns]")
+    # Categories sorted by name, as astype("category") would
+    used = np.unique(store.category_codes)
+    names = store.categories.array()[used]
+    by_name = np.argsort(names.astype(str), kind="stable")
+    recode = np.full(len(store.categories), -1, dtype=np.int32)
+    recode[used[by_name]] = np.arange(len(used), dtype=np.int32)
+    ids = store.ids[order]
+    df = pd.DataFrame({
+        "entry_id": pd.arrays.IntegerArray(ids, ids == 0),
+        "entry_date": entry_date,
+        "description": store.description_texts()[order],
+        "amount": store.cents[order] / 100,
+        "type": pd.Categorical.from_codes(store.type_codes[order], categories=list(TYPES)),
+        "category": pd.Categorical.from_codes(recode[store.category_codes[order]], categories=names[by_name]),
+    })
+    df.index = pd.DatetimeIndex(entry_date, name="date")
+    return df
+
+def dated_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """The rows that have a date; undated (NaT) rows would break label slicing on the index."""
+    undated = df.index.isna()
+    return df[~undated] if undated.any() else df
+
+def date_span(df: pd.DataFrame) -> List[pd.Timestamp]:
+    """[first, last] date of a frame's dated rows, or [] when none has a date."""
+    dates = dated_rows(df)["entry_date"]
+    return [dates.min(), dates.max()] if len(dates) else []
+
+def filter_operations(df: pd.DataFrame, start=None, end=None, types=None, categories=None) -> pd.DataFrame:
+    """Restrict a frame from build_operations_frame; date bounds are inclusive whole days."""
+    if start is not None or end is not None:
+        # Label slices on the sorted date index
+        end_of_day = pd.Timestamp(end) + pd.Timedelta(days=1) - pd.Timedelta(1) if end else None
+        df = dated_rows(df).loc[pd.Timestamp(start) if start else None:end_of_day]
+    if types is not None:
+        df = df[df["type"].isin(types)]
+    if categories is not None:
+        df = df[df["category"].isin(categories)]
+    return df
@@ -0,0 +1,75 @@
+# services/pagination.py
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Sortable columns; categories are compared by code (their categories are sorted)
+SORT_COLUMNS = {
+    "Date": "entry_date",
+    "Amount": "amount",
+    "Category": "category",
+}
+
+Key = Tuple[object, int]
+
+class OperationsPager:
+    """Keyset pagination over a frame, ordered by one column with `entry_id` as tie-breaker.
+
+    The ordering is computed once; each page is then located with a binary search on
+    the (value, entry_id) key of the last row seen, so its cost is bounded by the
+    page size rather than the number of operations.
+    """
+
+    def __init__(self, frame: pd.DataFrame, sort_by: str = "entry_date", ascending: bool = False):
+        self.frame = frame
+        self.ascending = ascending
+        column = frame[sort_by]
+        values = column.cat.codes.to_numpy() if isinstance(column.dtype, pd.CategoricalDtype) else column.to_numpy()
+        ids = frame["entry_id"].to_numpy(dtype=np.int64, na_value=-1)
+        # Ascending by (value, id); descending pages walk it from the end
+        self._order = np.lexsort((ids, values))
+        self._values = values[self._order]
+        self._ids = ids[self._order]
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the ordering (the frame is the caller's)."""
+        return self._order.nbytes + self._values.nbytes + self._ids.nbytes
+
+    def _rank(self, key: Key, side: str) -> int:
+        """Number of rows ordered before `key` ('left') or up to and including it ('right')."""
+        value, entry_id = key
+        lo = int(np.searchsorted(self._values, value, side="left"))
+        hi = int(np.searchsorted(self._values, value, side="right"))
+        return lo + int(np.searchsorted(self._ids[lo:hi], entry_id, side=side))
+
+    def start_of(self, after: Optional[Key]) -> int:
+        """Position (in page order) of the first row after `after`."""
+        if after is None:
+            return 0
+        if self.ascending:
+            return self._rank(after, "right")
+        return len(self) - self._rank(after, "left")
+
+    def _positions(self, start: int, size: int) -> np.ndarray:
+        if self.ascending:
+            return self._order[start:start + size]
+        stop = len(self) - start
+        return self._order[max(stop - size, 0):stop][::-1]
+
+    def page(self, after: Optional[Key] = None, size: int = 50) -> Tuple[pd.DataFrame, int, Optional[Key]]:
+        """Rows of the page following `after`, its start offset and the key for the next page."""
+        start = self.start_of(after)
+        positions = self._positions(start, size)
+        rows = self.frame.iloc[positions]
+        next_key = None
+        if len(positions) and start + len(positions) < len(self):
+            next_key = self._key_at_position(start + len(positions) - 1)
+        return rows, start, next_key
+
+    def _key_at_position(self, position: int) -> Key:
+        i = position if self.ascending else len(self) - 1 - position
+        return self._values[i], int(self._ids[i])
@@ -0,0 +1,104 @@
+# services/response_cache.py
+import threading
+import time
+from typing import Dict, Hashable, Optional
+from services.shared_cache import SharedCache, shared_cache
+
+# Freshness per endpoint prefix, in seconds; endpoints not listed are never cached
+DEFAULT_TTLS = {
+    "/categories/": 3600.0,
+    "/balance/": 5.0,
+}
+# Endpoints answering the same for every user; one cached copy serves them all
+DEFAULT_SHARED = ("/categories/",)
+# Bookkeeping bytes charged per entry on top of the body
+_ENTRY_OVERHEAD = 512
+
+class ResponseCache:
+    """GET response bodies with their ETag/Last-Modified validators.
+
+    Entries live in the process-wide SharedCache, so they count against (and
+    are evicted under) the same memory budget as the other shared data. Keys
+    are (user_id, endpoint, params); endpoints listed in `shared` are stored
+    once for all users. Bodies are stored as raw bytes so every caller parses
+    its own copy and cached data can never be mutated through a returned object.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, shared=DEFAULT_SHARED,
+                 store: Optional[SharedCache] = None):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.shared = tuple(shared)
+        self.backing = store or shared_cache
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def ttl_for(self, endpoint: str) -> Optional[float]:
+        for prefix, ttl in self.ttls.items():
+            if endpoint.startswith(prefix):
+                return ttl
+        return None
+
+    def _store_key(self, key: Hashable):
+        user_id, endpoint = key[0], key[1]
+        if endpoint.startswith(self.shared):
+            user_id = None
+        return ("http", user_id) + tuple(key[1:])
+
+    def lookup(self, key: Hashable) -> Optional[Dict]:
+        """Return the entry for `key` (fresh or stale) and mark it recently used."""
+        return self.backing.get(self._store_key(key))
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return time.time() - entry["stored_at"] < entry["ttl"]
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, key: Hashable, ttl: float, content: bytes,
+              etag: Optional[str], last_modified: Optional[str]) -> None:
+        with self._lock:
+            self.misses += 1
+        store_key = self._store_key(key)
+        # Replaces the stale entry, if any
+        self.backing.pop(store_key)
+        self.backing.put(store_key, {
+            "content": content,
+            "etag": etag,
+            "last_modified": last_modified,
+            "ttl": ttl,
+            "stored_at": time.time(),
+        }, size=len(content) + _ENTRY_OVERHEAD)
+
+    def record_hit(self, entry: Dict, revalidated: bool = False) -> None:
+        with self._lock:
+            if revalidated:
+                entry["stored_at"] = time.time()
+                self.revalidated += 1
+            else:
+                self.hits += 1
+
+    def invalidate(self, user_id, prefix: str = "") -> None:
+        """Drop a user's cached responses whose endpoint starts with `prefix`."""
+        self.backing.discard(lambda key: key[0] == "http" and key[1] == user_id and key[2].startswith(prefix))
+
+    def stats(self) -> Dict[str, int]:
+        occupancy = self.backing.stats()["kinds"].get("http", {"entries": 0, "bytes": 0})
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "entries": occupancy["entries"],
+                "bytes": occupancy["bytes"],
+            }
+
+# Shared by all sessions in the process; keys always include the user id
+response_cache = ResponseCache()
@@ -0,0 +1,175 @@
+# services/rollups.py
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+DateLike = Union[date, datetime, pd.Timestamp]
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    """Prefix sums along the last axis with a leading zero, so sum[lo:hi] = P[hi] - P[lo]."""
+    pad = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+    return np.pad(np.cumsum(values, axis=-1), pad)
+
+class Rollup:
+    """Daily x category x type aggregates of the operations, with prefix sums.
+
+    Built once per data version (from the operations frame, or from aggregates
+    computed by the storage backend); window queries then
+    cost O(1) (totals) or O(days) (monthly series) instead of O(rows).
+    Operations are bucketed by calendar day, matching date-only `entry_date`s.
+    """
+
+    def __init__(self, categories, days: np.ndarray, category_codes: np.ndarray, is_income: np.ndarray,
+                 amount: np.ndarray, count: np.ndarray, last_days: np.ndarray,
+                 last_amount: np.ndarray, last_is_income: np.ndarray):
+        """Aggregate rows of (day, category code, type, amount sum, row count).
+
+        `days` are int64 days since the epoch; `last_*` describe the last operation
+        of every active day, sorted by day. Use from_frame or from_daily.
+        """
+        self.categories = list(categories)
+        self.empty = len(days) == 0
+        if self.empty:
+            self.day0, self.n_days = 0, 0
+            return
+
+        self.day0 = int(days.min())
+        idx = days - self.day0
+        self.n_days = n_days = int(idx.max()) + 1
+
+        income_w = np.where(is_income, amount, 0.0)
+        expense_w = np.where(is_income, 0.0, amount)
+
+        self.income = np.bincount(idx, weights=income_w, minlength=n_days)
+        self.expense = np.bincount(idx, weights=expense_w, minlength=n_days)
+        self.count = np.bincount(idx, weights=count, minlength=n_days).astype(np.int64)
+        self._income_p = _prefix(self.income)
+        self._expense_p = _prefix(self.expense)
+        self._count_p = _prefix(self.count)
+
+        codes = category_codes.astype(np.int64)
+        known = codes >= 0
+        n_cat = len(self.categories)
+        flat = codes[known] * n_days + idx[known]
+        self.category_income = np.bincount(
+            flat, weights=income_w[known], minlength=n_cat * n_days).reshape(n_cat, n_days)
+        self.category_expense = np.bincount(
+            flat, weights=expense_w[known], minlength=n_cat * n_days).reshape(n_cat, n_days)
+        self._category_income_p = _prefix(self.category_income)
+        self._category_expense_p = _prefix(self.category_expense)
+        expense_rows = known & ~is_income
+        self.category_expense_count = np.bincount(
+            codes[expense_rows], weights=count[expense_rows], minlength=n_cat).astype(np.int64)
+
+        self.active_days = last_days - self.day0
+        self.last_amount = last_amount
+        self.last_is_income = last_is_income
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "Rollup":
+        """Aggregate a date-sorted frame from build_operations_frame (undated rows are left out)."""
+        dated = frame['entry_date'].notna()
+        if not dated.all():
+            frame = frame[dated]
+        categories = frame['category'].cat.categories
+        days = frame['entry_date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+        amount = frame['amount'].to_numpy(dtype=np.float64)
+        is_income = (frame['type'] == 'income').to_numpy()
+        # Last operation of every active day (the frame is date-sorted)
+        last = np.flatnonzero(np.r_[days[1:] != days[:-1], True]) if len(days) else np.array([], dtype=np.int64)
+        return cls(
+            categories, days, frame['category'].cat.codes.to_numpy(), is_income, amount,
+            np.ones(len(days)), days[last], amount[last], is_income[last],
+        )
+
+    @classmethod
+    def from_daily(cls, daily: pd.DataFrame, last: pd.DataFrame) -> "Rollup":
+        """Build from pre-aggregated rows (see AggregateStorage.daily_aggregates)."""
+        categories = sorted(daily['category'].dropna().unique())
+        codes = pd.Categorical(daily['category'], categories=categories).codes
+        to_days = lambda s: pd.to_datetime(s).to_numpy().astype('datetime64[D]').astype(np.int64)
+        last = last.sort_values('entry_date')
+        return cls(
+            categories,
+            to_days(daily['entry_date']),
+            np.asarray(codes),
+            (daily['type'] == 'income').to_numpy(),
+            daily['amount'].to_numpy(dtype=np.float64),
+            daily['count'].to_numpy(dtype=np.float64),
+            to_days(last['entry_date']),
+            last['amount'].to_numpy(dtype=np.float64),
+            (last['type'] == 'income').to_numpy(),
+        )
+
+    def day_bounds(self, start: DateLike, end: DateLike, include_end: bool = True) -> Tuple[int, int]:
+        """Half-open day-index range [lo, hi) of days d with start <= d <= end (or < end)."""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        lo = start.normalize() + pd.Timedelta(days=1) if start != start.normalize() else start
+        if include_end:
+            hi = end.normalize() + pd.Timedelta(days=1)
+        else:
+            hi = end.normalize() + pd.Timedelta(days=1) if end != end.normalize() else end
+        to_index = lambda ts: int(ts.to_datetime64().astype('datetime64[D]').astype(np.int64)) - self.day0
+        lo_i = min(max(to_index(lo), 0), self.n_days)
+        hi_i = min(max(to_index(hi), 0), self.n_days)
+        return lo_i, max(lo_i, hi_i)
+
+    def window_totals(self, start: DateLike, end: DateLike, include_end: bool = True) -> Dict[str, float]:
+        """Raw income/expense `amount` sums, net and row count for a date window."""
+        if self.empty:
+            return {'income': 0.0, 'expense': 0.0, 'net': 0.0, 'count': 0}
+        lo, hi = self.day_bounds(start, end, include_end)
+        income = float(self._income_p[hi] - self._income_p[lo])
+        expense = float(self._expense_p[hi] - self._expense_p[lo])
+        return {
+            'income': income,
+            'expense': expense,
+            'net': income - expense,
+            'count': int(self._count_p[hi] - self._count_p[lo]),
+        }
+
+    def latest_in_window(self, start: DateLike, end: DateLike) -> Optional[Dict]:
+        """Amount and type of the last operation on the latest active day of the window."""
+        if self.empty:
+            return None
+        lo, hi = self.day_bounds(start, end)
+        j = int(np.searchsorted(self.active_days, hi, side='left')) - 1
+        if j < 0 or self.active_days[j] < lo:
+            return None
+        return {
+            'amount': float(self.last_amount[j]),
+            'type': 'income' if self.last_is_income[j] else 'expense',
+        }
+
+    def category_expenses(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> pd.DataFrame:
+        """Expense `amount` per category (columns 'category', 'amount'), over a window or all time."""
+        if self.empty:
+            return pd.DataFrame({'category': [], 'amount': []})
+        if start is None and end is None:
+            sums = self._category_expense_p[:, -1]
+            present = self.category_expense_count > 0
+        else:
+            lo, hi = self.day_bounds(start, end)
+            sums = self._category_expense_p[:, hi] - self._category_expense_p[:, lo]
+            present = sums != 0
+        return pd.DataFrame({
+            'category': [c for c, keep in zip(self.categories, present) if keep],
+            'amount': sums[present],
+        })
+
+    def monthly_totals(self) -> pd.DataFrame:
+        """Income and expense `amount` sums per 'YYYY-MM' month that has operations."""
+        if self.empty:
+            return pd.DataFrame(columns=['expense', 'income'])
+        months = (np.arange(self.n_days) + self.day0).astype('datetime64[D]').astype('datetime64[M]')
+        starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+        counts = np.add.reduceat(self.count, starts)
+        active = counts > 0
+        return pd.DataFrame(
+            {
+                'expense': np.add.reduceat(self.expense, starts)[active],
+                'income': np.add.reduceat(self.income, starts)[active],
+            },
+            index=pd.Index(months[starts][active].astype(str), name='month'),
+        )
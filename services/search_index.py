@@ -0,0 +1,183 @@
+# services/search_index.py
+import heapq
+import re
+import sys
+from bisect import bisect_left
+from datetime import date
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from services.api_manager import ID_FIELD
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Match quality per query term: whole token > token prefix > inside a token
+EXACT, PREFIX, SUBSTRING = 3, 2, 1
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(str(text).lower())
+
+def trigrams(token: str) -> Set[str]:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+class SearchIndex:
+    """Inverted index over operation descriptions and categories.
+
+    Postings map tokens to entry ids; a trigram map over the (small) vocabulary
+    answers substring terms without scanning documents. Supports incremental
+    add/remove so a data version change only touches the rows that changed.
+    """
+
+    def __init__(self):
+        self._docs: Dict[int, Dict] = {}
+        self._doc_tokens: Dict[int, FrozenSet[str]] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._vocabulary: Optional[List[str]] = None
+
+    @classmethod
+    def build(cls, operations: Iterable[Dict]) -> "SearchIndex":
+        index = cls()
+        index.add(operations)
+        return index
+
+    def copy(self) -> "SearchIndex":
+        """Independent index with the same contents (rows themselves are shared)."""
+        index = SearchIndex()
+        index._docs = dict(self._docs)
+        index._doc_tokens = dict(self._doc_tokens)
+        index._postings = {token: set(ids) for token, ids in self._postings.items()}
+        index._trigrams = {gram: set(tokens) for gram, tokens in self._trigrams.items()}
+        index._vocabulary = self._vocabulary
+        return index
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the index itself (the rows belong to the caller)."""
+        size = sum(sys.getsizeof(table) for table in (self._docs, self._doc_tokens, self._postings, self._trigrams))
+        # Rows with the same text share their token set
+        size += sum(map(sys.getsizeof, {id(tokens): tokens for tokens in self._doc_tokens.values()}.values()))
+        size += sum(map(sys.getsizeof, self._postings.values()))
+        size += sum(map(sys.getsizeof, self._trigrams.values()))
+        # Vocabulary strings (shared by postings, trigram sets and document token sets)
+        size += sum(map(sys.getsizeof, self._postings))
+        return size
+
+    def ids(self) -> Set[int]:
+        return set(self._docs)
+
+    def add(self, operations: Iterable[Dict]) -> None:
+        # Descriptions repeat a lot; rows with the same text share one token set
+        token_sets: Dict[Tuple[str, str], FrozenSet[str]] = {}
+        for op in operations:
+            entry_id = op[ID_FIELD]
+            if entry_id in self._docs:
+                self.remove([entry_id])
+            text = (op.get('description', ''), op.get('category', ''))
+            tokens = token_sets.get(text)
+            if tokens is None:
+                tokens = token_sets[text] = frozenset(tokenize(text[0])) | frozenset(tokenize(text[1]))
+            self._docs[entry_id] = op
+            self._doc_tokens[entry_id] = tokens
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = set()
+                    for gram in trigrams(token):
+                        self._trigrams.setdefault(gram, set()).add(token)
+                    self._vocabulary = None
+                postings.add(entry_id)
+
+    def remove(self, entry_ids: Iterable[int]) -> None:
+        for entry_id in entry_ids:
+            self._docs.pop(entry_id, None)
+            for token in self._doc_tokens.pop(entry_id, ()):
+                postings = self._postings[token]
+                postings.discard(entry_id)
+                if not postings:
+                    del self._postings[token]
+                    for gram in trigrams(token):
+                        self._trigrams[gram].discard(token)
+                    self._vocabulary = None
+
+    def _sorted_vocabulary(self) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        return self._vocabulary
+
+    def _term_matches(self, term: str) -> Dict[str, int]:
+        """Vocabulary tokens matching `term`, with their match quality."""
+        matches: Dict[str, int] = {}
+        if len(term) >= 3:
+            candidates = None
+            for gram in trigrams(term):
+                tokens = self._trigrams.get(gram, set())
+                candidates = set(tokens) if candidates is None else candidates & tokens
+                if not candidates:
+                    break
+            for token in candidates or ():
+                if term in token:
+                    matches[token] = SUBSTRING
+        vocabulary = self._sorted_vocabulary()
+        i = bisect_left(vocabulary, term)
+        while i < len(vocabulary) and vocabulary[i].startswith(term):
+            matches[vocabulary[i]] = PREFIX
+            i += 1
+        if term in self._postings:
+            matches[term] = EXACT
+        return matches
+
+    def search(
+        self,
+        query: str,
+        limit: int = 50,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Tuple[List[Dict], int]:
+        """Operations matching every query term, best and most recent first.
+
+        Amount bounds apply to the absolute amount; date bounds are inclusive.
+        Returns at most `limit` operations and the total number of matches.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return [], 0
+
+        scores: Optional[Dict[int, int]] = None
+        for term in terms:
+            term_scores: Dict[int, int] = {}
+            for token, quality in self._term_matches(term).items():
+                for entry_id in self._postings[token]:
+                    if term_scores.get(entry_id, 0) < quality:
+                        term_scores[entry_id] = quality
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {i: s + term_scores[i] for i, s in scores.items() if i in term_scores}
+            if not scores:
+                return [], 0
+
+        start_key = start.isoformat() if start else None
+        end_key = end.isoformat() if end else None
+        hits = []
+        for entry_id, score in scores.items():
+            op = self._docs[entry_id]
+            amount = abs(op['amount'])
+            # Undated rows ('') fail any date bound and rank after dated ones
+            day = str(op.get('entry_date') or '')[:10]
+            if min_amount is not None and amount < min_amount:
+                continue
+            if max_amount is not None and amount > max_amount:
+                continue
+            if not day and (start_key or end_key):
+                continue
+            if start_key and day < start_key:
+                continue
+            if end_key and day > end_key:
+                continue
+            hits.append((score, day, entry_id))
+        top = heapq.nlargest(limit, hits)
+        return [self._docs[entry_id] for _, _, entry_id in top], len(hits)
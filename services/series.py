@@ -0,0 +1,39 @@
+# services/series.py
+import numpy as np
+import pandas as pd
+from services.rollups import Rollup
+
+DEFAULT_POINT_BUDGET = 1000
+
+def daily_close(rollup: Rollup) -> pd.DataFrame:
+    """End-of-day balance for every day that has operations."""
+    if rollup.empty:
+        return pd.DataFrame({'entry_date': pd.to_datetime([]), 'cumulative_balance': []})
+    balance = np.cumsum(rollup.income - rollup.expense)
+    days = rollup.active_days
+    return pd.DataFrame({
+        'entry_date': (days + rollup.day0).astype('datetime64[D]').astype('datetime64[ns]'),
+        'cumulative_balance': balance[days],
+    })
+
+def minmax_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices that keep each bucket's min and max (plus both ends), at most ~max_points."""
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    buckets = max(1, (max_points - 2) // 2)
+    size = -(-n // buckets)
+    padded = np.pad(values, (0, buckets * size - n), mode='edge').reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    picks = np.concatenate([
+        offsets + padded.argmin(axis=1),
+        offsets + padded.argmax(axis=1),
+        [0, n - 1],
+    ])
+    return np.unique(np.minimum(picks, n - 1))
+
+def balance_series(rollup: Rollup, max_points: int = DEFAULT_POINT_BUDGET) -> pd.DataFrame:
+    """Daily-close balance, min/max-decimated to the point budget for plotting."""
+    closes = daily_close(rollup)
+    keep = minmax_indices(closes['cumulative_balance'].to_numpy(), max_points)
+    return closes.iloc[keep].reset_index(drop=True)
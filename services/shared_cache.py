@@ -0,0 +1,194 @@
+# services/shared_cache.py
+import sys
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+DEFAULT_BUDGET = 512 * 2 ** 20
+# Large containers are sized from this many of their items
+_SAMPLE = 64
+_MAX_DEPTH = 6
+
+def estimate_size(value, _depth: int = 0, _seen: Optional[set] = None) -> int:
+    """Approximate bytes held by `value`, following containers and object attributes.
+
+    DataFrames and arrays report their own usage; big containers are sized from
+    a sample of their items, so the cost stays small whatever their length.
+    Objects reachable twice are counted once.
+    """
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (str, bytes, bytearray, int, float, bool, type(None))):
+        return sys.getsizeof(value)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int) and not hasattr(value, "memory_usage"):
+        return nbytes
+    if hasattr(value, "memory_usage"):
+        # pandas objects (a Series of per-column sizes for DataFrames)
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    size = sys.getsizeof(value)
+    if _depth >= _MAX_DEPTH:
+        return size
+    if isinstance(value, dict):
+        return size + _sampled_size(value.items(), len(value), _depth + 1, seen, pairs=True)
+    if isinstance(value, (list, tuple, set, frozenset)) or type(value).__name__ == "deque":
+        return size + _sampled_size(value, len(value), _depth + 1, seen)
+    if hasattr(value, "__dict__"):
+        size += estimate_size(vars(value), _depth + 1, seen)
+    for slot in getattr(type(value), "__slots__", ()):
+        if hasattr(value, slot):
+            size += estimate_size(getattr(value, slot), _depth + 1, seen)
+    return size
+
+def _sampled_size(items, total: int, depth: int, seen: set, pairs: bool = False) -> int:
+    """Size of `total` items (or key/value pairs), extrapolated from about _SAMPLE evenly spaced ones."""
+    if total > _SAMPLE:
+        # Stride through the iterator instead of copying it into a list
+        items = islice(items, 0, None, total // _SAMPLE)
+    sampled = count = 0
+    for item in items:
+        if pairs:
+            sampled += estimate_size(item[0], depth, seen) + estimate_size(item[1], depth, seen)
+        else:
+            sampled += estimate_size(item, depth, seen)
+        count += 1
+    return sampled * total // count if count else 0
+
+class SharedCache:
+    """Process-wide LRU of values shared by all sessions, bounded by a memory budget.
+
+    The same object is handed to every session asking for a key, so cached
+    values must be treated as read-only. Keys are tuples whose first item names
+    the kind of data ("http", "operations", "derived", ...); occupancy is
+    reported per kind. Values are sized once when stored, and the least
+    recently used entries are evicted until the new one fits.
+    """
+
+    def __init__(self, budget: int = DEFAULT_BUDGET, sizer: Callable = estimate_size):
+        self.budget = budget
+        self.sizer = sizer
+        self._entries: "OrderedDict[Hashable, Tuple[object, int]]" = OrderedDict()
+        self._bytes = 0
+        self._builds: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.deduplicated = 0
+
+    def get(self, key: Hashable, default=None):
+        """Return the value for `key` (marking it recently used), or `default`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value, size: Optional[int] = None):
+        """Store `value` unless `key` is already cached; return the cached instance.
+
+        Callers should keep the returned object, so equal data loaded by several
+        sessions ends up held once. Values larger than the whole budget are
+        returned without being stored.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.deduplicated += 1
+                return entry[0]
+        size = self.sizer(value) if size is None else size
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.deduplicated += 1
+                return entry[0]
+            if size > self.budget:
+                return value
+            self._entries[key] = (value, size)
+            self._bytes += size
+            self._evict()
+            return value
+
+    def get_or_build(self, key: Hashable, build: Callable, size: Optional[int] = None):
+        """Cached value for `key`, calling `build()` once even if sessions ask concurrently."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        with self._lock:
+            build_lock = self._builds.setdefault(key, threading.Lock())
+        with build_lock:
+            try:
+                with self._lock:
+                    entry = self._entries.get(key)
+                if entry is not None:
+                    return entry[0]
+                return self.put(key, build(), size)
+            finally:
+                with self._lock:
+                    self._builds.pop(key, None)
+
+    def pop(self, key: Hashable, default=None):
+        """Remove `key` and return its value (e.g. to update it privately)."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self._bytes -= entry[1]
+            return entry[0]
+
+    def discard(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches `predicate`; returns how many were dropped."""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._bytes -= self._entries.pop(key)[1]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def set_budget(self, budget: int) -> None:
+        with self._lock:
+            self.budget = budget
+            self._evict()
+
+    def _evict(self) -> None:
+        # Caller holds the lock
+        while self._bytes > self.budget and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict:
+        """Occupancy (overall and per kind of data) and hit counters."""
+        with self._lock:
+            kinds: Dict[str, Dict[str, int]] = {}
+            for key, (_, size) in self._entries.items():
+                kind = kinds.setdefault(str(key[0]) if isinstance(key, tuple) else "other",
+                                        {"entries": 0, "bytes": 0})
+                kind["entries"] += 1
+                kind["bytes"] += size
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "budget": self.budget,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "deduplicated": self.deduplicated,
+                "kinds": kinds,
+            }
+
+# Shared by all sessions in the process
+shared_cache = SharedCache()
@@ -0,0 +1,253 @@
+# services/sql_storage.py
+import hashlib
+import hmac
+import secrets
+import threading
+from datetime import date
+from typing import Dict, Hashable, List, Optional, Tuple
+import pandas as pd
+import streamlit as st
+from sqlalchemy import (
+    Column, Date, ForeignKey, Index, Integer, MetaData, Numeric, String, Table,
+    bindparam, case, create_engine, delete, func, insert, select,
+)
+from services.api_manager import ID_FIELD
+from services.operation_store import OperationStore
+from services.storage import AggregateStorage
+
+metadata = MetaData()
+
+users = Table(
+    "users", metadata,
+    Column("user_id", Integer, primary_key=True, autoincrement=True),
+    Column("email", String(255), nullable=False, unique=True),
+    Column("password_hash", String(255), nullable=False),
+    Column("currency", String(8), nullable=False, default="€"),
+)
+
+categories = Table(
+    "categories", metadata,
+    Column("category_id", Integer, primary_key=True, autoincrement=True),
+    Column("category_name", String(64), nullable=False, unique=True),
+)
+
+operations = Table(
+    "operations", metadata,
+    Column("entry_id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", Integer, ForeignKey("users.user_id"), nullable=False),
+    Column("entry_date", Date, nullable=False),
+    Column("description", String(255), nullable=False, default=""),
+    Column("amount", Numeric(14, 2, asdecimal=False), nullable=False),
+    Column("category", String(64), nullable=False),
+    # Every query filters by user; most then range over dates or group by category
+    Index("ix_operations_user_date", "user_id", "entry_date"),
+    Index("ix_operations_user_category", "user_id", "category"),
+    # Ids must never be reused: they are the delta sync cursor, part of data_version
+    # and tombstone keys (SQLite otherwise reuses the highest id once it is deleted)
+    sqlite_autoincrement=True,
+)
+
+# Ids of deleted operations, so delta syncs can detect tombstones; `seq` orders
+# the deletions, so a delta only lists those after the client's watermark
+deleted_operations = Table(
+    "deleted_operations", metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", Integer, nullable=False),
+    Column("entry_id", Integer, nullable=False),
+    Index("ux_deleted_operations_user_entry", "user_id", "entry_id", unique=True),
+    Index("ix_deleted_operations_user_seq", "user_id", "seq"),
+    sqlite_autoincrement=True,
+)
+
+# Statements are built once with bound parameters so SQLAlchemy's compiled cache
+# (and the driver's statement cache) reuse them for every call.
+_user = bindparam("user_id")
+_is_income = operations.c.amount > 0
+_type = case((_is_income, "income"), else_="expense").label("type")
+_OP_COLUMNS = (operations.c.entry_id, operations.c.entry_date, operations.c.description,
+               operations.c.amount, operations.c.category)
+
+LOAD_ALL = select(*_OP_COLUMNS).where(operations.c.user_id == _user).order_by(operations.c.entry_id)
+LOAD_SINCE = (select(*_OP_COLUMNS)
+              .where(operations.c.user_id == _user, operations.c.entry_id > bindparam("cursor"))
+              .order_by(operations.c.entry_id))
+LOAD_BETWEEN = (select(*_OP_COLUMNS)
+                .where(operations.c.user_id == _user,
+                       operations.c.entry_date.between(bindparam("start"), bindparam("end")))
+                .order_by(operations.c.entry_date, operations.c.entry_id))
+DELETED_SINCE = (select(deleted_operations.c.entry_id)
+                 .where(deleted_operations.c.user_id == _user,
+                        deleted_operations.c.entry_id <= bindparam("cursor"),
+                        deleted_operations.c.seq > bindparam("deleted_cursor"),
+                        deleted_operations.c.seq <= bindparam("last_deletion")))
+LAST_DELETION = select(func.max(deleted_operations.c.seq)).where(deleted_operations.c.user_id == _user)
+VERSION = select(func.count(), func.max(operations.c.entry_id), func.sum(operations.c.amount)).where(
+    operations.c.user_id == _user)
+# Same convention as BalanceCalculator: income adds its amount, anything else subtracts it
+BALANCE = select(func.coalesce(func.sum(
+    case((_is_income, operations.c.amount), else_=-operations.c.amount)), 0)).where(
+    operations.c.user_id == _user)
+TYPE_TOTALS = select(
+    func.coalesce(func.sum(case((_is_income, operations.c.amount), else_=0)), 0),
+    func.coalesce(func.sum(case((_is_income, 0), else_=operations.c.amount)), 0),
+).where(operations.c.user_id == _user)
+DAILY = (select(operations.c.entry_date, operations.c.category, _type,
+                func.sum(operations.c.amount).label("amount"), func.count().label("count"))
+         .where(operations.c.user_id == _user)
+         .group_by(operations.c.entry_date, operations.c.category, _type))
+_last_ids = (select(func.max(operations.c.entry_id).label("entry_id"))
+             .where(operations.c.user_id == _user)
+             .group_by(operations.c.entry_date)
+             .subquery())
+LAST_PER_DAY = select(operations.c.entry_date, operations.c.amount, _type).join(
+    _last_ids, operations.c.entry_id == _last_ids.c.entry_id)
+
+_engines: Dict[str, object] = {}
+_engines_lock = threading.Lock()
+
+def get_engine(url: str, pool_size: int = 10):
+    """Process-wide pooled engine per database URL (schema created on first use)."""
+    with _engines_lock:
+        if url not in _engines:
+            if url.startswith("sqlite"):
+                engine = create_engine(url, connect_args={"check_same_thread": False}, future=True)
+            else:
+                engine = create_engine(url, pool_size=pool_size, max_overflow=pool_size,
+                                       pool_pre_ping=True, future=True)
+            metadata.create_all(engine)
+            _engines[url] = engine
+        return _engines[url]
+
+def hash_password(password: str, salt: Optional[str] = None, iterations: int = 200_000) -> str:
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations).hex()
+    return f"pbkdf2_sha256${iterations}${salt}${digest}"
+
+def verify_password(password: str, stored: str) -> bool:
+    try:
+        _, iterations, salt, _ = stored.split("$")
+    except ValueError:
+        return False
+    return hmac.compare_digest(hash_password(password, salt, int(iterations)), stored)
+
+class SQLStorage(AggregateStorage):
+    """Storage reading the database directly (PostgreSQL in production, SQLite in tests).
+
+    Balances, totals and daily rollups are computed by SQL so only aggregates
+    leave the database.
+    """
+
+    def __init__(self, url: str, pool_size: int = 10):
+        self.engine = get_engine(url, pool_size=pool_size)
+
+    def create_user(self, email: str, password: str, currency: str = "€") -> int:
+        with self.engine.begin() as conn:
+            result = conn.execute(insert(users).values(
+                email=email, password_hash=hash_password(password), currency=currency))
+            return result.inserted_primary_key[0]
+
+    def login(self, username: str, password: str) -> bool:
+        with self.engine.connect() as conn:
+            user = conn.execute(select(users).where(users.c.email == username)).first()
+        if user is None or not verify_password(password, user.password_hash):
+            print("Login failed: invalid credentials")
+            return False
+        st.session_state["logged_in"] = True
+        st.session_state["currency_symbol"] = user.currency
+        st.session_state["user_id"] = user.user_id
+        # Sessions are server-side; the token only marks the session as authenticated
+        st.session_state["access_token"] = secrets.token_urlsafe(32)
+        return True
+
+    def _user_id(self) -> int:
+        if not st.session_state.get("access_token") or not st.session_state.get("user_id"):
+            raise Exception("Not authenticated. Please log in first.")
+        return st.session_state["user_id"]
+
+    def _rows(self, statement, **params) -> OperationStore:
+        with self.engine.connect() as conn:
+            rows = conn.execute(statement, {"user_id": self._user_id(), **params}).mappings().all()
+        return OperationStore.from_records(rows)
+
+    def load(self) -> OperationStore:
+        return self._rows(LOAD_ALL)
+
+    def load_since(self, cursor: int, deleted_cursor: Optional[int] = None) -> Dict:
+        user_id = self._user_id()
+        with self.engine.connect() as conn:
+            # The watermark is read first: a deletion committed meanwhile is
+            # past it, so the next delta lists it
+            last_deletion = conn.execute(LAST_DELETION, {"user_id": user_id}).scalar() or 0
+            deleted = conn.execute(DELETED_SINCE, {
+                "user_id": user_id, "cursor": cursor,
+                "deleted_cursor": deleted_cursor or 0, "last_deletion": last_deletion,
+            }).scalars().all()
+            total = conn.execute(VERSION, {"user_id": user_id}).first()[0]
+        return {
+            "operations": self._rows(LOAD_SINCE, cursor=cursor),
+            "deleted_ids": list(deleted),
+            "deleted_cursor": max(last_deletion, deleted_cursor or 0),
+            "total": total,
+            "full": False,
+        }
+
+    def load_between(self, start: date, end: date) -> OperationStore:
+        return self._rows(LOAD_BETWEEN, start=start, end=end)
+
+    def add_entry(self, entry_data: Dict) -> None:
+        self.add_entries([entry_data])
+
+    def add_entries(self, entries: List[Dict]) -> None:
+        """Insert several operations in one transaction (a single executemany)."""
+        user_id = self._user_id()
+        rows = []
+        for entry in entries:
+            amount = abs(float(entry["amount"]))
+            rows.append({
+                "user_id": user_id,
+                "entry_date": date.fromisoformat(str(entry["entry_date"])[:10]),
+                "description": entry.get("description", ""),
+                "amount": amount if entry["type"] == "income" else -amount,
+                "category": entry.get("category", "Other"),
+            })
+        with self.engine.begin() as conn:
+            conn.execute(insert(operations), rows)
+
+    def delete_entry(self, entry_id: int) -> None:
+        user_id = self._user_id()
+        with self.engine.begin() as conn:
+            deleted = conn.execute(delete(operations).where(
+                operations.c.user_id == user_id, operations.c[ID_FIELD] == entry_id)).rowcount
+            if deleted:
+                # Idempotent, in case a tombstone for this id already exists (it
+                # gets a new sequence number, so clients past the old one see it)
+                conn.execute(delete(deleted_operations).where(
+                    deleted_operations.c.user_id == user_id, deleted_operations.c.entry_id == entry_id))
+                conn.execute(insert(deleted_operations).values(user_id=user_id, entry_id=entry_id))
+
+    def get_categories(self) -> List[str]:
+        with self.engine.connect() as conn:
+            return list(conn.execute(
+                select(categories.c.category_name).order_by(categories.c.category_name)).scalars())
+
+    def data_version(self) -> Hashable:
+        with self.engine.connect() as conn:
+            return tuple(conn.execute(VERSION, {"user_id": self._user_id()}).first())
+
+    def balance(self) -> float:
+        with self.engine.connect() as conn:
+            return float(conn.execute(BALANCE, {"user_id": self._user_id()}).scalar())
+
+    def type_totals(self) -> Dict[str, float]:
+        with self.engine.connect() as conn:
+            income, expense = conn.execute(TYPE_TOTALS, {"user_id": self._user_id()}).first()
+        return {"income": float(income), "expense": float(expense)}
+
+    def daily_aggregates(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        params = {"user_id": self._user_id()}
+        with self.engine.connect() as conn:
+            daily = pd.DataFrame(conn.execute(DAILY, params).mappings().all(),
+                                 columns=["entry_date", "category", "type", "amount", "count"])
+            last = pd.DataFrame(conn.execute(LAST_PER_DAY, params).mappings().all(),
+                                columns=["entry_date", "amount", "type"])
+        return daily, last
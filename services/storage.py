@@ -0,0 +1,72 @@
+# services/storage.py
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import TYPE_CHECKING, Dict, Hashable, List, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from services.operation_store import OperationStore
+
+# Session state flag set when the backend rejects the session's credentials
+SESSION_EXPIRED_KEY = "session_expired"
+
+class SessionExpired(Exception):
+    """The backend no longer accepts the session's credentials (e.g. an expired access token).
+
+    Storages also set st.session_state[SESSION_EXPIRED_KEY], so the session is
+    logged out on its next run even if a page caught the exception.
+    """
+
+class Storage(ABC):
+    """Backend holding the logged-in user's operations (session state carries the user)."""
+
+    @abstractmethod
+    def login(self, username: str, password: str) -> bool:
+        """Authenticate and store the user details in session state."""
+
+    @abstractmethod
+    def load(self) -> "OperationStore":
+        """All operations of the current user (rows carry a 'type' derived from the amount)."""
+
+    @abstractmethod
+    def add_entry(self, entry_data: Dict) -> None:
+        ...
+
+    @abstractmethod
+    def delete_entry(self, entry_id: int) -> None:
+        ...
+
+    @abstractmethod
+    def get_categories(self) -> List[str]:
+        ...
+
+class AggregateStorage(Storage):
+    """Storage that can compute aggregates itself, so only results are transferred.
+
+    Amount conventions follow BalanceCalculator: rows with a positive amount are
+    income, the signed balance adds income amounts and subtracts the others.
+    """
+
+    @abstractmethod
+    def data_version(self) -> Hashable:
+        """Cheap fingerprint that changes whenever the user's operations change."""
+
+    @abstractmethod
+    def balance(self) -> float:
+        ...
+
+    @abstractmethod
+    def type_totals(self) -> Dict[str, float]:
+        """Raw amount sums for income and expense rows."""
+
+    @abstractmethod
+    def daily_aggregates(self) -> Tuple["pd.DataFrame", "pd.DataFrame"]:
+        """Per (day, category, type) sums and counts, and the last operation of each day.
+
+        The first frame has columns entry_date, category, type, amount, count; the
+        second has entry_date, amount, type.
+        """
+
+    @abstractmethod
+    def load_between(self, start: date, end: date) -> "OperationStore":
+        """Operations dated within [start, end] (inclusive days)."""
@@ -0,0 +1,222 @@
+# services/write_queue.py
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from datetime import date
+from typing import Dict, List, Optional
+from services import background
+from services.api_manager import ID_FIELD, with_type, write_not_sent
+from services.operation_store import OperationStore
+
+class WriteQueue:
+    """Writes of one session that have not reached the storage yet.
+
+    Queued adds get a temporary negative entry id so pages can show them (and
+    cancel them) before the backend stores them. A flush sends everything queued
+    in enqueue order, one run of same-kind writes at a time: adds go out in one
+    `add_entries` call when the storage has it, otherwise as concurrent requests
+    (at most `parallelism` at once). Failed writes are retried with exponential
+    backoff and then kept as failed until retried or discarded.
+
+    Adds are not idempotent, so they are only resent automatically when the
+    request never left (see write_not_sent). Any other failed add may have been
+    stored: it is kept as "unconfirmed" until the owner checks it against the
+    storage and calls `resolve`.
+    """
+
+    def __init__(self, parallelism: int = 4, max_attempts: int = 3, backoff: float = 0.5):
+        self.parallelism = parallelism
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        # Changes whenever the set of pending writes does
+        self.revision = 0
+        self._items: List[Dict] = []
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        self._flush: Optional[Future] = None
+
+    def add(self, operation: Dict) -> Dict:
+        """Queue an add and return its optimistic row (signed amount, type, temporary id)."""
+        seq = next(self._seq)
+        amount = abs(float(operation["amount"]))
+        row = with_type([{
+            ID_FIELD: -seq,
+            "entry_date": operation.get("entry_date") or date.today().isoformat(),
+            "description": operation.get("description", ""),
+            "amount": amount if operation.get("type") == "income" else -amount,
+            "category": operation.get("category", "Other"),
+        }])[0]
+        with self._lock:
+            self._items.append({"kind": "add", "payload": operation, "row": row,
+                                "state": "queued", "attempts": 0, "error": None})
+            self.revision += 1
+        return row
+
+    def delete(self, entry_id: int) -> None:
+        """Queue a delete; deleting an add that was not sent yet just cancels it."""
+        with self._lock:
+            if entry_id < 0:
+                for item in self._items:
+                    if item["kind"] == "add" and item["row"][ID_FIELD] == entry_id:
+                        if item["state"] not in ("queued", "failed"):
+                            raise ValueError("This operation is still being saved; try again in a moment.")
+                        self._items.remove(item)
+                        self.revision += 1
+                        return
+                return
+            if any(item["kind"] == "delete" and item["entry_id"] == entry_id for item in self._items):
+                return
+            self._items.append({"kind": "delete", "entry_id": entry_id,
+                                "state": "queued", "attempts": 0, "error": None})
+            self.revision += 1
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def apply(self, operations: OperationStore) -> OperationStore:
+        """`operations` as they will be once every pending write is stored."""
+        with self._lock:
+            deleted = [item["entry_id"] for item in self._items if item["kind"] == "delete"]
+            added = [item["row"] for item in self._items if item["kind"] == "add"]
+        if deleted:
+            operations = operations.without(deleted)
+        return operations.extend(added) if added else operations
+
+    def busy(self) -> bool:
+        return self._flush is not None and not self._flush.done()
+
+    def start_flush(self, storage, wait: bool = False) -> bool:
+        """Send the queued writes in the background, unless a flush is already running.
+
+        With `wait`, they are sent on the calling thread instead. A widget callback
+        holds the session state lock until it returns, so a storage reading the
+        session from a pooled thread would never get to send them.
+        """
+        with self._lock:
+            if self.busy():
+                return False
+            batch = [item for item in self._items if item["state"] == "queued"]
+            if not batch:
+                return False
+            for item in batch:
+                item["state"] = "sending"
+            if not wait:
+                self._flush = background.submit(self._send, storage, batch)
+                return True
+            self._flush = flush = Future()
+        try:
+            self._send(storage, batch)
+        finally:
+            flush.set_result(None)
+        return True
+
+    def wait(self) -> None:
+        """Block until the flush in flight (if any) has finished."""
+        if self._flush is not None:
+            self._flush.result()
+
+    def settle(self) -> List[Dict]:
+        """Drop and return the writes the storage confirmed, once no flush is running.
+
+        Called from the script thread, which updates its snapshot with them in the
+        same step, so a row never disappears from both the queue and the snapshot.
+        """
+        with self._lock:
+            if self.busy():
+                return []
+            done = [item for item in self._items if item["state"] == "done"]
+            if done:
+                self._items = [item for item in self._items if item["state"] != "done"]
+                self.revision += 1
+        return done
+
+    def unconfirmed(self) -> List[Dict]:
+        """Adds that failed in a way that may still have stored them, once no flush is running."""
+        with self._lock:
+            if self.busy():
+                return []
+            return [item for item in self._items if item["state"] == "unconfirmed"]
+
+    def resolve(self, stored: List[Dict], missing: List[Dict]) -> None:
+        """Outcome of unconfirmed adds: drop the `stored` ones, mark the `missing` ones failed."""
+        with self._lock:
+            for item in missing:
+                item["state"] = "failed"
+            if stored:
+                self._items = [item for item in self._items if not any(item is s for s in stored)]
+            self.revision += 1
+
+    def status(self) -> Dict:
+        """Counts of pending and failed writes, with the last error seen."""
+        with self._lock:
+            failed = [item for item in self._items if item["state"] == "failed"]
+            return {
+                "pending": len(self._items) - len(failed),
+                "failed": len(failed),
+                "error": failed[-1]["error"] if failed else None,
+            }
+
+    def retry_failed(self) -> None:
+        with self._lock:
+            for item in self._items:
+                if item["state"] == "failed":
+                    item.update(state="queued", attempts=0, error=None)
+
+    def discard_failed(self) -> None:
+        with self._lock:
+            self._items = [item for item in self._items if item["state"] != "failed"]
+            self.revision += 1
+
+    def _send(self, storage, batch: List[Dict]) -> None:
+        # Runs are sent one after another, so a delete never overtakes an earlier add
+        for kind, run in itertools.groupby(batch, key=lambda item: item["kind"]):
+            self._send_run(storage, kind, list(run))
+
+    def _send_run(self, storage, kind: str, items: List[Dict]) -> None:
+        for attempt in range(self.max_attempts):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            if kind == "add" and hasattr(storage, "add_entries"):
+                try:
+                    storage.add_entries([item["payload"] for item in items])
+                    errors = [None] * len(items)
+                except Exception as e:
+                    errors = [e] * len(items)
+            else:
+                errors = self._send_each(storage, kind, items)
+            failed = []
+            with self._lock:
+                for item, error in zip(items, errors):
+                    item["attempts"] += 1
+                    if error is None:
+                        item["state"] = "done"
+                    elif kind == "add" and not write_not_sent(error):
+                        item.update(state="unconfirmed", error=str(error))
+                    else:
+                        item["error"] = str(error)
+                        failed.append(item)
+            items = failed
+            if not items:
+                return
+        with self._lock:
+            for item in items:
+                item["state"] = "failed"
+        print(f"{len(items)} {kind} write(s) failed: {items[-1]['error']}")
+
+    def _send_each(self, storage, kind: str, items: List[Dict]) -> List[Optional[Exception]]:
+        """Send single writes, at most `parallelism` in flight; one result per item."""
+        if kind == "add":
+            send = lambda item: storage.add_entry(item["payload"])
+        else:
+            send = lambda item: storage.delete_entry(item["entry_id"])
+        errors: List[Optional[Exception]] = []
+        for start in range(0, len(items), self.parallelism):
+            futures = [background.submit_write(send, item) for item in items[start:start + self.parallelism]]
+            for future in futures:
+                try:
+                    future.result()
+                    errors.append(None)
+                except Exception as e:
+                    errors.append(e)
+        return errors
@@ -0,0 +1,22 @@
+import logging
+import sys
+from pathlib import Path
+import pytest
+import streamlit as st
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Session state is used outside a Streamlit server here ("bare mode")
+for name in ("streamlit.runtime.scriptrunner_utils.script_run_context",
+             "streamlit.runtime.state.session_state_proxy"):
+    logging.getLogger(name).setLevel(logging.ERROR)
+
+@pytest.fixture(autouse=True)
+def session_state():
+    # Imported here, once the repository root is importable
+    from services.shared_cache import shared_cache
+    st.session_state.clear()
+    shared_cache.clear()
+    yield st.session_state
+    st.session_state.clear()
+    shared_cache.clear()
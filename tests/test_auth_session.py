@@ -0,0 +1,79 @@
+import pytest
+import requests
+from services import auth_session
+from services.api_manager import APIStorage
+from services.auth_session import SessionStore
+from services.storage import SESSION_EXPIRED_KEY, SessionExpired
+
+AUTH = {"user_id": 1, "access_token": "api-token", "currency_symbol": "$"}
+
+def test_resume_rotates_the_token():
+    store = SessionStore(b"secret", grace=0)
+    token = store.issue(AUTH)
+    new_token, auth = store.resume(token)
+    assert auth == AUTH and new_token != token
+    # The old token was used up; the new one works once
+    assert store.resume(token) is None
+    assert store.resume(new_token) is not None
+
+def test_tabs_resuming_the_same_token_all_succeed():
+    store = SessionStore(b"secret")
+    token = store.issue(AUTH)
+    first, second = store.resume(token), store.resume(token)
+    assert first[1] == second[1] == AUTH
+    assert store.resume(first[0]) is not None and store.resume(second[0]) is not None
+
+def test_revoking_any_token_of_a_login_revokes_every_tab():
+    store = SessionStore(b"secret", grace=0)
+    token = store.issue(AUTH)
+    other_login = store.issue(AUTH)
+    tab_a, _ = store.resume(token)
+    tab_b, _ = store.resume(tab_a)
+    # Logging out from the tab whose token was rotated away by another tab
+    store.revoke(tab_a)
+    assert len(store) == 1
+    assert store.resume(tab_b) is None
+    assert store.resume(other_login) is not None
+
+def test_restore_login_only_clears_cookies_that_cannot_work(session_state, monkeypatch):
+    store = auth_session.session_store
+    token = store.issue(AUTH)
+    store.resume(token)
+    store.revoke(token)
+    # Valid but unknown here (rotated or revoked elsewhere): another tab may hold a newer cookie
+    monkeypatch.setattr(auth_session, "_browser_token", lambda: token)
+    assert auth_session.restore_login() is False
+    assert auth_session._COOKIE_UPDATE_KEY not in session_state
+    monkeypatch.setattr(auth_session, "_browser_token", lambda: token[:-1] + ("0" if token[-1] != "0" else "1"))
+    assert auth_session.restore_login() is False
+    assert session_state[auth_session._COOKIE_UPDATE_KEY] == ("", 0)
+
+@pytest.mark.parametrize("token", ["", "x", "a.b.c", "a.99999999999.é", None])
+def test_malformed_tokens_are_rejected(token):
+    assert SessionStore(b"secret").resume(token) is None
+
+def test_forged_expired_and_revoked_tokens_are_rejected():
+    store = SessionStore(b"secret")
+    token = store.issue(AUTH)
+    assert SessionStore(b"other").resume(token) is None
+    assert SessionStore(b"secret", ttl=-1).resume(SessionStore(b"secret", ttl=-1).issue(AUTH)) is None
+    store.revoke(token)
+    assert store.resume(token) is None
+
+def test_end_login_revokes_and_clears_the_session(session_state):
+    session_state.update(AUTH, logged_in=True)
+    auth_session.remember_login()
+    token = session_state[auth_session.TOKEN_KEY]
+    other_tab, _ = auth_session.session_store.resume(token)
+    auth_session.end_login("expired")
+    assert auth_session.session_store.resume(token) is None
+    assert auth_session.session_store.resume(other_tab) is None
+    assert session_state["logged_in"] is False and "access_token" not in session_state
+    assert session_state[auth_session.NOTICE_KEY] == "expired"
+
+def test_unauthorized_response_expires_the_session(session_state):
+    response = requests.Response()
+    response.status_code = 401
+    with pytest.raises(SessionExpired):
+        APIStorage._check_auth(response)
+    assert session_state[SESSION_EXPIRED_KEY] is True
@@ -0,0 +1,35 @@
+from services.data_manager import DataManager
+from services.mock_storage import MockBackend, MockStorage
+
+class RecordingBackend(MockBackend):
+    """MockBackend keeping the tombstones of every delta it answers."""
+
+    def __init__(self):
+        super().__init__()
+        self.deltas = []
+
+    def operations(self, user_id, since_id=None, deleted_since=None):
+        response = super().operations(user_id, since_id, deleted_since)
+        if since_id is not None:
+            self.deltas.append(response["deleted_ids"])
+        return response
+
+def test_delta_payload_only_carries_new_deletions():
+    storage = MockStorage(RecordingBackend())
+    storage.login("user@example.com", "secret")
+    backend, user_id = storage.backend, storage._user_id()
+    backend.seed(user_id, [{"entry_date": "2024-01-01", "description": f"op {i}", "amount": -1.0,
+                            "category": "Food"} for i in range(10)])
+    manager = DataManager(storage)
+    manager.begin_run()
+    assert len(manager.get_operations()) == 10
+
+    # Another session deletes a row before each sync
+    for remaining in range(9, 4, -1):
+        backend.delete(user_id, backend.operations(user_id)[0]["entry_id"])
+        manager.invalidate()
+        manager.begin_run()
+        assert len(manager.get_operations()) == remaining
+
+    # Each delta lists the deletion since the previous one, never the older ones
+    assert [len(deleted) for deleted in backend.deltas] == [1] * len(backend.deltas)
@@ -0,0 +1,16 @@
+import numpy as np
+import pandas as pd
+from services.importer import DuplicateIndex, prepare_chunk
+from services.operation_store import OperationStore
+
+def test_zero_amounts_are_skipped_but_not_unreadable():
+    chunk = pd.DataFrame({
+        "entry_date": ["2024-01-01", "2024-01-02", None, "2024-01-03"],
+        "description": ["coffee", "fee reversal", "garbled", "rent"],
+        "amount": [3.5, 0.0, 1.0, np.nan],
+        "type": ["expense"] * 4,
+        "category": ["Food", "Other", "Other", "Housing"],
+    })
+    operations, stats = prepare_chunk(chunk, DuplicateIndex(OperationStore.empty()), None, "Other")
+    assert [op["description"] for op in operations] == ["coffee"]
+    assert stats == {"invalid": 2, "zero_amount": 1, "duplicates": 0}
@@ -0,0 +1,36 @@
+from datetime import date
+from services.data_manager import DataManager
+from services.mock_storage import MockBackend, MockStorage
+from services.operation_store import OperationStore
+from services.operations_frame import build_operations_frame, filter_operations
+from services.rollups import Rollup
+
+OPERATIONS = [
+    {"entry_id": 1, "entry_date": "2024-01-01", "description": "salary", "amount": 100.0, "category": "Salary"},
+    {"entry_id": 2, "entry_date": None, "description": "undated", "amount": -7.0, "category": "Other"},
+    {"entry_id": 3, "entry_date": "2024-01-03", "description": "coffee", "amount": -3.5, "category": "Food"},
+]
+
+def test_undated_operation_is_left_out_of_rollups_and_date_slices():
+    for operations in (OperationStore.from_records(OPERATIONS), OPERATIONS):
+        frame = build_operations_frame(operations)
+        rollup = Rollup.from_frame(frame)
+        assert rollup.window_totals(date(2024, 1, 1), date(2024, 1, 3)) == Rollup.from_frame(
+            frame[frame["entry_date"].notna()]).window_totals(date(2024, 1, 1), date(2024, 1, 3))
+        sliced = filter_operations(frame, start=date(2024, 1, 2), end=date(2024, 1, 3))
+        assert sliced["description"].tolist() == ["coffee"]
+
+def test_data_manager_serves_accounts_with_undated_operations():
+    storage = MockStorage(MockBackend())
+    storage.login("user@example.com", "secret")
+    storage.backend.seed(storage._user_id(), OPERATIONS)
+    manager = DataManager(storage)
+    manager.begin_run()
+    assert manager.has_operations()
+    between = manager.get_operations_between(date(2024, 1, 1), date(2024, 1, 2))
+    assert between["description"].tolist() == ["salary"]
+
+def test_store_and_dict_frames_sort_undated_rows_last():
+    from_store = build_operations_frame(OperationStore.from_records(OPERATIONS))
+    from_dicts = build_operations_frame(OPERATIONS)
+    assert from_store["entry_id"].tolist() == from_dicts["entry_id"].tolist() == [1, 3, 2]
@@ -0,0 +1,62 @@
+from pathlib import Path
+import threading
+import time
+import pytest
+from streamlit.testing.v1 import AppTest
+from services.mock_storage import default_backend
+
+APP = str(Path(__file__).resolve().parent.parent / "app.py")
+
+@pytest.fixture
+def app(monkeypatch):
+    """The app logged in on the mock backend, for an account with an undated operation."""
+    monkeypatch.setenv("STORAGE_BACKEND", "mock")
+    monkeypatch.setenv("PRELOAD_PAGES", "0")
+    email = "pages@example.com"
+    default_backend.seed(default_backend.authenticate(email, "secret")["user_id"], [
+        {"entry_date": "2024-01-01", "description": "salary", "amount": 100.0, "category": "Salary"},
+        {"entry_date": None, "description": "undated", "amount": -7.0, "category": "Other"},
+        {"entry_date": "2024-03-01", "description": "coffee", "amount": -3.5, "category": "Food"},
+    ])
+    at = AppTest.from_file(APP, default_timeout=30).run()
+    at.text_input[0].input(email)
+    at.text_input[1].input("secret")
+    at.button[0].click().run()
+    return at.run()
+
+@pytest.mark.parametrize("page", ["Dashboard", "Operations", "Analytics", "Reports", "Settings"])
+def test_pages_render_with_an_undated_operation(app, page):
+    app.sidebar.radio[0].set_value(page).run()
+    assert not app.exception
+    if page in ("Operations", "Reports"):
+        # Date pickers span the dated operations
+        assert [str(day) for day in app.date_input[0].value] == ["2024-01-01", "2024-03-01"]
+
+def test_dashboard_shows_a_placeholder_until_the_login_warm_up_is_done(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "mock")
+    monkeypatch.setenv("PRELOAD_PAGES", "0")
+    email = "warm@example.com"
+    default_backend.seed(default_backend.authenticate(email, "secret")["user_id"], [
+        {"entry_date": "2024-01-01", "description": "salary", "amount": 100.0, "category": "Salary"},
+    ])
+    released = threading.Event()
+    operations = default_backend.operations
+    def slow_operations(*args, **kwargs):
+        released.wait(10)
+        return operations(*args, **kwargs)
+    monkeypatch.setattr(default_backend, "operations", slow_operations)
+    at = AppTest.from_file(APP, default_timeout=30).run()
+    at.text_input[0].input(email)
+    at.text_input[1].input("secret")
+    at.button[0].click().run()
+    # The dashboard does not wait for the rows...
+    assert not at.exception and not at.metric
+    assert [info.value for info in at.info] == ["Loading your operations..."]
+    released.set()
+    deadline = time.monotonic() + 10
+    while not at.metric and time.monotonic() < deadline:
+        time.sleep(0.05)
+        at.run()
+    # ...and shows them once they are in
+    assert not at.exception and "Loading your operations..." not in [info.value for info in at.info]
+    assert "Current Balance" in [metric.label for metric in at.metric]
@@ -0,0 +1,40 @@
+import random
+import pytest
+from services.operations_frame import build_operations_frame
+from services.pagination import SORT_COLUMNS, OperationsPager
+
+def make_frame(n=103, seed=7):
+    """Few distinct dates, amounts and categories, so most sort keys tie."""
+    rng = random.Random(seed)
+    ids = rng.sample(range(1, 10 * n), n)
+    return build_operations_frame([{
+        "entry_id": entry_id,
+        "entry_date": f"2024-01-{rng.randint(1, 5):02d}",
+        "description": f"op {entry_id}",
+        "amount": rng.choice([-20.0, -5.5, 3.0, 100.0]),
+        "category": rng.choice(["Rent", "Food", "Salary"]),
+    } for entry_id in ids])
+
+def walk(pager, size):
+    """entry_ids of every page, following next keys, checking each page's offset."""
+    seen, key = [], None
+    while True:
+        rows, start, key = pager.page(after=key, size=size)
+        assert start == len(seen)
+        seen.extend(rows["entry_id"].tolist())
+        if key is None:
+            return seen
+
+@pytest.mark.parametrize("column", list(SORT_COLUMNS.values()))
+@pytest.mark.parametrize("ascending", [True, False])
+@pytest.mark.parametrize("size", [1, 10, 103, 500])
+def test_pages_follow_sort_order_with_id_tie_breaker(column, ascending, size):
+    frame = make_frame()
+    expected = frame.sort_values([column, "entry_id"], ascending=ascending)["entry_id"].tolist()
+    assert walk(OperationsPager(frame, sort_by=column, ascending=ascending), size) == expected
+
+def test_pages_of_a_filtered_frame():
+    frame = make_frame()
+    frame = frame[frame["category"] != "Food"]
+    expected = frame.sort_values(["category", "entry_id"], ascending=False)["entry_id"].tolist()
+    assert walk(OperationsPager(frame, sort_by="category", ascending=False), 7) == expected
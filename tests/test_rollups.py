@@ -0,0 +1,81 @@
+import random
+from datetime import date, datetime, timedelta
+import pandas as pd
+import pytest
+from services.operation_store import OperationStore
+from services.operations_frame import build_operations_frame
+from services.rollups import Rollup
+
+NOW = datetime(2024, 6, 15, 13, 45)
+
+def make_frame(n=600, seed=3):
+    """Date-only operations over about a year, several per day on busy days."""
+    rng = random.Random(seed)
+    return build_operations_frame(OperationStore.from_records([{
+        "entry_id": i + 1,
+        "entry_date": (date(2023, 9, 1) + timedelta(days=rng.randint(0, 300))).isoformat(),
+        "description": f"op {i}",
+        "amount": rng.choice([-1, 1]) * rng.randint(1, 50_000) / 100,
+        "category": rng.choice(["Food", "Rent", "Salary", "Fun"]),
+    } for i in range(n)]))
+
+WINDOWS = {
+    # Dashboard presets: now minus N days, both ends with a time of day
+    "Week": (NOW - timedelta(days=7), NOW),
+    "Month": (NOW - timedelta(days=30), NOW),
+    "Quarter": (NOW - timedelta(days=90), NOW),
+    "Year": (NOW - timedelta(days=365), NOW),
+    # Custom ranges come from st.date_input as dates
+    "Custom": (date(2024, 3, 1), date(2024, 3, 31)),
+    "Custom, one day": (date(2024, 3, 5), date(2024, 3, 5)),
+    "Midnight timestamps": (datetime(2024, 2, 1), datetime(2024, 2, 29)),
+    "Mixed": (date(2024, 1, 10), datetime(2024, 1, 20, 0, 0, 1)),
+    "Before the data": (date(2020, 1, 1), date(2020, 12, 31)),
+    "After the data": (date(2030, 1, 1), datetime(2030, 2, 1, 8, 0)),
+}
+
+def sums(rows):
+    income = rows.loc[rows["type"] == "income", "amount"].sum()
+    expense = rows.loc[rows["type"] == "expense", "amount"].sum()
+    return {"income": income, "expense": expense, "net": income - expense, "count": len(rows)}
+
+@pytest.mark.parametrize("window", list(WINDOWS))
+def test_windows_match_the_boolean_masks(window):
+    """The masks render_key_metrics applied to the raw frame before the rollup."""
+    frame = make_frame()
+    rollup = Rollup.from_frame(frame)
+    start, end = (pd.to_datetime(bound) for bound in WINDOWS[window])
+    dates = frame["entry_date"]
+    current = frame[(dates >= start) & (dates <= end)]
+    previous = frame[(dates >= start - (end - start)) & (dates < start)]
+
+    assert rollup.window_totals(start, end) == pytest.approx(sums(current))
+    assert rollup.window_totals(start - (end - start), start, include_end=False) == pytest.approx(sums(previous))
+
+    latest = rollup.latest_in_window(start, end)
+    if current.empty:
+        assert latest is None
+    else:
+        last = current.iloc[-1]
+        assert latest == {"amount": pytest.approx(last["amount"]), "type": last["type"]}
+
+    by_category = current[current["type"] == "expense"].groupby("category", observed=True)["amount"].sum()
+    by_category = by_category[by_category != 0]
+    expenses = rollup.category_expenses(start, end)
+    assert expenses["category"].tolist() == by_category.index.tolist()
+    assert expenses["amount"].tolist() == pytest.approx(by_category.tolist())
+
+def test_all_time_aggregates_match_pandas():
+    frame = make_frame()
+    rollup = Rollup.from_frame(frame)
+    monthly = frame.assign(month=frame["entry_date"].dt.strftime("%Y-%m")).pivot_table(
+        index="month", columns="type", values="amount", aggfunc="sum", observed=False).fillna(0)
+    totals = rollup.monthly_totals()
+    assert totals.index.tolist() == monthly.index.tolist()
+    for column in ("income", "expense"):
+        assert totals[column].tolist() == pytest.approx(monthly[column].tolist())
+
+    by_category = frame[frame["type"] == "expense"].groupby("category", observed=True)["amount"].sum()
+    expenses = rollup.category_expenses()
+    assert expenses["category"].tolist() == by_category.index.tolist()
+    assert expenses["amount"].tolist() == pytest.approx(by_category.tolist())
@@ -0,0 +1,19 @@
+from datetime import date
+from services.operation_store import OperationStore
+from services.search_index import SearchIndex
+
+OPERATIONS = [
+    {"entry_id": 1, "entry_date": "2024-01-01", "description": "coffee", "amount": -3.0, "category": "Food"},
+    {"entry_id": 2, "entry_date": None, "description": "coffee", "amount": -4.0, "category": "Food"},
+    {"entry_id": 3, "entry_date": "2024-01-03", "description": "coffee", "amount": -5.0, "category": "Food"},
+]
+
+def ids(results):
+    return [op["entry_id"] for op in results[0]]
+
+def test_undated_operations_fail_date_bounds_and_rank_last():
+    for operations in (OPERATIONS, OperationStore.from_records(OPERATIONS)):
+        index = SearchIndex.build(operations)
+        assert ids(index.search("coffee")) == [3, 1, 2]
+        assert ids(index.search("coffee", start=date(2024, 1, 2))) == [3]
+        assert ids(index.search("coffee", end=date(2024, 1, 2))) == [1]
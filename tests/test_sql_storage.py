@@ -0,0 +1,45 @@
+import pytest
+from services.sql_storage import SQLStorage
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLStorage(f"sqlite:///{tmp_path / 'spendly.db'}")
+    storage.create_user("user@example.com", "secret")
+    assert storage.login("user@example.com", "secret")
+    return storage
+
+def add(storage, amount=5.0):
+    storage.add_entry({"entry_date": "2024-01-01", "description": "coffee", "amount": amount,
+                       "type": "expense", "category": "Food"})
+    return int(storage.load().ids.max())
+
+def test_delete_add_delete_never_reuses_ids(storage):
+    add(storage)
+    first = add(storage)
+    cursor = first
+    storage.delete_entry(first)
+    before = storage.data_version()
+
+    second = add(storage)
+    assert second > first
+    assert storage.data_version() != before
+    # The new row is past the cursor, so a delta sync picks it up
+    delta = storage.load_since(cursor)
+    assert delta["operations"].ids.tolist() == [second]
+    assert delta["deleted_ids"] == [first]
+
+    storage.delete_entry(second)
+    assert len(storage.load()) == 1
+    assert storage.load_since(cursor)["deleted_ids"] == [first]
+
+def test_delta_lists_only_deletions_after_the_watermark(storage):
+    ids = [add(storage) for _ in range(4)]
+    cursor = ids[-1]
+    storage.delete_entry(ids[0])
+    delta = storage.load_since(cursor)
+    assert delta["deleted_ids"] == [ids[0]]
+
+    storage.delete_entry(ids[1])
+    delta = storage.load_since(cursor, delta["deleted_cursor"])
+    assert delta["deleted_ids"] == [ids[1]]
+    assert storage.load_since(cursor, delta["deleted_cursor"])["deleted_ids"] == []
@@ -0,0 +1,72 @@
+import requests
+import threading
+from urllib3.exceptions import NewConnectionError
+from services.data_manager import DataManager
+from services.mock_storage import MockBackend, MockStorage
+from services.write_queue import WriteQueue
+
+class FlakyStorage(MockStorage):
+    """MockStorage whose first add fails with `error`, after storing it when `stored`."""
+
+    def __init__(self, error, stored):
+        super().__init__(MockBackend())
+        self.error, self.stored, self.calls = error, stored, 0
+
+    def add_entry(self, entry_data):
+        self.calls += 1
+        if self.calls == 1:
+            if self.stored:
+                super().add_entry(entry_data)
+            raise self.error
+        super().add_entry(entry_data)
+
+def logged_in(storage):
+    storage.login("user@example.com", "secret")
+    storage.backend.seed(storage._user_id(), [{"entry_date": "2024-01-01", "description": "seed", "amount": 100, "category": "Food"}])
+    manager = DataManager(storage)
+    manager.begin_run()
+    manager.get_operations()
+    manager._writes().backoff = 0
+    return manager
+
+def add_and_settle(manager):
+    manager.add_operation({"entry_date": "2024-01-02", "description": "coffee", "amount": 3.5,
+                           "type": "expense", "category": "Food"})
+    manager.flush_writes(wait=True)
+    manager.begin_run()
+    return [row["description"] for row in manager.get_operations()]
+
+def test_add_timing_out_after_being_stored_is_not_resent():
+    storage = FlakyStorage(requests.exceptions.ReadTimeout("read timed out"), stored=True)
+    manager = logged_in(storage)
+    assert add_and_settle(manager) == ["seed", "coffee"]
+    assert storage.calls == 1
+    assert manager.get_write_status()["pending"] == 0
+
+def test_add_that_may_not_be_stored_is_failed_not_resent():
+    storage = FlakyStorage(requests.exceptions.ReadTimeout("read timed out"), stored=False)
+    manager = logged_in(storage)
+    add_and_settle(manager)
+    assert storage.calls == 1
+    assert manager.get_write_status()["failed"] == 1
+    assert [op["description"] for op in storage.backend.operations(storage._user_id())] == ["seed"]
+
+def test_add_that_never_connected_is_retried():
+    error = requests.exceptions.ConnectionError(
+        type("MaxRetry", (), {"reason": NewConnectionError(None, "refused")})())
+    storage = FlakyStorage(error, stored=False)
+    manager = logged_in(storage)
+    assert add_and_settle(manager) == ["seed", "coffee"]
+    assert storage.calls == 2
+
+def test_waited_flush_is_sent_from_the_calling_thread():
+    # Widget callbacks hold the session state lock, which pooled threads would wait on
+    class RecordingStorage:
+        def add_entries(self, entries):
+            threads.append(threading.current_thread())
+    threads = []
+    queue = WriteQueue()
+    queue.add({"entry_date": "2024-01-02", "description": "coffee", "amount": 3.5, "type": "expense"})
+    assert queue.start_flush(RecordingStorage(), wait=True)
+    assert threads == [threading.current_thread()]
+    assert not queue.busy() and [item["state"] for item in queue.settle()] == ["done"]